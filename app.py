@@ -1,13 +1,28 @@
 import os
 import logging
 from logging.handlers import RotatingFileHandler
-from flask import Flask, redirect, url_for, session, request
+from flask import Flask, Response, redirect, url_for, session, request, stream_with_context, g, send_file
 from flask_restx import Api, Resource, Namespace, fields, abort
-from authlib.integrations.flask_client import OAuth
 from werkzeug.middleware.proxy_fix import ProxyFix
-from models import db, MLModel, AVAILABLE_MODELS, get_model_path, convert_params, calculate_metrics, create_model_record
-import joblib
+from werkzeug.http import quote_etag
+from models import db, MLModel, AVAILABLE_MODELS, model_class_name, warm_up_imports, get_model_path, save_model, load_model, delete_model_files, convert_params, fit_model, update_model, create_model_record, set_model_metrics, get_revision
+from model_cache import model_cache
+from metadata_cache import metadata_cache
+from model_listing import parse_list_query, list_models, leaderboard, LEADERBOARD_DEFAULT_K
+from migrate import upgrade_schema
+from database import configure_database
+from training_jobs import TrainingJobManager, QueueFullError
+from evaluation import parse_evaluation
+from hyperparam_search import parse_search, run_search
+from rest_codecs import PayloadError, decode_payload, prediction_format, document_format, encode_predictions, encode_document
+from rest_codecs import NDJSON, iter_ndjson_chunks, ndjson_predictions
+from service_metrics import observe_request, render, stage_timer, timed_predict
+from request_profiler import (PROFILING_TOKEN, PROFILE_HEADER, PROFILE_ID_HEADER, authorized, start_profile,
+                              list_profiles, profile_path, profile_summary)
+import json
+import time
 import uuid
+import threading
 from datetime import datetime
 
 """
@@ -34,12 +49,18 @@ app = Flask(__name__)
 
 app.config['JSON_AS_ASCII'] = False
 app.config['JSON_SORT_KEYS'] = False
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///test.db'
 app.secret_key = os.urandom(24)
 app.wsgi_app = ProxyFix(app.wsgi_app)
 
 # Инициализация базы данных
-db.init_app(app)
+configure_database(app)
+
+# Размер порции при потоковом скоринге NDJSON
+BATCH_CHUNK_ROWS = int(os.getenv('BATCH_CHUNK_ROWS', 10000))
+BATCH_MAX_CHUNK_ROWS = int(os.getenv('BATCH_MAX_CHUNK_ROWS', 100000))
+
+# Очередь асинхронного обучения
+job_manager = TrainingJobManager(app)
 
 api = Api(
     app, 
@@ -56,18 +77,29 @@ namespace = api.namespace('', 'Click the down arrow to expand the content')
 Initializing authorization via github
 """
 
-oauth = OAuth(app)
-github = oauth.register(
-    name='github',
-    client_id=os.getenv("GITHUB_CLIENT_ID"),
-    client_secret=os.getenv("GITHUB_CLIENT_SECRET"),
-    access_token_url='https://github.com/login/oauth/access_token',
-    access_token_params=None,
-    authorize_url='https://github.com/login/oauth/authorize',
-    authorize_params=None,
-    api_base_url='https://api.github.com/',
-    client_kwargs={'scope': 'user:email'},
-)
+# Клиент OAuth создается при первом входе: authlib не нужен для обслуживания API
+_oauth = None
+_oauth_lock = threading.Lock()
+
+def get_github_client():
+    global _oauth
+    with _oauth_lock:
+        if _oauth is None:
+            from authlib.integrations.flask_client import OAuth
+            oauth = OAuth(app)
+            oauth.register(
+                name='github',
+                client_id=os.getenv("GITHUB_CLIENT_ID"),
+                client_secret=os.getenv("GITHUB_CLIENT_SECRET"),
+                access_token_url='https://github.com/login/oauth/access_token',
+                access_token_params=None,
+                authorize_url='https://github.com/login/oauth/authorize',
+                authorize_params=None,
+                api_base_url='https://api.github.com/',
+                client_kwargs={'scope': 'user:email'},
+            )
+            _oauth = oauth
+    return _oauth.create_client('github')
 
 @app.route("/") 
 def index(): 
@@ -77,7 +109,7 @@ def index():
 @app.route('/login')
 def registro():
     logger.info("Starting OAuth login process")
-    github = oauth.create_client('github')
+    github = get_github_client()
     redirect_uri = url_for('authorize', _external=True)
     logger.info(f"Redirecting to GitHub OAuth: {redirect_uri}")
     return github.authorize_redirect(redirect_uri)
@@ -85,7 +117,7 @@ def registro():
 @app.route('/authorize')
 def authorize():
     logger.info("Processing OAuth authorization callback")
-    github = oauth.create_client('github')
+    github = get_github_client()
     token = github.authorize_access_token()
     resp = github.get('user', token=token)
     profile = resp.json()
@@ -100,17 +132,169 @@ def authorize():
     logger.info(f"Successful GitHub authorization for user ID: {github_id}")
     return redirect(url_for('index'))
 
+"""
+Prometheus metrics
+"""
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # Метка — шаблон маршрута, а не URL: id моделей не размножают временные ряды
+        rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        observe_request(f"{request.method} {rule}", str(response.status_code),
+                        time.perf_counter() - started, error=response.status_code >= 400)
+    return response
+
+@app.route('/metrics')
+def prometheus_metrics():
+    body, content_type = render(request.headers.get('Accept'))
+    return Response(body, content_type=content_type)
+
+"""
+On-demand request profiling
+"""
+
+# Порядок функций в текстовом отчете GET /profiles/<id>?format=text
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'calls')
+
+@app.before_request
+def start_request_profile():
+    token = request.headers.get(PROFILE_HEADER)
+    # Запросы к самим профилям токен только авторизует
+    if token is None or request.path.startswith('/profiles'):
+        return
+    if not authorized(token):
+        logger.warning(f"Rejected profiling request with invalid token: {request.method} {request.path}")
+        return
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    g.profile = start_profile('rest', f"{request.method} {rule}")
+
+@app.after_request
+def finish_request_profile(response):
+    # Тело потокового ответа (пакетный скоринг) формируется уже после этой точки и в профиль не входит
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile_id = profile.finish()
+        if profile_id:
+            response.headers[PROFILE_ID_HEADER] = profile_id
+    return response
+
+@app.teardown_request
+def release_request_profile(exc):
+    # Если ответ не был сформирован, профилировщик все равно нужно остановить
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.finish()
+
+def require_profiling_token():
+    if not PROFILING_TOKEN:
+        abort(404, 'Profiling is disabled')
+    if not authorized(request.headers.get(PROFILE_HEADER)):
+        abort(403, f'Valid {PROFILE_HEADER} header required')
+
+def read_payload():
+    """Декодирует тело запроса (JSON, .npy/.npz, Arrow IPC или msgpack)"""
+    try:
+        return decode_payload(request)
+    except PayloadError as e:
+        logger.error(f"Cannot decode request body: {str(e)}")
+        abort(e.status, str(e))
+
+def response_format(negotiate):
+    """Формат ответа по заголовку Accept; 406, если нужной для него библиотеки нет на сервере"""
+    try:
+        return negotiate(request)
+    except PayloadError as e:
+        logger.error(f"Cannot produce requested response format: {str(e)}")
+        abort(e.status, str(e))
+
+def get_cached_model(model_id, metadata):
+    """Загруженная модель из кэша; 404, если файл уже удален другим сервером"""
+    try:
+        return model_cache.get(model_id, metadata.file_path)
+    except FileNotFoundError:
+        metadata_cache.invalidate(model_id)
+        logger.warning(f"Model file is gone, metadata was stale: {model_id}")
+        abort(404, 'Model not found')
+
+def preload_models(model_ids=(), latest=0):
+    """Заранее загружает модели в кэши процесса: указанные по id и latest последних обученных.
+
+    В gunicorn вызывается в главном процессе до fork: воркеры получают уже
+    загруженные массивы моделей и разделяют их страницы copy-on-write.
+    """
+    with app.app_context():
+        records = MLModel.query.filter(MLModel.id.in_(model_ids)).all() if model_ids else []
+        if latest:
+            records += MLModel.query.order_by(MLModel.created_at.desc()).limit(latest).all()
+        loaded = {}
+        for record in records:
+            if record.id in loaded:
+                continue
+            metadata = metadata_cache.put(record)
+            try:
+                model_cache.get(record.id, metadata.file_path)
+            except FileNotFoundError:
+                logger.warning(f"Model file is missing, not preloaded: {record.id}")
+                continue
+            loaded[record.id] = metadata
+    logger.info(f"Preloaded {len(loaded)} models")
+    return list(loaded)
+
+def not_modified(etag):
+    """Ответ 304, если версия у клиента (If-None-Match) совпадает с etag, иначе None"""
+    if request.if_none_match.contains_weak(etag):
+        return Response(status=304, headers={'ETag': quote_etag(etag)})
+    return None
+
+def model_etag(metadata):
+    return f"{metadata.id}-{metadata.revision}"
+
 def get_user_id():
     if 'github_id' in session:
         return session['github_id']
     return 
 
 # Swagger models
+evaluation_config = api.model('EvaluationConfig', {
+    'mode': fields.String(default='train', enum=['train', 'holdout', 'kfold'], description='Evaluation mode'),
+    'folds': fields.Integer(default=5, description='Number of folds for kfold'),
+    'test_size': fields.Float(default=0.2, description='Holdout fraction'),
+    'n_jobs': fields.Integer(description='Cores used to fit folds in parallel (capped by EVAL_MAX_CORES)')
+})
+
 train_model = api.model('TrainModel', {
     'model_type': fields.String(required=True, description='Model type (random_forest / logistic_regression)'),
     'params': fields.Raw(required=True, description='Model parameters'),
     'X': fields.List(fields.List(fields.Float), required=True, description='Features'),
-    'y': fields.List(fields.Integer, required=True, description='Labels')
+    'y': fields.List(fields.Integer, required=True, description='Labels'),
+    'async': fields.Boolean(required=False, default=False, description='Train in background and return job id'),
+    'evaluation': fields.Nested(evaluation_config, required=False,
+                                description='How to compute stored metrics: on training data, holdout or k-fold')
+})
+
+search_config = api.model('SearchConfig', {
+    'strategy': fields.String(default='grid', enum=['grid', 'random', 'halving'],
+                              description='grid, random or successive-halving search'),
+    'param_space': fields.Raw(required=True, description='Parameter -> list of values or {low, high, log, integer} range'),
+    'n_iter': fields.Integer(default=20, description='Sampled candidates for random and halving with ranges'),
+    'cv': fields.Integer(default=3, description='Cross-validation folds'),
+    'scoring': fields.String(default='accuracy', description='sklearn scorer name'),
+    'factor': fields.Integer(default=3, description='Halving elimination factor'),
+    'n_jobs': fields.Integer(description='Worker processes (capped by SEARCH_MAX_CORES)')
+})
+
+search_model = api.model('SearchModel', {
+    'model_type': fields.String(required=True, description='Model type'),
+    'params': fields.Raw(required=False, description='Fixed model parameters'),
+    'X': fields.List(fields.List(fields.Float), required=True, description='Features'),
+    'y': fields.List(fields.Integer, required=True, description='Labels'),
+    'search': fields.Nested(search_config, required=True, description='Search space and strategy')
 })
 
 predict_model = api.model('PredictModel', {
@@ -119,7 +303,10 @@ predict_model = api.model('PredictModel', {
 
 retrain_model = api.model('RetrainModel', {
     'X': fields.List(fields.List(fields.Float), required=True, description='Features'),
-    'y': fields.List(fields.Integer, required=True, description='Labels')
+    'y': fields.List(fields.Integer, required=True, description='Labels'),
+    'mode': fields.String(required=False, default='full', enum=['full', 'incremental'],
+                          description='full refit or incremental update (warm_start / partial_fit)'),
+    'n_new_estimators': fields.Integer(required=False, description='Trees added by incremental random_forest retrain')
 })
 
 # Endpoints
@@ -140,20 +327,24 @@ class ModelClasses(Resource):
         models_info = {}
         for key, val in AVAILABLE_MODELS.items():
             models_info[key] = {
-                "class_name": val["class"].__name__,
+                "class_name": model_class_name(key),
                 "hyperparameters": val["hyperparameters"],
-                "description": val["description"]
+                "description": val["description"],
+                "incremental": val["incremental"]
             }
         logger.info(f"Returning {len(models_info)} model classes")
         return models_info, 200
 
 @namespace.route('/models/train')
 class TrainModel(Resource):
-    @api.doc(description="Model training")
+    @api.doc(description="Model training. Body: JSON (default), application/x-npz with X and y, "
+                         "Arrow IPC stream with label column y or msgpack; for binary bodies model_type, "
+                         "params and evaluation can be passed as query parameters")
     @api.expect(train_model)
     def post(self):
         logger.info("Starting model training request")
-        data = request.get_json()
+        output_format = response_format(document_format)
+        data = read_payload()
         model_type = data.get('model_type')
         params = data.get('params', {})
         X = data.get('X')
@@ -168,132 +359,362 @@ class TrainModel(Resource):
         # Конвертируем параметры
         converted_params = convert_params(params)
         logger.debug(f"Converted parameters: {converted_params}")
+        try:
+            evaluation = parse_evaluation(data.get('evaluation'))
+        except (TypeError, ValueError) as e:
+            abort(400, f'Invalid evaluation config: {str(e)}')
         
-        ModelClass = AVAILABLE_MODELS[model_type]['class']
-        model = ModelClass(**converted_params)
-        model.fit(X, y)
-
-        # Вычисляем метрики
-        y_pred = model.predict(X)
-        metrics = calculate_metrics(y, y_pred)
+        if data.get('async'):
+            try:
+                job = job_manager.submit(model_type, converted_params, X, y, evaluation)
+            except QueueFullError:
+                abort(429, 'Training queue is full, try again later')
+            except ValueError as e:
+                logger.error(f"Training job rejected: {str(e)}")
+                abort(400, str(e))
+            logger.info(f"Training job submitted: {job.id}")
+            return job.to_dict(), 202
+
+        # Обучаем модель и вычисляем метрики
+        try:
+            model, metrics = fit_model(model_type, converted_params, X, y, evaluation=evaluation)
+        except ValueError as e:
+            logger.error(f"Training failed: {str(e)}")
+            abort(400, str(e))
 
         # Сохраняем модель
         model_id = str(uuid.uuid4())
         path = get_model_path(model_id)
-        joblib.dump(model, path)
+        save_model(model, path)
 
         # Создаем запись в БД
         record = create_model_record(model_id, model_type, converted_params, path, metrics)
-        db.session.add(record)
-        db.session.commit()
+        with stage_timer('db_lookup'):
+            db.session.add(record)
+            db.session.commit()
+        metadata_cache.put(record)
 
         logger.info(f"Model trained successfully. ID: {model_id}, Metrics: {metrics}")
-        return {'model_id': model_id, 'metrics': metrics}, 201
+        result = {'model_id': model_id, 'metrics': metrics}
+        return encode_document(result, output_format, status=201) or (result, 201)
+
+
+@namespace.route('/models/search')
+class SearchModel(Resource):
+    @api.doc(description="Hyperparameter search (grid, random or successive halving) on a process pool. "
+                         "Only the best model is saved; the response contains the full trial table")
+    @api.expect(search_model)
+    def post(self):
+        logger.info("Starting hyperparameter search request")
+        output_format = response_format(document_format)
+        data = read_payload()
+        model_type = data.get('model_type')
+        X = data.get('X')
+        y = data.get('y')
+
+        if model_type not in AVAILABLE_MODELS:
+            logger.error(f"Unsupported model type: {model_type}")
+            abort(400, 'Unsupported model type')
+
+        converted_params = convert_params(data.get('params') or {})
+        try:
+            config = parse_search(data.get('search'))
+        except (TypeError, ValueError) as e:
+            abort(400, f'Invalid search config: {str(e)}')
+
+        logger.info(f"Searching {model_type} hyperparameters with {len(X)} samples")
+        try:
+            result = run_search(model_type, converted_params, X, y, config)
+        except ValueError as e:
+            logger.error(f"Hyperparameter search failed: {str(e)}")
+            abort(400, str(e))
+
+        # Сохраняем только лучшую модель
+        model_id = str(uuid.uuid4())
+        path = get_model_path(model_id)
+        save_model(result['model'], path)
+
+        record = create_model_record(model_id, model_type, result['best_params'], path, result['metrics'])
+        with stage_timer('db_lookup'):
+            db.session.add(record)
+            db.session.commit()
+        metadata_cache.put(record)
+
+        logger.info(f"Search finished. Best model ID: {model_id}, params: {result['best_params']}")
+        response = {
+            'model_id': model_id,
+            'best_params': result['best_params'],
+            'best_score': result['best_score'],
+            'scoring': result['scoring'],
+            'metrics': result['metrics'],
+            'search_time': result['search_time'],
+            'trials': result['trials']
+        }
+        return encode_document(response, output_format, status=201) or (response, 201)
+
+
+@namespace.route('/jobs/<string:job_id>')
+class TrainingJobStatus(Resource):
+    @api.doc(description="Get status of background training job")
+    def get(self, job_id):
+        logger.info(f"Request for training job status: {job_id}")
+        job = job_manager.get(job_id)
+        if not job:
+            logger.warning(f"Training job not found: {job_id}")
+            abort(404, 'Job not found')
+        return job.to_dict(), 200
 
 
 @namespace.route('/models')
 class ListModels(Resource):
-    @api.doc(description="Get list of models trained")
+    @api.doc(description="Get list of models trained, one page at a time. The cursor of the next page "
+                         "is returned in the X-Next-Cursor header (absent on the last page). Answers If-None-Match "
+                         "with 304 while no model has been trained, retrained or deleted",
+             params={'limit': 'Page size',
+                     'cursor': 'X-Next-Cursor value from the previous page',
+                     'model_type': 'Only models of this type',
+                     'created_after': 'ISO 8601 datetime, inclusive',
+                     'created_before': 'ISO 8601 datetime, exclusive',
+                     'sort_by': 'created_at (default) or a metric name, e.g. accuracy',
+                     'order': 'desc (default) or asc',
+                     'fields': 'Comma-separated fields to return, e.g. id,model_type,created_at'})
     def get(self):
-        logger.info("Request for list of all models")
-        models = MLModel.query.all()
-        result = [model.to_dict() for model in models]
+        logger.info("Request for list of models")
+        try:
+            query = parse_list_query(request.args)
+        except ValueError as e:
+            abort(400, str(e))
+        # Версия списка меняется при любом обучении, переобучении и удалении модели
+        etag = f"models-{get_revision()}"
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        result, next_cursor = list_models(query)
         logger.info(f"Returning {len(result)} models")
-        return result, 200
+        headers = {'ETag': quote_etag(etag)}
+        if next_cursor:
+            headers['X-Next-Cursor'] = next_cursor
+        return result, 200, headers
+
+
+@namespace.route('/leaderboard')
+class Leaderboard(Resource):
+    @api.doc(description="Top-k models by a metric",
+             params={'metric': 'Metric name, e.g. accuracy',
+                     'k': f'Number of models (default {LEADERBOARD_DEFAULT_K})',
+                     'model_type': 'Only models of this type',
+                     'order': 'desc (default, best first for scores) or asc'})
+    def get(self):
+        metric = request.args.get('metric', 'accuracy')
+        order = request.args.get('order', 'desc')
+        if order not in ('asc', 'desc'):
+            abort(400, "order must be asc or desc")
+        try:
+            entries = leaderboard(metric, k=int(request.args.get('k', LEADERBOARD_DEFAULT_K)),
+                                  model_type=request.args.get('model_type') or None,
+                                  ascending=order == 'asc')
+        except ValueError as e:
+            abort(400, str(e))
+        return {'metric': metric, 'models': entries}, 200
+
+
+@namespace.route('/cache/stats')
+class CacheStats(Resource):
+    @api.doc(description="Hit/miss statistics of the loaded model cache and the model metadata cache")
+    def get(self):
+        return {'models': model_cache.stats(), 'metadata': metadata_cache.stats()}, 200
+
+
+@namespace.route('/profiles')
+class ProfileList(Resource):
+    @api.doc(description=f"Stored request profiles, newest first. Requires the {PROFILE_HEADER} header; "
+                         f"send the same header with any request to profile it")
+    def get(self):
+        require_profiling_token()
+        return {'profiles': list_profiles()}, 200
+
+
+@namespace.route('/profiles/<string:profile_id>')
+class ProfileDownload(Resource):
+    @api.doc(description=f"Download a profile as a pstats file or, with format=text, as a text report. "
+                         f"Requires the {PROFILE_HEADER} header",
+             params={'format': 'prof (default) or text', 'sort': f"text report order: {', '.join(PROFILE_SORT_KEYS)}",
+                     'limit': 'functions in the text report'})
+    def get(self, profile_id):
+        require_profiling_token()
+        path = profile_path(profile_id)
+        if path is None:
+            abort(404, 'Profile not found')
+        if request.args.get('format', 'prof') != 'text':
+            return send_file(os.path.abspath(path), mimetype='application/octet-stream',
+                             as_attachment=True, download_name=f"{profile_id}.prof")
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in PROFILE_SORT_KEYS:
+            abort(400, f"sort must be one of: {', '.join(PROFILE_SORT_KEYS)}")
+        limit = request.args.get('limit', 50, type=int)
+        return Response(profile_summary(path, sort, limit), mimetype='text/plain')
 
 
 @namespace.route('/models/<string:model_id>')
 class ModelById(Resource):
-    @api.doc(description="Get information on a trained model")
+    @api.doc(description="Get information on a trained model. Answers If-None-Match with 304 while the model is unchanged")
     def get(self, model_id):
         logger.info(f"Request for model info: {model_id}")
-        record = MLModel.query.filter_by(id=model_id).first()
+        record = metadata_cache.get(model_id)
         if not record:
             logger.warning(f"Model not found: {model_id}")
             abort(404, 'Model not found')
+        etag = model_etag(record)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         logger.info(f"Returning model info: {model_id}")
-        return record.to_dict(), 200
+        return record.to_dict(), 200, {'ETag': quote_etag(etag)}
 
     @api.doc(description="Delete model")
     def delete(self, model_id):
         logger.info(f"Request to delete model: {model_id}")
-        record = MLModel.query.filter_by(id=model_id).first()
+        with stage_timer('db_lookup'):
+            record = MLModel.query.filter_by(id=model_id).first()
         if not record:
             logger.warning(f"Model not found for deletion: {model_id}")
             abort(404, 'Model not found')
-        if os.path.exists(record.file_path):
-            os.remove(record.file_path)
-            logger.info(f"Model file deleted: {record.file_path}")
-        db.session.delete(record)
-        db.session.commit()
+        delete_model_files(record.file_path)
+        model_cache.invalidate(model_id)
+        with stage_timer('db_lookup'):
+            db.session.delete(record)
+            db.session.commit()
+        metadata_cache.invalidate(model_id)
         logger.info(f"Model deleted successfully: {model_id}")
         return '', 204
 
 
 @namespace.route('/models/<string:model_id>/predict')
 class ModelPredict(Resource):
-    @api.doc(description="Make prediction")
+    @api.doc(description="Make prediction. Body: JSON (default), application/x-npy, Arrow IPC stream "
+                         "or msgpack; the response format follows the Accept header")
     @api.expect(predict_model)
     def post(self, model_id):
         logger.info(f"Prediction request for model: {model_id}")
-        record = MLModel.query.filter_by(id=model_id).first()
-        if not record:
+        output_format = response_format(prediction_format)
+        metadata = metadata_cache.get(model_id)
+        if not metadata:
             logger.warning(f"Model not found for prediction: {model_id}")
             abort(404, 'Model not found')
         
-        model = joblib.load(record.file_path)
-        X = request.json.get('X')
+        model = get_cached_model(model_id, metadata)
+        X = read_payload().get('X')
         logger.info(f"Making prediction with {len(X)} samples")
         
-        preds = model.predict(X).tolist()
+        preds = timed_predict(model, X)
         logger.info(f"Prediction completed. Returning {len(preds)} predictions")
-        return {'predictions': preds}, 200
+        response = encode_predictions(preds, output_format)
+        if response is not None:
+            return response
+        return {'predictions': preds.tolist()}, 200
+
+
+@namespace.route('/models/<string:model_id>/predict/batch')
+class ModelBatchPredict(Resource):
+    @api.doc(description="Batch scoring: NDJSON body with one row of features per line, "
+                         "NDJSON response with one prediction per line streamed chunk by chunk",
+             params={'chunk_size': 'Rows scored per vectorized predict call'})
+    def post(self, model_id):
+        logger.info(f"Batch prediction request for model: {model_id}")
+        metadata = metadata_cache.get(model_id)
+        if not metadata:
+            logger.warning(f"Model not found for batch prediction: {model_id}")
+            abort(404, 'Model not found')
+
+        chunk_size = request.args.get('chunk_size', BATCH_CHUNK_ROWS, type=int)
+        if not chunk_size or chunk_size < 1 or chunk_size > BATCH_MAX_CHUNK_ROWS:
+            abort(400, f'chunk_size must be between 1 and {BATCH_MAX_CHUNK_ROWS}')
+        model = get_cached_model(model_id, metadata)
+
+        def generate():
+            rows = 0
+            try:
+                for X in iter_ndjson_chunks(request.stream, chunk_size):
+                    preds = timed_predict(model, X)
+                    rows += len(preds)
+                    yield ndjson_predictions(preds)
+            except Exception as e:
+                # Заголовки уже отправлены, поэтому ошибка передается последней строкой
+                logger.error(f"Batch prediction failed after {rows} rows: {str(e)}")
+                yield json.dumps({'error': str(e), 'rows_scored': rows}) + '\n'
+                return
+            logger.info(f"Batch prediction completed for model {model_id}: {rows} rows")
+
+        return Response(stream_with_context(generate()), mimetype=NDJSON)
 
 
 @namespace.route('/models/<string:model_id>/retrain')
 class ModelRetrain(Resource):
-    @api.doc(description="Retrain existing model")
+    @api.doc(description="Retrain existing model. Accepts the same body formats as training")
     @api.expect(retrain_model)
     def post(self, model_id):
         logger.info(f"Retrain request for model: {model_id}")
-        record = MLModel.query.filter_by(id=model_id).first()
+        output_format = response_format(document_format)
+        with stage_timer('db_lookup'):
+            record = MLModel.query.filter_by(id=model_id).first()
         if not record:
             logger.warning(f"Model not found for retraining: {model_id}")
             abort(404, 'Model not found')
 
-        model = joblib.load(record.file_path)
-        X = request.json.get('X')
-        y = request.json.get('y')
-        logger.info(f"Retraining model with {len(X)} samples")
-
-        model.fit(X, y)
-        joblib.dump(model, record.file_path)
+        model = load_model(record.file_path, writable=True)
+        data = read_payload()
+        X = data.get('X')
+        y = data.get('y')
+        mode = data.get('mode', request.args.get('mode', 'full'))
+        if mode not in ('full', 'incremental'):
+            abort(400, "mode must be 'full' or 'incremental'")
+        logger.info(f"Retraining model with {len(X)} samples (mode={mode})")
+
+        try:
+            model, metrics = update_model(
+                record.model_type, model, X, y,
+                incremental=mode == 'incremental',
+                n_new_estimators=data.get('n_new_estimators', request.args.get('n_new_estimators', type=int))
+            )
+        except ValueError as e:
+            logger.error(f"Retraining failed for model {model_id}: {str(e)}")
+            abort(400, str(e))
+        save_model(model, record.file_path)
+        model_cache.invalidate(model_id)
 
         # Обновляем метрики
-        y_pred = model.predict(X)
-        record.metrics = calculate_metrics(y, y_pred)
-        db.session.commit()
+        set_model_metrics(record, metrics)
+        with stage_timer('db_lookup'):
+            db.session.commit()
+        metadata_cache.invalidate(model_id)
 
         logger.info(f"Model retrained successfully: {model_id}, New metrics: {record.metrics}")
-        return {'status': 'retrained', 'metrics': record.metrics}, 200
+        result = {'status': 'retrained', 'metrics': record.metrics}
+        return encode_document(result, output_format) or (result, 200)
 
 
 @namespace.route('/metrics/<string:model_id>')
 class ModelMetrics(Resource):
-    @api.doc(description="Get model scores")
+    @api.doc(description="Get model scores. Answers If-None-Match with 304 while the model is unchanged")
     def get(self, model_id):
         logger.info(f"Metrics request for model: {model_id}")
-        record = MLModel.query.filter_by(id=model_id).first()
+        record = metadata_cache.get(model_id)
         if not record:
             logger.warning(f"Model not found for metrics: {model_id}")
             abort(404, 'Model not found')
+        etag = model_etag(record)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         logger.info(f"Returning metrics for model: {model_id}")
-        return record.metrics, 200   
+        return record.metrics, 200, {'ETag': quote_etag(etag)}
 
 if __name__ == '__main__':
     logger.info("Starting Flask application")
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
         logger.info("Database tables created")
     logger.info("Flask app running in debug mode")
+    # sklearn импортируется в фоне: сервер отвечает сразу, а первое обучение не ждет импорта
+    threading.Thread(target=warm_up_imports, name='warm-up-imports', daemon=True).start()
     app.run(debug=True)
\ No newline at end of file
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tapp.proto\x12\tmlservice\"\x07\n\x05\x45mpty\"\x0f\n\rHealthRequest\" \n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\"\xb0\x01\n\x14ModelClassesResponse\x12H\n\rmodel_classes\x18\x01 \x03(\x0b\x32\x31.mlservice.ModelClassesResponse.ModelClassesEntry\x1aN\n\x11ModelClassesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12(\n\x05value\x18\x02 \x01(\x0b\x32\x19.mlservice.ModelClassInfo:\x02\x38\x01\"R\n\x0eModelClassInfo\x12\x12\n\nclass_name\x18\x01 \x01(\t\x12\x17\n\x0fhyperparameters\x18\x02 \x03(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\"\xb5\x01\n\x0cTrainRequest\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x33\n\x06params\x18\x02 \x03(\x0b\x32#.mlservice.TrainRequest.ParamsEntry\x12\"\n\x01X\x18\x03 \x03(\x0b\x32\x17.mlservice.FeatureArray\x12\t\n\x01y\x18\x04 \x03(\x05\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\" \n\x0c\x46\x65\x61tureArray\x12\x10\n\x08\x66\x65\x61tures\x18\x01 \x03(\x02\"\x89\x01\n\rTrainResponse\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x36\n\x07metrics\x18\x02 \x03(\x0b\x32%.mlservice.TrainResponse.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"F\n\x0ePredictRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\"\n\x01X\x18\x02 \x03(\x0b\x32\x17.mlservice.FeatureArray\"&\n\x0fPredictResponse\x12\x13\n\x0bpredictions\x18\x01 \x03(\x02\"\x1b\n\x07ModelId\x12\x10\n\x08model_id\x18\x01 \x01(\t\"Q\n\x0eRetrainRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\"\n\x01X\x18\x02 \x03(\x0b\x32\x17.mlservice.FeatureArray\x12\t\n\x01y\x18\x03 \x03(\x05\"{\n\x0fRetrainResponse\x12\x38\n\x07metrics\x18\x01 \x03(\x0b\x32\'.mlservice.RetrainResponse.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"{\n\x0fMetricsResponse\x12\x38\n\x07metrics\x18\x01 \x03(\x0b\x32\'.mlservice.MetricsResponse.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x90\x02\n\rModelResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x12\n\nmodel_type\x18\x02 \x01(\t\x12\x34\n\x06params\x18\x03 \x03(\x0b\x32$.mlservice.ModelResponse.ParamsEntry\x12\x12\n\ncreated_at\x18\x04 \x01(\t\x12\x36\n\x07metrics\x18\x05 \x03(\x0b\x32%.mlservice.ModelResponse.MetricsEntry\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\">\n\x12ListModelsResponse\x12(\n\x06models\x18\x01 \x03(\x0b\x32\x18.mlservice.ModelResponse\"!\n\x0e\x44\x65leteResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x32\xd4\x04\n\tMLService\x12\x42\n\x0bHealthCheck\x12\x18.mlservice.HealthRequest\x1a\x19.mlservice.HealthResponse\x12\x44\n\x0fGetModelClasses\x12\x10.mlservice.Empty\x1a\x1f.mlservice.ModelClassesResponse\x12=\n\nListModels\x12\x10.mlservice.Empty\x1a\x1d.mlservice.ListModelsResponse\x12?\n\nTrainModel\x12\x17.mlservice.TrainRequest\x1a\x18.mlservice.TrainResponse\x12\x38\n\x08GetModel\x12\x12.mlservice.ModelId\x1a\x18.mlservice.ModelResponse\x12<\n\x0b\x44\x65leteModel\x12\x12.mlservice.ModelId\x1a\x19.mlservice.DeleteResponse\x12@\n\x07Predict\x12\x19.mlservice.PredictRequest\x1a\x1a.mlservice.PredictResponse\x12\x45\n\x0cRetrainModel\x12\x19.mlservice.RetrainRequest\x1a\x1a.mlservice.RetrainResponse\x12<\n\nGetMetrics\x12\x12.mlservice.ModelId\x1a\x1a.mlservice.MetricsResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tapp.proto\x12\tmlservice\"\x07\n\x05\x45mpty\"\x0f\n\rHealthRequest\" \n\x0eHealthResponse\x12\x0e\n\x06status\x18\x01 \x01(\t\"\xb0\x01\n\x14ModelClassesResponse\x12H\n\rmodel_classes\x18\x01 \x03(\x0b\x32\x31.mlservice.ModelClassesResponse.ModelClassesEntry\x1aN\n\x11ModelClassesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12(\n\x05value\x18\x02 \x01(\x0b\x32\x19.mlservice.ModelClassInfo:\x02\x38\x01\"g\n\x0eModelClassInfo\x12\x12\n\nclass_name\x18\x01 \x01(\t\x12\x17\n\x0fhyperparameters\x18\x02 \x03(\t\x12\x13\n\x0b\x64\x65scription\x18\x03 \x01(\t\x12\x13\n\x0bincremental\x18\x04 \x01(\t\"\xb0\x02\n\x0cTrainRequest\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x33\n\x06params\x18\x02 \x03(\x0b\x32#.mlservice.TrainRequest.ParamsEntry\x12\"\n\x01X\x18\x03 \x03(\x0b\x32\x17.mlservice.FeatureArray\x12\t\n\x01y\x18\x04 \x03(\x05\x12#\n\x08X_packed\x18\x05 \x01(\x0b\x32\x11.mlservice.Tensor\x12#\n\x08y_packed\x18\x06 \x01(\x0b\x32\x11.mlservice.Tensor\x12/\n\nevaluation\x18\x07 \x01(\x0b\x32\x1b.mlservice.EvaluationConfig\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"R\n\x10\x45valuationConfig\x12\x0c\n\x04mode\x18\x01 \x01(\t\x12\r\n\x05\x66olds\x18\x02 \x01(\x05\x12\x11\n\ttest_size\x18\x03 \x01(\x02\x12\x0e\n\x06n_jobs\x18\x04 \x01(\x05\" \n\x0c\x46\x65\x61tureArray\x12\x10\n\x08\x66\x65\x61tures\x18\x01 \x03(\x02\"D\n\x06Tensor\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06values\x18\x02 \x03(\x01\x12\r\n\x05shape\x18\x03 \x03(\x03\x12\r\n\x05\x64type\x18\x04 \x01(\t\"\x82\x02\n\nTrainChunk\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x31\n\x06params\x18\x02 \x03(\x0b\x32!.mlservice.TrainChunk.ParamsEntry\x12\x11\n\tn_samples\x18\x03 \x01(\x03\x12\x1c\n\x01X\x18\x04 \x01(\x0b\x32\x11.mlservice.Tensor\x12\x1c\n\x01y\x18\x05 \x01(\x0b\x32\x11.mlservice.Tensor\x12/\n\nevaluation\x18\x06 \x01(\x0b\x32\x1b.mlservice.EvaluationConfig\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\x89\x01\n\rTrainResponse\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\x36\n\x07metrics\x18\x02 \x03(\x0b\x32%.mlservice.TrainResponse.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x84\x01\n\x0ePredictRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\"\n\x01X\x18\x02 \x03(\x0b\x32\x17.mlservice.FeatureArray\x12#\n\x08X_packed\x18\x03 \x01(\x0b\x32\x11.mlservice.Tensor\x12\x17\n\x0fpacked_response\x18\x04 \x01(\x08\"Z\n\x0fPredictResponse\x12\x13\n\x0bpredictions\x18\x01 \x03(\x02\x12\x17\n\x0fint_predictions\x18\x02 \x03(\x03\x12\x19\n\x11\x66loat_predictions\x18\x03 \x03(\x01\"L\n\x0cPredictChunk\x12\x10\n\x08\x63hunk_id\x18\x01 \x01(\x04\x12*\n\x07request\x18\x02 \x01(\x0b\x32\x19.mlservice.PredictRequest\"u\n\x12PredictChunkResult\x12\x10\n\x08\x63hunk_id\x18\x01 \x01(\x04\x12\x10\n\x08model_id\x18\x02 \x01(\t\x12,\n\x08response\x18\x03 \x01(\x0b\x32\x1a.mlservice.PredictResponse\x12\r\n\x05\x65rror\x18\x04 \x01(\t\"\x1b\n\x07ModelId\x12\x10\n\x08model_id\x18\x01 \x01(\t\"\xca\x01\n\x0eRetrainRequest\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12\"\n\x01X\x18\x02 \x03(\x0b\x32\x17.mlservice.FeatureArray\x12\t\n\x01y\x18\x03 \x03(\x05\x12#\n\x08X_packed\x18\x04 \x01(\x0b\x32\x11.mlservice.Tensor\x12#\n\x08y_packed\x18\x05 \x01(\x0b\x32\x11.mlservice.Tensor\x12\x13\n\x0bincremental\x18\x06 \x01(\x08\x12\x18\n\x10n_new_estimators\x18\x07 \x01(\x05\"{\n\x0fRetrainResponse\x12\x38\n\x07metrics\x18\x01 \x03(\x0b\x32\'.mlservice.RetrainResponse.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"{\n\x0fMetricsResponse\x12\x38\n\x07metrics\x18\x01 \x03(\x0b\x32\'.mlservice.MetricsResponse.MetricsEntry\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x90\x02\n\rModelResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x12\n\nmodel_type\x18\x02 \x01(\t\x12\x34\n\x06params\x18\x03 \x03(\x0b\x32$.mlservice.ModelResponse.ParamsEntry\x12\x12\n\ncreated_at\x18\x04 \x01(\t\x12\x36\n\x07metrics\x18\x05 \x03(\x0b\x32%.mlservice.ModelResponse.MetricsEntry\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\xa9\x01\n\x11ListModelsRequest\x12\r\n\x05limit\x18\x01 \x01(\x05\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\x12\n\nmodel_type\x18\x03 \x01(\t\x12\x15\n\rcreated_after\x18\x04 \x01(\t\x12\x16\n\x0e\x63reated_before\x18\x05 \x01(\t\x12\x0f\n\x07sort_by\x18\x06 \x01(\t\x12\x11\n\tascending\x18\x07 \x01(\x08\x12\x0e\n\x06\x66ields\x18\x08 \x03(\t\"S\n\x12ListModelsResponse\x12(\n\x06models\x18\x01 \x03(\x0b\x32\x18.mlservice.ModelResponse\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t\"V\n\x12LeaderboardRequest\x12\x0e\n\x06metric\x18\x01 \x01(\t\x12\t\n\x01k\x18\x02 \x01(\x05\x12\x12\n\nmodel_type\x18\x03 \x01(\t\x12\x11\n\tascending\x18\x04 \x01(\x08\"U\n\x10LeaderboardEntry\x12\x0c\n\x04rank\x18\x01 \x01(\x05\x12\x10\n\x08model_id\x18\x02 \x01(\t\x12\x12\n\nmodel_type\x18\x03 \x01(\t\x12\r\n\x05value\x18\x04 \x01(\x01\"R\n\x13LeaderboardResponse\x12\x0e\n\x06metric\x18\x01 \x01(\t\x12+\n\x06models\x18\x02 \x03(\x0b\x32\x1b.mlservice.LeaderboardEntry\"!\n\x0e\x44\x65leteResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\"\x17\n\x05JobId\x12\x0e\n\x06job_id\x18\x01 \x01(\t\"\x97\x02\n\x0bJobResponse\x12\x0e\n\x06job_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x10\n\x08progress\x18\x03 \x01(\x02\x12\x12\n\nmodel_type\x18\x04 \x01(\t\x12\x10\n\x08model_id\x18\x05 \x01(\t\x12\x34\n\x07metrics\x18\x06 \x03(\x0b\x32#.mlservice.JobResponse.MetricsEntry\x12\r\n\x05\x65rror\x18\x07 \x01(\t\x12\x12\n\ncreated_at\x18\x08 \x01(\t\x12\x12\n\nstarted_at\x18\t \x01(\t\x12\x13\n\x0b\x66inished_at\x18\n \x01(\t\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"\x99\x01\n\x14PredictStatsResponse\x12\x18\n\x10\x62\x61tching_enabled\x18\x01 \x01(\x08\x12\x39\n\x05stats\x18\x02 \x03(\x0b\x32*.mlservice.PredictStatsResponse.StatsEntry\x1a,\n\nStatsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"V\n\x0bParamValues\x12\x0e\n\x06values\x18\x01 \x03(\t\x12\x0b\n\x03low\x18\x02 \x01(\x01\x12\x0c\n\x04high\x18\x03 \x01(\x01\x12\x0b\n\x03log\x18\x04 \x01(\x08\x12\x0f\n\x07integer\x18\x05 \x01(\x08\"\xf6\x01\n\x0cSearchConfig\x12\x10\n\x08strategy\x18\x01 \x01(\t\x12<\n\x0bparam_space\x18\x02 \x03(\x0b\x32\'.mlservice.SearchConfig.ParamSpaceEntry\x12\x0e\n\x06n_iter\x18\x03 \x01(\x05\x12\n\n\x02\x63v\x18\x04 \x01(\x05\x12\x0f\n\x07scoring\x18\x05 \x01(\t\x12\x0e\n\x06\x66\x61\x63tor\x18\x06 \x01(\x05\x12\x0e\n\x06n_jobs\x18\x07 \x01(\x05\x1aI\n\x0fParamSpaceEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12%\n\x05value\x18\x02 \x01(\x0b\x32\x16.mlservice.ParamValues:\x02\x38\x01\"\xaa\x02\n\rSearchRequest\x12\x12\n\nmodel_type\x18\x01 \x01(\t\x12\x34\n\x06params\x18\x02 \x03(\x0b\x32$.mlservice.SearchRequest.ParamsEntry\x12\"\n\x01X\x18\x03 \x03(\x0b\x32\x17.mlservice.FeatureArray\x12\t\n\x01y\x18\x04 \x03(\x05\x12#\n\x08X_packed\x18\x05 \x01(\x0b\x32\x11.mlservice.Tensor\x12#\n\x08y_packed\x18\x06 \x01(\x0b\x32\x11.mlservice.Tensor\x12\'\n\x06search\x18\x07 \x01(\x0b\x32\x17.mlservice.SearchConfig\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xf4\x01\n\x0bSearchTrial\x12\x32\n\x06params\x18\x01 \x03(\x0b\x32\".mlservice.SearchTrial.ParamsEntry\x12\x12\n\nmean_score\x18\x02 \x01(\x01\x12\x11\n\tstd_score\x18\x03 \x01(\x01\x12\x0c\n\x04rank\x18\x04 \x01(\x05\x12\x15\n\rmean_fit_time\x18\x05 \x01(\x01\x12\x11\n\titeration\x18\x06 \x01(\x05\x12\x13\n\x0bn_resources\x18\x07 \x01(\x03\x12\x0e\n\x06\x66\x61iled\x18\x08 \x01(\x08\x1a-\n\x0bParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xe0\x02\n\x0eSearchResponse\x12\x10\n\x08model_id\x18\x01 \x01(\t\x12>\n\x0b\x62\x65st_params\x18\x02 \x03(\x0b\x32).mlservice.SearchResponse.BestParamsEntry\x12\x12\n\nbest_score\x18\x03 \x01(\x01\x12\x0f\n\x07scoring\x18\x04 \x01(\t\x12\x37\n\x07metrics\x18\x05 \x03(\x0b\x32&.mlservice.SearchResponse.MetricsEntry\x12\x13\n\x0bsearch_time\x18\x06 \x01(\x01\x12&\n\x06trials\x18\x07 \x03(\x0b\x32\x16.mlservice.SearchTrial\x1a\x31\n\x0f\x42\x65stParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\x32\x89\t\n\tMLService\x12\x42\n\x0bHealthCheck\x12\x18.mlservice.HealthRequest\x1a\x19.mlservice.HealthResponse\x12\x44\n\x0fGetModelClasses\x12\x10.mlservice.Empty\x1a\x1f.mlservice.ModelClassesResponse\x12=\n\nListModels\x12\x10.mlservice.Empty\x1a\x1d.mlservice.ListModelsResponse\x12M\n\x0eListModelsPage\x12\x1c.mlservice.ListModelsRequest\x1a\x1d.mlservice.ListModelsResponse\x12?\n\nTrainModel\x12\x17.mlservice.TrainRequest\x1a\x18.mlservice.TrainResponse\x12\x45\n\x10TrainModelStream\x12\x15.mlservice.TrainChunk\x1a\x18.mlservice.TrainResponse(\x01\x12\x38\n\x08GetModel\x12\x12.mlservice.ModelId\x1a\x18.mlservice.ModelResponse\x12<\n\x0b\x44\x65leteModel\x12\x12.mlservice.ModelId\x1a\x19.mlservice.DeleteResponse\x12@\n\x07Predict\x12\x19.mlservice.PredictRequest\x1a\x1a.mlservice.PredictResponse\x12K\n\rPredictStream\x12\x17.mlservice.PredictChunk\x1a\x1d.mlservice.PredictChunkResult(\x01\x30\x01\x12\x45\n\x0cRetrainModel\x12\x19.mlservice.RetrainRequest\x1a\x1a.mlservice.RetrainResponse\x12<\n\nGetMetrics\x12\x12.mlservice.ModelId\x1a\x1a.mlservice.MetricsResponse\x12\x41\n\x0eSubmitTrainJob\x12\x17.mlservice.TrainRequest\x1a\x16.mlservice.JobResponse\x12\x32\n\x06GetJob\x12\x10.mlservice.JobId\x1a\x16.mlservice.JobResponse\x12\x44\n\x0fGetPredictStats\x12\x10.mlservice.Empty\x1a\x1f.mlservice.PredictStatsResponse\x12\x42\n\x0bSearchModel\x12\x18.mlservice.SearchRequest\x1a\x19.mlservice.SearchResponse\x12O\n\x0eGetLeaderboard\x12\x1d.mlservice.LeaderboardRequest\x1a\x1e.mlservice.LeaderboardResponseb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,6 +35,8 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_MODELCLASSESRESPONSE_MODELCLASSESENTRY']._serialized_options = b'8\001'
   _globals['_TRAINREQUEST_PARAMSENTRY']._loaded_options = None
   _globals['_TRAINREQUEST_PARAMSENTRY']._serialized_options = b'8\001'
+  _globals['_TRAINCHUNK_PARAMSENTRY']._loaded_options = None
+  _globals['_TRAINCHUNK_PARAMSENTRY']._serialized_options = b'8\001'
   _globals['_TRAINRESPONSE_METRICSENTRY']._loaded_options = None
   _globals['_TRAINRESPONSE_METRICSENTRY']._serialized_options = b'8\001'
   _globals['_RETRAINRESPONSE_METRICSENTRY']._loaded_options = None
@@ -45,6 +47,20 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_MODELRESPONSE_PARAMSENTRY']._serialized_options = b'8\001'
   _globals['_MODELRESPONSE_METRICSENTRY']._loaded_options = None
   _globals['_MODELRESPONSE_METRICSENTRY']._serialized_options = b'8\001'
+  _globals['_JOBRESPONSE_METRICSENTRY']._loaded_options = None
+  _globals['_JOBRESPONSE_METRICSENTRY']._serialized_options = b'8\001'
+  _globals['_PREDICTSTATSRESPONSE_STATSENTRY']._loaded_options = None
+  _globals['_PREDICTSTATSRESPONSE_STATSENTRY']._serialized_options = b'8\001'
+  _globals['_SEARCHCONFIG_PARAMSPACEENTRY']._loaded_options = None
+  _globals['_SEARCHCONFIG_PARAMSPACEENTRY']._serialized_options = b'8\001'
+  _globals['_SEARCHREQUEST_PARAMSENTRY']._loaded_options = None
+  _globals['_SEARCHREQUEST_PARAMSENTRY']._serialized_options = b'8\001'
+  _globals['_SEARCHTRIAL_PARAMSENTRY']._loaded_options = None
+  _globals['_SEARCHTRIAL_PARAMSENTRY']._serialized_options = b'8\001'
+  _globals['_SEARCHRESPONSE_BESTPARAMSENTRY']._loaded_options = None
+  _globals['_SEARCHRESPONSE_BESTPARAMSENTRY']._serialized_options = b'8\001'
+  _globals['_SEARCHRESPONSE_METRICSENTRY']._loaded_options = None
+  _globals['_SEARCHRESPONSE_METRICSENTRY']._serialized_options = b'8\001'
   _globals['_EMPTY']._serialized_start=24
   _globals['_EMPTY']._serialized_end=31
   _globals['_HEALTHREQUEST']._serialized_start=33
@@ -56,43 +72,93 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_MODELCLASSESRESPONSE_MODELCLASSESENTRY']._serialized_start=183
   _globals['_MODELCLASSESRESPONSE_MODELCLASSESENTRY']._serialized_end=261
   _globals['_MODELCLASSINFO']._serialized_start=263
-  _globals['_MODELCLASSINFO']._serialized_end=345
-  _globals['_TRAINREQUEST']._serialized_start=348
-  _globals['_TRAINREQUEST']._serialized_end=529
-  _globals['_TRAINREQUEST_PARAMSENTRY']._serialized_start=484
-  _globals['_TRAINREQUEST_PARAMSENTRY']._serialized_end=529
-  _globals['_FEATUREARRAY']._serialized_start=531
-  _globals['_FEATUREARRAY']._serialized_end=563
-  _globals['_TRAINRESPONSE']._serialized_start=566
-  _globals['_TRAINRESPONSE']._serialized_end=703
-  _globals['_TRAINRESPONSE_METRICSENTRY']._serialized_start=657
-  _globals['_TRAINRESPONSE_METRICSENTRY']._serialized_end=703
-  _globals['_PREDICTREQUEST']._serialized_start=705
-  _globals['_PREDICTREQUEST']._serialized_end=775
-  _globals['_PREDICTRESPONSE']._serialized_start=777
-  _globals['_PREDICTRESPONSE']._serialized_end=815
-  _globals['_MODELID']._serialized_start=817
-  _globals['_MODELID']._serialized_end=844
-  _globals['_RETRAINREQUEST']._serialized_start=846
-  _globals['_RETRAINREQUEST']._serialized_end=927
-  _globals['_RETRAINRESPONSE']._serialized_start=929
-  _globals['_RETRAINRESPONSE']._serialized_end=1052
-  _globals['_RETRAINRESPONSE_METRICSENTRY']._serialized_start=657
-  _globals['_RETRAINRESPONSE_METRICSENTRY']._serialized_end=703
-  _globals['_METRICSRESPONSE']._serialized_start=1054
-  _globals['_METRICSRESPONSE']._serialized_end=1177
-  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_start=657
-  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_end=703
-  _globals['_MODELRESPONSE']._serialized_start=1180
-  _globals['_MODELRESPONSE']._serialized_end=1452
-  _globals['_MODELRESPONSE_PARAMSENTRY']._serialized_start=484
-  _globals['_MODELRESPONSE_PARAMSENTRY']._serialized_end=529
-  _globals['_MODELRESPONSE_METRICSENTRY']._serialized_start=657
-  _globals['_MODELRESPONSE_METRICSENTRY']._serialized_end=703
-  _globals['_LISTMODELSRESPONSE']._serialized_start=1454
-  _globals['_LISTMODELSRESPONSE']._serialized_end=1516
-  _globals['_DELETERESPONSE']._serialized_start=1518
-  _globals['_DELETERESPONSE']._serialized_end=1551
-  _globals['_MLSERVICE']._serialized_start=1554
-  _globals['_MLSERVICE']._serialized_end=2150
+  _globals['_MODELCLASSINFO']._serialized_end=366
+  _globals['_TRAINREQUEST']._serialized_start=369
+  _globals['_TRAINREQUEST']._serialized_end=673
+  _globals['_TRAINREQUEST_PARAMSENTRY']._serialized_start=628
+  _globals['_TRAINREQUEST_PARAMSENTRY']._serialized_end=673
+  _globals['_EVALUATIONCONFIG']._serialized_start=675
+  _globals['_EVALUATIONCONFIG']._serialized_end=757
+  _globals['_FEATUREARRAY']._serialized_start=759
+  _globals['_FEATUREARRAY']._serialized_end=791
+  _globals['_TENSOR']._serialized_start=793
+  _globals['_TENSOR']._serialized_end=861
+  _globals['_TRAINCHUNK']._serialized_start=864
+  _globals['_TRAINCHUNK']._serialized_end=1122
+  _globals['_TRAINCHUNK_PARAMSENTRY']._serialized_start=628
+  _globals['_TRAINCHUNK_PARAMSENTRY']._serialized_end=673
+  _globals['_TRAINRESPONSE']._serialized_start=1125
+  _globals['_TRAINRESPONSE']._serialized_end=1262
+  _globals['_TRAINRESPONSE_METRICSENTRY']._serialized_start=1216
+  _globals['_TRAINRESPONSE_METRICSENTRY']._serialized_end=1262
+  _globals['_PREDICTREQUEST']._serialized_start=1265
+  _globals['_PREDICTREQUEST']._serialized_end=1397
+  _globals['_PREDICTRESPONSE']._serialized_start=1399
+  _globals['_PREDICTRESPONSE']._serialized_end=1489
+  _globals['_PREDICTCHUNK']._serialized_start=1491
+  _globals['_PREDICTCHUNK']._serialized_end=1567
+  _globals['_PREDICTCHUNKRESULT']._serialized_start=1569
+  _globals['_PREDICTCHUNKRESULT']._serialized_end=1686
+  _globals['_MODELID']._serialized_start=1688
+  _globals['_MODELID']._serialized_end=1715
+  _globals['_RETRAINREQUEST']._serialized_start=1718
+  _globals['_RETRAINREQUEST']._serialized_end=1920
+  _globals['_RETRAINRESPONSE']._serialized_start=1922
+  _globals['_RETRAINRESPONSE']._serialized_end=2045
+  _globals['_RETRAINRESPONSE_METRICSENTRY']._serialized_start=1216
+  _globals['_RETRAINRESPONSE_METRICSENTRY']._serialized_end=1262
+  _globals['_METRICSRESPONSE']._serialized_start=2047
+  _globals['_METRICSRESPONSE']._serialized_end=2170
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_start=1216
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_end=1262
+  _globals['_MODELRESPONSE']._serialized_start=2173
+  _globals['_MODELRESPONSE']._serialized_end=2445
+  _globals['_MODELRESPONSE_PARAMSENTRY']._serialized_start=628
+  _globals['_MODELRESPONSE_PARAMSENTRY']._serialized_end=673
+  _globals['_MODELRESPONSE_METRICSENTRY']._serialized_start=1216
+  _globals['_MODELRESPONSE_METRICSENTRY']._serialized_end=1262
+  _globals['_LISTMODELSREQUEST']._serialized_start=2448
+  _globals['_LISTMODELSREQUEST']._serialized_end=2617
+  _globals['_LISTMODELSRESPONSE']._serialized_start=2619
+  _globals['_LISTMODELSRESPONSE']._serialized_end=2702
+  _globals['_LEADERBOARDREQUEST']._serialized_start=2704
+  _globals['_LEADERBOARDREQUEST']._serialized_end=2790
+  _globals['_LEADERBOARDENTRY']._serialized_start=2792
+  _globals['_LEADERBOARDENTRY']._serialized_end=2877
+  _globals['_LEADERBOARDRESPONSE']._serialized_start=2879
+  _globals['_LEADERBOARDRESPONSE']._serialized_end=2961
+  _globals['_DELETERESPONSE']._serialized_start=2963
+  _globals['_DELETERESPONSE']._serialized_end=2996
+  _globals['_JOBID']._serialized_start=2998
+  _globals['_JOBID']._serialized_end=3021
+  _globals['_JOBRESPONSE']._serialized_start=3024
+  _globals['_JOBRESPONSE']._serialized_end=3303
+  _globals['_JOBRESPONSE_METRICSENTRY']._serialized_start=1216
+  _globals['_JOBRESPONSE_METRICSENTRY']._serialized_end=1262
+  _globals['_PREDICTSTATSRESPONSE']._serialized_start=3306
+  _globals['_PREDICTSTATSRESPONSE']._serialized_end=3459
+  _globals['_PREDICTSTATSRESPONSE_STATSENTRY']._serialized_start=3415
+  _globals['_PREDICTSTATSRESPONSE_STATSENTRY']._serialized_end=3459
+  _globals['_PARAMVALUES']._serialized_start=3461
+  _globals['_PARAMVALUES']._serialized_end=3547
+  _globals['_SEARCHCONFIG']._serialized_start=3550
+  _globals['_SEARCHCONFIG']._serialized_end=3796
+  _globals['_SEARCHCONFIG_PARAMSPACEENTRY']._serialized_start=3723
+  _globals['_SEARCHCONFIG_PARAMSPACEENTRY']._serialized_end=3796
+  _globals['_SEARCHREQUEST']._serialized_start=3799
+  _globals['_SEARCHREQUEST']._serialized_end=4097
+  _globals['_SEARCHREQUEST_PARAMSENTRY']._serialized_start=628
+  _globals['_SEARCHREQUEST_PARAMSENTRY']._serialized_end=673
+  _globals['_SEARCHTRIAL']._serialized_start=4100
+  _globals['_SEARCHTRIAL']._serialized_end=4344
+  _globals['_SEARCHTRIAL_PARAMSENTRY']._serialized_start=628
+  _globals['_SEARCHTRIAL_PARAMSENTRY']._serialized_end=673
+  _globals['_SEARCHRESPONSE']._serialized_start=4347
+  _globals['_SEARCHRESPONSE']._serialized_end=4699
+  _globals['_SEARCHRESPONSE_BESTPARAMSENTRY']._serialized_start=4602
+  _globals['_SEARCHRESPONSE_BESTPARAMSENTRY']._serialized_end=4651
+  _globals['_SEARCHRESPONSE_METRICSENTRY']._serialized_start=1216
+  _globals['_SEARCHRESPONSE_METRICSENTRY']._serialized_end=1262
+  _globals['_MLSERVICE']._serialized_start=4702
+  _globals['_MLSERVICE']._serialized_end=5863
 # @@protoc_insertion_point(module_scope)
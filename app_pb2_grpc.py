@@ -50,11 +50,21 @@ class MLServiceStub(object):
                 request_serializer=app__pb2.Empty.SerializeToString,
                 response_deserializer=app__pb2.ListModelsResponse.FromString,
                 _registered_method=True)
+        self.ListModelsPage = channel.unary_unary(
+                '/mlservice.MLService/ListModelsPage',
+                request_serializer=app__pb2.ListModelsRequest.SerializeToString,
+                response_deserializer=app__pb2.ListModelsResponse.FromString,
+                _registered_method=True)
         self.TrainModel = channel.unary_unary(
                 '/mlservice.MLService/TrainModel',
                 request_serializer=app__pb2.TrainRequest.SerializeToString,
                 response_deserializer=app__pb2.TrainResponse.FromString,
                 _registered_method=True)
+        self.TrainModelStream = channel.stream_unary(
+                '/mlservice.MLService/TrainModelStream',
+                request_serializer=app__pb2.TrainChunk.SerializeToString,
+                response_deserializer=app__pb2.TrainResponse.FromString,
+                _registered_method=True)
         self.GetModel = channel.unary_unary(
                 '/mlservice.MLService/GetModel',
                 request_serializer=app__pb2.ModelId.SerializeToString,
@@ -70,6 +80,11 @@ class MLServiceStub(object):
                 request_serializer=app__pb2.PredictRequest.SerializeToString,
                 response_deserializer=app__pb2.PredictResponse.FromString,
                 _registered_method=True)
+        self.PredictStream = channel.stream_stream(
+                '/mlservice.MLService/PredictStream',
+                request_serializer=app__pb2.PredictChunk.SerializeToString,
+                response_deserializer=app__pb2.PredictChunkResult.FromString,
+                _registered_method=True)
         self.RetrainModel = channel.unary_unary(
                 '/mlservice.MLService/RetrainModel',
                 request_serializer=app__pb2.RetrainRequest.SerializeToString,
@@ -80,6 +95,31 @@ class MLServiceStub(object):
                 request_serializer=app__pb2.ModelId.SerializeToString,
                 response_deserializer=app__pb2.MetricsResponse.FromString,
                 _registered_method=True)
+        self.SubmitTrainJob = channel.unary_unary(
+                '/mlservice.MLService/SubmitTrainJob',
+                request_serializer=app__pb2.TrainRequest.SerializeToString,
+                response_deserializer=app__pb2.JobResponse.FromString,
+                _registered_method=True)
+        self.GetJob = channel.unary_unary(
+                '/mlservice.MLService/GetJob',
+                request_serializer=app__pb2.JobId.SerializeToString,
+                response_deserializer=app__pb2.JobResponse.FromString,
+                _registered_method=True)
+        self.GetPredictStats = channel.unary_unary(
+                '/mlservice.MLService/GetPredictStats',
+                request_serializer=app__pb2.Empty.SerializeToString,
+                response_deserializer=app__pb2.PredictStatsResponse.FromString,
+                _registered_method=True)
+        self.SearchModel = channel.unary_unary(
+                '/mlservice.MLService/SearchModel',
+                request_serializer=app__pb2.SearchRequest.SerializeToString,
+                response_deserializer=app__pb2.SearchResponse.FromString,
+                _registered_method=True)
+        self.GetLeaderboard = channel.unary_unary(
+                '/mlservice.MLService/GetLeaderboard',
+                request_serializer=app__pb2.LeaderboardRequest.SerializeToString,
+                response_deserializer=app__pb2.LeaderboardResponse.FromString,
+                _registered_method=True)
 
 
 class MLServiceServicer(object):
@@ -104,12 +144,24 @@ class MLServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListModelsPage(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def TrainModel(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def TrainModelStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def GetModel(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -128,6 +180,12 @@ class MLServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def PredictStream(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def RetrainModel(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -140,6 +198,36 @@ class MLServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SubmitTrainJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetJob(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetPredictStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SearchModel(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetLeaderboard(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_MLServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -158,11 +246,21 @@ def add_MLServiceServicer_to_server(servicer, server):
                     request_deserializer=app__pb2.Empty.FromString,
                     response_serializer=app__pb2.ListModelsResponse.SerializeToString,
             ),
+            'ListModelsPage': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListModelsPage,
+                    request_deserializer=app__pb2.ListModelsRequest.FromString,
+                    response_serializer=app__pb2.ListModelsResponse.SerializeToString,
+            ),
             'TrainModel': grpc.unary_unary_rpc_method_handler(
                     servicer.TrainModel,
                     request_deserializer=app__pb2.TrainRequest.FromString,
                     response_serializer=app__pb2.TrainResponse.SerializeToString,
             ),
+            'TrainModelStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.TrainModelStream,
+                    request_deserializer=app__pb2.TrainChunk.FromString,
+                    response_serializer=app__pb2.TrainResponse.SerializeToString,
+            ),
             'GetModel': grpc.unary_unary_rpc_method_handler(
                     servicer.GetModel,
                     request_deserializer=app__pb2.ModelId.FromString,
@@ -178,6 +276,11 @@ def add_MLServiceServicer_to_server(servicer, server):
                     request_deserializer=app__pb2.PredictRequest.FromString,
                     response_serializer=app__pb2.PredictResponse.SerializeToString,
             ),
+            'PredictStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.PredictStream,
+                    request_deserializer=app__pb2.PredictChunk.FromString,
+                    response_serializer=app__pb2.PredictChunkResult.SerializeToString,
+            ),
             'RetrainModel': grpc.unary_unary_rpc_method_handler(
                     servicer.RetrainModel,
                     request_deserializer=app__pb2.RetrainRequest.FromString,
@@ -188,6 +291,31 @@ def add_MLServiceServicer_to_server(servicer, server):
                     request_deserializer=app__pb2.ModelId.FromString,
                     response_serializer=app__pb2.MetricsResponse.SerializeToString,
             ),
+            'SubmitTrainJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitTrainJob,
+                    request_deserializer=app__pb2.TrainRequest.FromString,
+                    response_serializer=app__pb2.JobResponse.SerializeToString,
+            ),
+            'GetJob': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetJob,
+                    request_deserializer=app__pb2.JobId.FromString,
+                    response_serializer=app__pb2.JobResponse.SerializeToString,
+            ),
+            'GetPredictStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetPredictStats,
+                    request_deserializer=app__pb2.Empty.FromString,
+                    response_serializer=app__pb2.PredictStatsResponse.SerializeToString,
+            ),
+            'SearchModel': grpc.unary_unary_rpc_method_handler(
+                    servicer.SearchModel,
+                    request_deserializer=app__pb2.SearchRequest.FromString,
+                    response_serializer=app__pb2.SearchResponse.SerializeToString,
+            ),
+            'GetLeaderboard': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetLeaderboard,
+                    request_deserializer=app__pb2.LeaderboardRequest.FromString,
+                    response_serializer=app__pb2.LeaderboardResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'mlservice.MLService', rpc_method_handlers)
@@ -281,6 +409,33 @@ class MLService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ListModelsPage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mlservice.MLService/ListModelsPage',
+            app__pb2.ListModelsRequest.SerializeToString,
+            app__pb2.ListModelsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def TrainModel(request,
             target,
@@ -308,6 +463,33 @@ class MLService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def TrainModelStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/mlservice.MLService/TrainModelStream',
+            app__pb2.TrainChunk.SerializeToString,
+            app__pb2.TrainResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def GetModel(request,
             target,
@@ -389,6 +571,33 @@ class MLService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def PredictStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/mlservice.MLService/PredictStream',
+            app__pb2.PredictChunk.SerializeToString,
+            app__pb2.PredictChunkResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def RetrainModel(request,
             target,
@@ -442,3 +651,138 @@ class MLService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SubmitTrainJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mlservice.MLService/SubmitTrainJob',
+            app__pb2.TrainRequest.SerializeToString,
+            app__pb2.JobResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetJob(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mlservice.MLService/GetJob',
+            app__pb2.JobId.SerializeToString,
+            app__pb2.JobResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetPredictStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mlservice.MLService/GetPredictStats',
+            app__pb2.Empty.SerializeToString,
+            app__pb2.PredictStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SearchModel(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mlservice.MLService/SearchModel',
+            app__pb2.SearchRequest.SerializeToString,
+            app__pb2.SearchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetLeaderboard(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/mlservice.MLService/GetLeaderboard',
+            app__pb2.LeaderboardRequest.SerializeToString,
+            app__pb2.LeaderboardResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
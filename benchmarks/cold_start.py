@@ -0,0 +1,153 @@
+"""
+Бенчмарк холодного старта серверов.
+
+Измеряются:
+  - import_<module> — время импорта app и grpc_server в новом процессе;
+  - ready_<server> — время от запуска процесса до первого успешного ответа
+    GET /health (gunicorn, один воркер, без предзагрузки моделей) или
+    HealthCheck (потоковый и asyncio gRPC серверы).
+Каждый замер повторяется --repeat раз, берется медиана. Серверы запускаются со
+своей временной БД. Результат можно сохранить (--output) и сравнить с ранее
+сохраненным (--baseline): если какая-либо метрика хуже базовой больше чем на
+--tolerance, скрипт завершается с кодом 1 — так время старта отслеживается
+как регрессионная метрика.
+
+Запуск из корня репозитория:
+    python -m benchmarks.cold_start --repeat 5 --output cold_start.json
+    python -m benchmarks.cold_start --baseline cold_start.json --tolerance 0.2
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+import http.client
+import urllib.request
+
+import grpc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import app_pb2  # noqa: E402
+import app_pb2_grpc  # noqa: E402
+
+IMPORTS = ['app', 'grpc_server']
+SERVERS = ['gunicorn', 'grpc_threaded', 'grpc_asyncio']
+
+
+def measure_import(module):
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def server_command(server, port):
+    if server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'], {
+            'REST_BIND': f'127.0.0.1:{port}', 'REST_WORKERS': '1', 'REST_PRELOAD_LATEST': '0'
+        }
+    script = 'grpc_server.py' if server == 'grpc_threaded' else 'grpc_aio_server.py'
+    return [sys.executable, script], {'GRPC_PORT': str(port)}
+
+
+def probe(server, port):
+    """Один запрос проверки здоровья; True, если сервер ответил успешно"""
+    if server == 'gunicorn':
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1) as response:
+                return response.status == 200
+        except (OSError, http.client.HTTPException):
+            return False
+    with grpc.insecure_channel(f'127.0.0.1:{port}') as channel:
+        try:
+            app_pb2_grpc.MLServiceStub(channel).HealthCheck(app_pb2.HealthRequest(), timeout=1)
+            return True
+        except grpc.RpcError:
+            return False
+
+
+def measure_ready(server, port, tmp, timeout):
+    command, extra_env = server_command(server, port)
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, f'{server}_{port}.db')}", **extra_env)
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"{server} exited with code {process.returncode} before becoming ready")
+            if probe(server, port):
+                return time.perf_counter() - start
+            time.sleep(0.02)
+        raise RuntimeError(f"{server} did not become ready in {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def compare(results, baseline, tolerance):
+    """Печатает сравнение с базовыми значениями; возвращает список регрессий"""
+    regressions = []
+    for name, value in results.items():
+        if name not in baseline:
+            continue
+        change = value / baseline[name] - 1
+        regressed = change > tolerance
+        print(f"{name:<22}{baseline[name]:>10.3f}{value:>10.3f}{change * 100:>+9.1f}%{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--imports', nargs='*', choices=IMPORTS, default=IMPORTS)
+    parser.add_argument('--servers', nargs='*', choices=SERVERS, default=SERVERS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=60.0, help='seconds to wait for a server')
+    parser.add_argument('--port', type=int, default=50100)
+    parser.add_argument('--output', help='save results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'metric':<22}{'median s':>10}{'min s':>10}{'max s':>10}")
+    for module in args.imports:
+        samples = [measure_import(module) for _ in range(args.repeat)]
+        results[f'import_{module}'] = statistics.median(samples)
+        print(f"{'import_' + module:<22}{statistics.median(samples):>10.3f}{min(samples):>10.3f}{max(samples):>10.3f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, server in enumerate(args.servers):
+            # Каждый запуск на своем порту: старый сокет мог еще не освободиться
+            samples = [measure_ready(server, args.port + i * args.repeat + r, tmp, args.timeout)
+                       for r in range(args.repeat)]
+            results[f'ready_{server}'] = statistics.median(samples)
+            print(f"{'ready_' + server:<22}{statistics.median(samples):>10.3f}{min(samples):>10.3f}{max(samples):>10.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\n{'metric':<22}{'baseline':>10}{'current':>10}{'change':>10}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Cold start regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Масштабирование pre-fork режима (grpc_supervisor.py) по числу процессов.
+
+Для каждого значения --workers запускается супервизор со своей временной БД,
+обучается модель, после чего --clients клиентских процессов (каждый со своими
+соединениями — SO_REUSEPORT распределяет по процессам именно соединения)
+отправляют Predict в течение --duration секунд. Печатаются пропускная
+способность, ускорение относительно первого значения и p50/p99 задержки.
+Клиенты работают на той же машине, поэтому для честного сравнения нагрузка
+на сервер (--rows, --n-estimators) должна заметно превышать стоимость клиента.
+
+Запуск из корня репозитория:
+    python -m benchmarks.grpc_scaling --workers 1 2 4 --clients 8 --duration 10
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+import grpc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_pb2  # noqa: E402
+import app_pb2_grpc  # noqa: E402
+
+# Отдельный пул подканалов: иначе каналы одного процесса делят одно соединение
+CHANNEL_OPTIONS = [('grpc.use_local_subchannel_pool', 1)]
+
+
+def start_supervisor(workers, port, tmp):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, GRPC_WORKERS=str(workers), GRPC_PORT=str(port),
+               DATABASE_URL=f"sqlite:///{os.path.join(tmp, f'scaling_{workers}.db')}")
+    return subprocess.Popen([sys.executable, 'grpc_supervisor.py'], cwd=root, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def train(port, args):
+    rng = np.random.default_rng(0)
+    X = rng.random((5000, args.n_features))
+    y = (X[:, 0] + X[:, 1] > 1).astype(int)
+    with grpc.insecure_channel(f'127.0.0.1:{port}') as channel:
+        grpc.channel_ready_future(channel).result(timeout=60)
+        stub = app_pb2_grpc.MLServiceStub(channel)
+        response = stub.TrainModel(app_pb2.TrainRequest(
+            model_type='random_forest', params={'n_estimators': str(args.n_estimators)},
+            X=[app_pb2.FeatureArray(features=row) for row in X.tolist()], y=y.tolist()
+        ))
+    return response.model_id, X[:args.rows]
+
+
+async def _client(port, request, concurrency, warmup, duration):
+    # Каждая корутина — свое соединение, чтобы нагрузка распределялась по процессам
+    channels = [grpc.aio.insecure_channel(f'127.0.0.1:{port}', options=CHANNEL_OPTIONS) for _ in range(concurrency)]
+    latencies = []
+    errors = 0
+    measure_from = time.perf_counter() + warmup
+    deadline = measure_from + duration
+
+    async def loop(channel):
+        nonlocal errors
+        stub = app_pb2_grpc.MLServiceStub(channel)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await stub.Predict(request, timeout=10)
+            except grpc.RpcError:
+                errors += 1
+                continue
+            if start >= measure_from:
+                latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*[loop(channel) for channel in channels])
+    for channel in channels:
+        await channel.close()
+    return latencies, errors
+
+
+def client_process(port, request_bytes, concurrency, warmup, duration):
+    request = app_pb2.PredictRequest.FromString(request_bytes)
+    return asyncio.run(_client(port, request, concurrency, warmup, duration))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    cores = os.cpu_count() or 1
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, max(1, cores // 2), cores}))
+    parser.add_argument('--clients', type=int, default=cores, help='client processes')
+    parser.add_argument('--concurrency', type=int, default=4, help='connections per client process')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=3.0)
+    parser.add_argument('--rows', type=int, default=100, help='rows per Predict request')
+    parser.add_argument('--n-features', type=int, default=20)
+    parser.add_argument('--n-estimators', type=int, default=200)
+    parser.add_argument('--port', type=int, default=50095)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>9}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    baseline = None
+    ctx = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, workers in enumerate(args.workers):
+            port = args.port + i
+            supervisor = start_supervisor(workers, port, tmp)
+            try:
+                model_id, X = train(port, args)
+                request = app_pb2.PredictRequest(
+                    model_id=model_id, X=[app_pb2.FeatureArray(features=row) for row in X.tolist()]
+                ).SerializeToString()
+                with ctx.Pool(args.clients) as pool:
+                    results = pool.starmap(client_process, [
+                        (port, request, args.concurrency, args.warmup, args.duration)
+                    ] * args.clients)
+            finally:
+                supervisor.terminate()
+                supervisor.wait(timeout=60)
+
+            latencies = np.concatenate([np.asarray(r[0]) for r in results])
+            errors = sum(r[1] for r in results)
+            throughput = len(latencies) / args.duration
+            baseline = baseline or throughput
+            p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if len(latencies) else (float('nan'),) * 2
+            print(f"{workers:>8}{throughput:>10.1f}{throughput / baseline:>9.2f}{p50:>10.2f}{p99:>10.2f}{errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
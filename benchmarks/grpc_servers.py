@@ -0,0 +1,139 @@
+"""
+Бенчмарк gRPC серверов: потоковый grpc_server.py против asyncio grpc_aio_server.py.
+
+Каждый сервер запускается отдельным процессом со своей временной БД. Клиент
+(grpc.aio, один процесс) обучает модель и в двух фазах держит заданное число
+одновременных запросов:
+  - predict — только Predict по одной строке;
+  - predict+train — Predict и HealthCheck на фоне нескольких долгих TrainModel.
+Для каждого типа запроса печатаются пропускная способность, p50 и p99 задержки
+и число ошибок (включая превышение дедлайна).
+
+Запуск из корня репозитория:
+    python -m benchmarks.grpc_servers --duration 10 --concurrency 16 --trainings 5
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import grpc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_pb2  # noqa: E402
+import app_pb2_grpc  # noqa: E402
+
+SERVERS = {
+    'threaded': 'grpc_server.py',
+    'asyncio': 'grpc_aio_server.py',
+}
+
+
+def start_server(script, port, tmp):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, GRPC_PORT=str(port), DATABASE_URL=f"sqlite:///{os.path.join(tmp, script)}.db")
+    return subprocess.Popen([sys.executable, script], cwd=root, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def rows(X):
+    return [app_pb2.FeatureArray(features=row) for row in X.tolist()]
+
+
+async def load(stub, kind, request, concurrency, duration, timeout):
+    """concurrency клиентов в цикле отправляют запрос kind; возвращает задержки и число ошибок"""
+    call = getattr(stub, kind)
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await call(request, timeout=timeout)
+                latencies.append(time.perf_counter() - start)
+            except grpc.RpcError:
+                errors += 1
+
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    return latencies, errors
+
+
+def report(server, phase, kind, latencies, errors, duration):
+    if latencies:
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    else:
+        p50 = p99 = float('nan')
+    print(f"{server:<10}{phase:<15}{kind:<13}{len(latencies) / duration:>10.1f}{p50:>10.2f}{p99:>10.2f}{errors:>8}")
+
+
+async def bench_server(server, port, args):
+    rng = np.random.default_rng(0)
+    X = rng.random((args.train_rows, args.n_features))
+    y = (X[:, 0] + X[:, 1] > 1).astype(int)
+    train_request = app_pb2.TrainRequest(model_type='random_forest', params={'n_estimators': str(args.n_estimators)},
+                                         X=rows(X), y=y.tolist())
+    predict_rows = rows(X[:1])
+
+    async with grpc.aio.insecure_channel(f'127.0.0.1:{port}') as channel:
+        await asyncio.wait_for(channel.channel_ready(), timeout=60)
+        stub = app_pb2_grpc.MLServiceStub(channel)
+
+        model_id = (await stub.TrainModel(app_pb2.TrainRequest(
+            model_type='random_forest', params={'n_estimators': '50'}, X=rows(X[:2000]), y=y[:2000].tolist()
+        ))).model_id
+        predict_request = app_pb2.PredictRequest(model_id=model_id, X=predict_rows)
+        health_request = app_pb2.HealthRequest()
+
+        # Прогрев: загрузка модели в кэш (и в процессы пула предсказаний)
+        await load(stub, 'Predict', predict_request, args.concurrency, 2, args.timeout)
+
+        latencies, errors = await load(stub, 'Predict', predict_request, args.concurrency, args.duration, args.timeout)
+        report(server, 'predict', 'Predict', latencies, errors, args.duration)
+
+        trainings = [asyncio.ensure_future(stub.TrainModel(train_request)) for _ in range(args.trainings)]
+        await asyncio.sleep(0.5)
+        (predict_latencies, predict_errors), (health_latencies, health_errors) = await asyncio.gather(
+            load(stub, 'Predict', predict_request, args.concurrency, args.duration, args.timeout),
+            load(stub, 'HealthCheck', health_request, max(1, args.concurrency // 4), args.duration, args.timeout),
+        )
+        report(server, 'predict+train', 'Predict', predict_latencies, predict_errors, args.duration)
+        report(server, 'predict+train', 'HealthCheck', health_latencies, health_errors, args.duration)
+        # Дожидаемся обучения, чтобы следующий сервер измерялся на свободной машине
+        await asyncio.gather(*trainings, return_exceptions=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per phase')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--trainings', type=int, default=5, help='background TrainModel calls')
+    parser.add_argument('--train-rows', type=int, default=20000)
+    parser.add_argument('--n-features', type=int, default=20)
+    parser.add_argument('--n-estimators', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=5.0, help='per-request deadline, seconds')
+    parser.add_argument('--port', type=int, default=50090)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'server':<10}{'phase':<15}{'rpc':<13}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for i, server in enumerate(args.servers):
+            port = args.port + i
+            process = start_server(SERVERS[server], port, tmp)
+            try:
+                asyncio.run(bench_server(server, port, args))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
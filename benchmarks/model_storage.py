@@ -0,0 +1,119 @@
+"""
+Бенчмарк режимов хранения моделей: обычная загрузка (pickle) против mmap.
+
+Обучает случайный лес и логистическую регрессию, сохраняет их через
+models.save_model и запускает несколько процессов, каждый из которых загружает
+артефакт так же, как это делают app.py и grpc_server.py. Для каждого процесса
+замеряются время загрузки и память (RSS, PSS и разделяемые страницы из
+/proc/self/smaps_rollup, доступно только на Linux).
+
+Запуск из корня репозитория:
+    python -m benchmarks.model_storage --processes 4 --n-estimators 200
+"""
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+
+from models import save_model  # noqa: E402
+
+WORKER_CODE = """
+import os, sys, time
+os.environ['MODEL_STORAGE_MODE'] = sys.argv[2]
+import numpy as np
+from models import load_model
+
+def memory():
+    fields = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ('Rss:', 'Pss:', 'Shared_Clean:'):
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        pass
+    return fields
+
+before = memory()
+start = time.perf_counter()
+model = load_model(sys.argv[1])
+model.predict(np.load(sys.argv[3]))
+elapsed = time.perf_counter() - start
+after = memory()
+print(elapsed, after.get('Rss', 0) - before.get('Rss', 0), after.get('Pss', 0) - before.get('Pss', 0),
+      after.get('Shared_Clean', 0) - before.get('Shared_Clean', 0))
+sys.stdout.flush()
+# Держим процесс живым, пока остальные не загрузят модель
+sys.stdin.read()
+"""
+
+
+def build_models(n_samples, n_features, n_estimators):
+    rng = np.random.default_rng(0)
+    X = rng.random((n_samples, n_features))
+    y = (X[:, 0] + X[:, 1] > 1).astype(int) + (X[:, 2] > 0.5).astype(int)
+    forest = RandomForestClassifier(n_estimators=n_estimators, random_state=0, n_jobs=-1).fit(X, y)
+    # Много классов и признаков, чтобы матрица коэффициентов была заметной
+    wide_X = rng.random((n_samples, n_features * 50))
+    wide_y = rng.integers(0, 50, n_samples)
+    logreg = LogisticRegression(max_iter=20).fit(wide_X, wide_y)
+    return {'random_forest': (forest, X[:100]), 'logistic_regression': (logreg, wide_X[:100])}
+
+
+def run_processes(path, sample_path, mode, processes):
+    """Запускает процессы-загрузчики одновременно и собирает их замеры"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workers = [
+        subprocess.Popen(
+            [sys.executable, '-c', WORKER_CODE, path, mode, sample_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=root,
+        )
+        for _ in range(processes)
+    ]
+    results = []
+    for worker in workers:
+        results.append([float(v) for v in worker.stdout.readline().split()])
+    for worker in workers:
+        worker.stdin.close()
+        worker.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--n-samples', type=int, default=20000)
+    parser.add_argument('--n-features', type=int, default=20)
+    parser.add_argument('--n-estimators', type=int, default=200)
+    args = parser.parse_args()
+
+    models = build_models(args.n_samples, args.n_features, args.n_estimators)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'model':<22}{'mode':<8}{'size MB':>9}{'load s':>9}{'RSS MB':>9}{'PSS MB':>9}{'shared MB':>11}")
+        for name, (model, sample) in models.items():
+            path = os.path.join(tmp, f"{name}.joblib")
+            sample_path = os.path.join(tmp, f"{name}_sample.npy")
+            save_model(model, path)
+            np.save(sample_path, sample)
+            size_mb = os.path.getsize(path) / 2 ** 20
+            for mode in ('pickle', 'mmap'):
+                # Прогреваем page cache, чтобы сравнение не зависело от диска
+                with open(path, 'rb') as f:
+                    while f.read(1 << 20):
+                        pass
+                results = np.array(run_processes(path, sample_path, mode, args.processes))
+                load_s, rss, pss, shared = results.mean(axis=0)
+                print(f"{name:<22}{mode:<8}{size_mb:>9.1f}{load_s:>9.3f}{rss / 1024:>9.1f}"
+                      f"{pss / 1024:>9.1f}{shared / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
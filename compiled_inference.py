@@ -0,0 +1,183 @@
+import os
+import logging
+
+import numpy as np
+
+logger = logging.getLogger('compiled_inference')
+logger.setLevel(logging.INFO)
+
+# Использовать ли скомпилированную форму моделей для предсказаний
+COMPILED_INFERENCE = os.getenv('COMPILED_INFERENCE', '1') == '1'
+# С какого размера пачки лес считается исходной моделью sklearn: векторный
+# спуск на numpy выигрывает на малых пачках, где основное время — накладные расходы
+COMPILED_MAX_ROWS = int(os.getenv('COMPILED_MAX_ROWS', 128))
+
+
+def _check_features(X, n_features):
+    if X.ndim != 2:
+        raise ValueError(f"Expected 2D array, got {X.ndim}D array instead")
+    if X.shape[1] != n_features:
+        raise ValueError(f"X has {X.shape[1]} features, but model is expecting {n_features} features as input")
+
+
+class CompiledForest:
+    """Случайный лес в виде плоских массивов узлов всех деревьев.
+
+    Узлы деревьев лежат подряд в общих массивах (roots — индекс корня каждого
+    дерева, children — пары потомков узла), поэтому спуск по всем деревьям для
+    всех объектов выполняется векторно: один шаг цикла продвигает все пары
+    (объект, дерево) на уровень вниз, дошедшие до листа пары выбывают.
+    Порядок вычислений повторяет sklearn: признаки в float32, сравнение с
+    порогами в float64, вероятности листьев суммируются по деревьям
+    последовательно — предсказания совпадают побитно.
+
+    Пачки больше COMPILED_MAX_ROWS передаются исходной модели, если задан
+    fallback (функция, возвращающая ее). Сама модель на объекте не хранится:
+    ModelCache загружает ее под отдельным ключом и учитывает ее размер.
+    """
+
+    def __init__(self, classes, n_features, roots, feature, threshold, children, missing_left, leaf_proba):
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.missing_left = missing_left
+        self.leaf_proba = leaf_proba
+        self.fallback = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['fallback'] = None
+        return state
+
+    @classmethod
+    def from_model(cls, model):
+        features, thresholds, children, missing, probas, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            # Лист ссылается сам на себя
+            own = np.arange(offset, offset + n_nodes)
+            children.append(np.column_stack([
+                np.where(is_leaf, own, tree.children_left + offset),
+                np.where(is_leaf, own, tree.children_right + offset),
+            ]).ravel())
+            missing.append(getattr(tree, 'missing_go_to_left', np.zeros(n_nodes, dtype=np.uint8)).astype(bool))
+            # В value классификатора уже хранятся доли классов в листе
+            probas.append(tree.value[:, 0, :model.n_classes_])
+            offset += n_nodes
+        return cls(
+            classes=model.classes_,
+            n_features=model.n_features_in_,
+            roots=np.asarray(roots, dtype=np.int64),
+            feature=np.concatenate(features).astype(np.int64),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children=np.concatenate(children).astype(np.int64),
+            missing_left=np.concatenate(missing),
+            leaf_proba=np.ascontiguousarray(np.concatenate(probas)),
+        )
+
+    def apply(self, X):
+        """Индексы листьев для каждой пары (объект, дерево)"""
+        X = np.asarray(X, dtype=np.float32)
+        _check_features(X, self.n_features_in_)
+        n_samples, n_trees = len(X), len(self.roots)
+        flat_X = np.ascontiguousarray(X).ravel()
+        leaves = np.tile(self.roots, n_samples)
+        pending = np.arange(n_samples * n_trees)
+        nodes = leaves.copy()
+        row_offsets = np.repeat(np.arange(n_samples, dtype=np.int64) * self.n_features_in_, n_trees)
+        # Корень-лист (дерево из одного узла) сразу выбывает
+        done = self.children[2 * nodes] == nodes
+        while len(pending):
+            if done.any():
+                leaves[pending[done]] = nodes[done]
+                keep = ~done
+                pending, nodes, row_offsets = pending[keep], nodes[keep], row_offsets[keep]
+                if not len(pending):
+                    break
+            values = flat_X[row_offsets + self.feature[nodes]]
+            go_right = ~(values <= self.threshold[nodes])
+            nan = np.isnan(values)
+            if nan.any():
+                go_right = np.where(nan, ~self.missing_left[nodes], go_right)
+            nodes = self.children[2 * nodes + go_right]
+            done = self.children[2 * nodes] == nodes
+        return leaves.reshape(n_samples, n_trees)
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.leaf_proba.shape[1]), dtype=np.float64)
+        for t in range(leaves.shape[1]):
+            proba += self.leaf_proba[leaves[:, t]]
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X):
+        if self.fallback is not None and len(X) > COMPILED_MAX_ROWS:
+            return self.fallback().predict(X)
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.roots, self.feature, self.threshold, self.children,
+                                      self.missing_left, self.leaf_proba))
+
+
+class CompiledLinear:
+    """Линейный классификатор как матрица коэффициентов: X @ coef.T + intercept и argmax"""
+
+    def __init__(self, classes, coef, intercept):
+        self.classes_ = classes
+        self.coef = coef
+        self.intercept = intercept
+        self.n_features_in_ = coef.shape[1]
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(classes=model.classes_, coef=np.asarray(model.coef_), intercept=np.asarray(model.intercept_))
+
+    def decision_function(self, X):
+        X = np.asarray(X)
+        if X.dtype.kind not in 'fiub':
+            X = X.astype(np.float64)
+        _check_features(X, self.n_features_in_)
+        scores = X @ self.coef.T + self.intercept
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            indices = (scores > 0).astype(int)
+        else:
+            indices = scores.argmax(axis=1)
+        return self.classes_[indices]
+
+    @property
+    def nbytes(self):
+        return self.coef.nbytes + self.intercept.nbytes
+
+
+def compile_model(model):
+    """Строит скомпилированную форму модели; None, если тип модели не поддерживается"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+    if isinstance(model, RandomForestClassifier) and model.n_outputs_ == 1:
+        return CompiledForest.from_model(model)
+    if isinstance(model, (LogisticRegression, SGDClassifier)):
+        return CompiledLinear.from_model(model)
+    return None
+
+
+def compiled_path(path):
+    """Путь к скомпилированной форме рядом с артефактом модели"""
+    base, _ = os.path.splitext(path)
+    return f"{base}.compiled.joblib"
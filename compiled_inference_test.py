@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import GaussianNB
+
+from compiled_inference import CompiledForest, CompiledLinear, compile_model
+from models import load_predictor, save_model
+
+
+def make_data(n_classes, n_samples=600, n_features=8, seed=0):
+    X, y = make_classification(n_samples=n_samples, n_features=n_features, n_informative=5,
+                               n_classes=n_classes, random_state=seed)
+    X_test, _ = make_classification(n_samples=300, n_features=n_features, n_informative=5,
+                                    n_classes=n_classes, random_state=seed + 1)
+    return X, y, X_test
+
+
+@pytest.mark.parametrize("n_classes", [2, 3])
+@pytest.mark.parametrize("params", [{}, {"n_estimators": 7, "max_depth": 4}, {"n_estimators": 30, "min_samples_leaf": 3}])
+def test_forest_predictions_identical(n_classes, params):
+    X, y, X_test = make_data(n_classes)
+    model = RandomForestClassifier(random_state=0, **params).fit(X, y)
+    compiled = compile_model(model)
+
+    assert isinstance(compiled, CompiledForest)
+    np.testing.assert_array_equal(compiled.predict_proba(X_test), model.predict_proba(X_test))
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+    # Один объект — основной сценарий онлайн-предсказаний
+    np.testing.assert_array_equal(compiled.predict(X_test[:1]), model.predict(X_test[:1]))
+
+
+def test_forest_string_labels_and_float32_input():
+    X, y, X_test = make_data(3)
+    labels = np.array(["cat", "dog", "fox"])[y]
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, labels)
+    X_test = X_test.astype(np.float32)
+
+    np.testing.assert_array_equal(compile_model(model).predict(X_test), model.predict(X_test))
+
+
+@pytest.mark.parametrize("n_classes", [2, 4])
+@pytest.mark.parametrize("model_class", [LogisticRegression, SGDClassifier])
+def test_linear_predictions_identical(n_classes, model_class):
+    X, y, X_test = make_data(n_classes)
+    model = model_class(random_state=0).fit(X, y)
+    compiled = compile_model(model)
+
+    assert isinstance(compiled, CompiledLinear)
+    np.testing.assert_array_equal(compiled.decision_function(X_test), model.decision_function(X_test))
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+
+
+def test_unsupported_model_is_not_compiled():
+    X, y, _ = make_data(2)
+    assert compile_model(GaussianNB().fit(X, y)) is None
+
+
+def test_feature_count_is_checked():
+    X, y, X_test = make_data(2)
+    compiled = compile_model(RandomForestClassifier(n_estimators=3, random_state=0).fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict(X_test[:, :3])
+
+
+def test_saved_model_is_served_from_compiled_form(tmp_path):
+    X, y, X_test = make_data(2)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    path = str(tmp_path / "model.joblib")
+    save_model(model, path)
+
+    predictor = load_predictor(path)
+    assert isinstance(predictor, CompiledForest)
+    np.testing.assert_array_equal(predictor.predict(X_test[:5]), model.predict(X_test[:5]))
+    # Без кэша моделей fallback не задан, и большая пачка тоже считается
+    # скомпилированной формой (исходную модель подключает ModelCache, model_cache_test.py)
+    assert predictor.fallback is None
+    np.testing.assert_array_equal(predictor.predict(X_test), model.predict(X_test))
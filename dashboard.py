@@ -5,6 +5,20 @@ import pandas as pd
 
 # Конфигурация
 BASE_URL = "http://localhost:5000"
+MODELS_PAGE_SIZE = 20
+
+def get_with_etag(url, params=None):
+    """GET с If-None-Match: если данные не менялись (304), берется ответ, сохраненный в сессии"""
+    cache = st.session_state.setdefault("etag_cache", {})
+    key = (url, tuple(sorted((params or {}).items())))
+    headers = {"If-None-Match": cache[key][0]} if key in cache else {}
+    response = requests.get(url, params=params, headers=headers)
+    if response.status_code == 304:
+        return cache[key][1], cache[key][2]
+    body = response.json()
+    if response.headers.get("ETag"):
+        cache[key] = (response.headers["ETag"], body, response.headers)
+    return body, response.headers
 
 st.set_page_config(page_title="ML Models Dashboard", layout="wide")
 st.title("ML models management dashboard")
@@ -95,13 +109,29 @@ elif page == "Train model":
 elif page == "Manage models":
     st.header("Manage trained models")
     
-    # Загружаем модели
+    # Загружаем модели постранично: только поля, которые показываются на странице
+    if "models_cursors" not in st.session_state:
+        st.session_state.models_cursors = [None]
     try:
-        response = requests.get(f"{BASE_URL}/models")
-        models = response.json()
+        params = {"limit": MODELS_PAGE_SIZE, "fields": "id,model_type,created_at,metrics"}
+        if st.session_state.models_cursors[-1]:
+            params["cursor"] = st.session_state.models_cursors[-1]
+        models, headers = get_with_etag(f"{BASE_URL}/models", params=params)
+        next_cursor = headers.get("X-Next-Cursor")
+        page_number = len(st.session_state.models_cursors)
+        
+        col_prev, col_next = st.columns(2)
+        with col_prev:
+            if page_number > 1 and st.button("Previous page"):
+                st.session_state.models_cursors.pop()
+                st.rerun()
+        with col_next:
+            if next_cursor and st.button("Next page"):
+                st.session_state.models_cursors.append(next_cursor)
+                st.rerun()
         
         if models:
-            st.subheader(f"Found {len(models)} models")
+            st.subheader(f"Page {page_number}: {len(models)} models")
             
             for model in models:
                 with st.expander(f"{model['id']} ({model['model_type']})"):
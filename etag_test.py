@@ -0,0 +1,78 @@
+import os
+import tempfile
+
+import pytest
+
+# Своя БД для теста: app подключается к DATABASE_URL при импорте
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='etag-test-'), 'models.db')
+
+from app import app  # noqa: E402
+from migrate import upgrade_schema  # noqa: E402
+
+X = [[0, 1], [1, 0], [1, 1], [0, 0]]
+y = [0, 1, 1, 0]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Артефакты моделей сохраняются в saved_models/ текущего каталога
+    monkeypatch.chdir(tmp_path)
+    with app.app_context():
+        upgrade_schema()
+    return app.test_client()
+
+
+def train(client):
+    response = client.post('/models/train', json={'model_type': 'logistic_regression', 'params': {}, 'X': X, 'y': y})
+    assert response.status_code == 201
+    return response.json['model_id']
+
+
+def etag_of(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    return response.headers['ETag']
+
+
+def assert_not_modified(client, url, etag):
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_listing_answers_304_until_models_change(client):
+    listing = etag_of(client, '/models')
+    assert_not_modified(client, '/models', listing)
+    # Другой вариант списка с той же версией тоже не изменился
+    assert_not_modified(client, '/models?limit=1&fields=id', listing)
+
+    model_id = train(client)
+    after_train = etag_of(client, '/models')
+    assert after_train != listing
+    assert client.get('/models', headers={'If-None-Match': listing}).status_code == 200
+
+    # Предсказание ничего не меняет
+    assert client.post(f'/models/{model_id}/predict', json={'X': X}).status_code == 200
+    assert_not_modified(client, '/models', after_train)
+
+
+def test_retrain_and_delete_change_model_and_listing_etags(client):
+    model_id = train(client)
+    listing = etag_of(client, '/models')
+    model = etag_of(client, f'/models/{model_id}')
+    assert etag_of(client, f'/metrics/{model_id}') == model
+    assert_not_modified(client, f'/models/{model_id}', model)
+    assert_not_modified(client, f'/metrics/{model_id}', model)
+
+    assert client.post(f'/models/{model_id}/retrain', json={'X': X, 'y': y}).status_code == 200
+    retrained = etag_of(client, f'/models/{model_id}')
+    assert retrained != model
+    assert client.get(f'/metrics/{model_id}', headers={'If-None-Match': model}).status_code == 200
+    after_retrain = etag_of(client, '/models')
+    assert after_retrain != listing
+
+    assert client.delete(f'/models/{model_id}').status_code == 204
+    assert client.get(f'/models/{model_id}', headers={'If-None-Match': retrained}).status_code == 404
+    after_delete = etag_of(client, '/models')
+    assert after_delete not in (listing, after_retrain)
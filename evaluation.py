@@ -0,0 +1,106 @@
+import os
+import time
+import logging
+
+import numpy as np
+
+from metrics_engine import ConfusionMatrix
+
+logger = logging.getLogger('evaluation')
+logger.setLevel(logging.INFO)
+
+# Сколько ядер максимум может занять оценка одной модели
+EVAL_MAX_CORES = int(os.getenv('EVAL_MAX_CORES', os.cpu_count() or 1))
+
+EVALUATION_MODES = ('train', 'holdout', 'kfold')
+DEFAULT_FOLDS = 5
+DEFAULT_TEST_SIZE = 0.2
+
+
+def parse_evaluation(config):
+    """Проверяет настройки оценки и заполняет значения по умолчанию"""
+    config = dict(config or {})
+    mode = config.get('mode') or 'train'
+    if mode not in EVALUATION_MODES:
+        raise ValueError(f"Evaluation mode must be one of {', '.join(EVALUATION_MODES)}")
+    folds = int(config.get('folds') or DEFAULT_FOLDS)
+    test_size = float(config.get('test_size') or DEFAULT_TEST_SIZE)
+    n_jobs = int(config.get('n_jobs') or EVAL_MAX_CORES)
+    if mode == 'kfold' and folds < 2:
+        raise ValueError("kfold evaluation needs at least 2 folds")
+    if mode == 'holdout' and not 0.0 < test_size < 1.0:
+        raise ValueError("test_size must be between 0 and 1")
+    return {
+        'mode': mode,
+        'folds': folds,
+        'test_size': test_size,
+        'n_jobs': max(1, min(n_jobs, EVAL_MAX_CORES)),
+    }
+
+
+def _splits(y, config):
+    from sklearn.model_selection import KFold, StratifiedKFold, train_test_split
+
+    _, class_counts = np.unique(y, return_counts=True)
+    if config['mode'] == 'holdout':
+        indices = np.arange(len(y))
+        stratify = y if class_counts.min() >= 2 else None
+        train_idx, test_idx = train_test_split(indices, test_size=config['test_size'], random_state=0, stratify=stratify)
+        return [(train_idx, test_idx)]
+
+    folds = config['folds']
+    if folds > len(y):
+        raise ValueError(f"Cannot make {folds} folds from {len(y)} samples")
+    # Стратификация возможна, только если каждого класса хватает на все фолды
+    if class_counts.min() >= folds:
+        splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    else:
+        splitter = KFold(n_splits=folds, shuffle=True, random_state=0)
+    return list(splitter.split(np.zeros(len(y)), y))
+
+
+def _fit_full(model_class, params, X, y):
+    model = model_class(**params)
+    model.fit(X, y)
+    return model
+
+
+def _fit_fold(model_class, params, X, y, train_idx, test_idx):
+    start = time.perf_counter()
+    model = model_class(**params)
+    model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
+    return ConfusionMatrix.from_predictions(y[test_idx], model.predict(X[test_idx])), fit_time
+
+
+def evaluate_and_fit(model_class, params, X, y, config):
+    """Обучает итоговую модель на всех данных и оценивает ее на отложенной выборке или k-fold.
+
+    Итоговая модель и модели фолдов обучаются параллельно в пределах бюджета
+    ядер (n_jobs, не больше EVAL_MAX_CORES). Метрики считаются по матрице
+    ошибок, объединенной по всем фолдам.
+    """
+    from joblib import Parallel, delayed
+
+    X = np.asarray(X)
+    y = np.asarray(y)
+    splits = _splits(y, config)
+    tasks = [delayed(_fit_full)(model_class, params, X, y)]
+    tasks += [delayed(_fit_fold)(model_class, params, X, y, train_idx, test_idx) for train_idx, test_idx in splits]
+    n_jobs = min(config['n_jobs'], len(tasks))
+    logger.info(f"Running {config['mode']} evaluation with {len(splits)} splits on {n_jobs} cores")
+
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(tasks)
+    model, fold_results = results[0], results[1:]
+
+    pooled = ConfusionMatrix()
+    fold_accuracy = []
+    for matrix, _ in fold_results:
+        pooled.merge(matrix)
+        fold_accuracy.append(matrix.metrics()['accuracy'])
+    metrics = pooled.metrics()
+    if len(fold_results) > 1:
+        metrics['accuracy_std'] = float(np.std(fold_accuracy))
+    logger.info(f"{config['mode']} evaluation finished in {time.perf_counter() - start:.2f}s: {metrics}")
+    return model, metrics
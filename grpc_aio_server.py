@@ -0,0 +1,564 @@
+import os
+import time
+import uuid
+import shutil
+import signal
+import asyncio
+import logging
+import tempfile
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from logging.handlers import RotatingFileHandler
+
+# Процессы пулов пишут метрики в общий каталог, иначе /metrics сервера не видит
+# предсказаний и обучения в них. Каталог задается до импорта prometheus_client
+# (через models и service_metrics): тип хранения значений выбирается при импорте
+METRICS_DIR = None
+if __name__ == "__main__" and not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    METRICS_DIR = os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='grpc-aio-metrics-')
+
+import grpc  # noqa: E402
+
+import app_pb2  # noqa: E402
+import app_pb2_grpc  # noqa: E402
+from models import db, MLModel, AVAILABLE_MODELS, warm_up_imports, get_model_path, delete_model_files, convert_params, create_model_record, set_model_metrics  # noqa: E402
+from model_cache import model_cache, predict_cached  # noqa: E402
+from metadata_cache import metadata_cache  # noqa: E402
+from migrate import upgrade_schema  # noqa: E402
+from database import session_scope  # noqa: E402
+from tensor_codec import decode_tensor, features_from_request, predict_response  # noqa: E402
+from stream_upload import TrainingDataAssembler  # noqa: E402
+from training_jobs import TrainingJobManager, QueueFullError, fit_and_save, retrain_and_save, search_and_save  # noqa: E402
+from grpc_server import (app, MLService, GRPC_PORT, GRPC_MAX_WORKERS, read_evaluation, read_search,  # noqa: E402
+                         read_features, search_response, job_to_response, observe_rpc, wrap_rpc_handler)
+from service_metrics import stage_timer, start_exporter  # noqa: E402
+from request_profiler import PROFILE_METADATA_KEY, PROFILE_ID_METADATA_KEY, authorized, start_profile  # noqa: E402
+
+"""
+gRPC сервер на asyncio (grpc.aio) с теми же RPC, что и grpc_server.py.
+
+Легкие RPC (HealthCheck, GetModel и GetMetrics при попадании в кэш метаданных,
+GetJob) выполняются прямо в цикле событий; запросы к БД — в небольшом пуле
+потоков; обучение, поиск гиперпараметров и переобучение — в пуле процессов
+обучения, предсказания — в отдельном пуле процессов. Долгое обучение не
+занимает потоки сервера и не конкурирует за GIL с остальными запросами.
+Запуск: python grpc_aio_server.py
+"""
+
+logger = logging.getLogger('grpc_aio_server')
+logger.setLevel(logging.INFO)
+
+file_handler = RotatingFileHandler(
+    'logs/grpc_aio_server.log',
+    maxBytes=1024 * 1024,
+    backupCount=10
+)
+formatter = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+file_handler.setFormatter(formatter)
+logger.addHandler(file_handler)
+
+# Размеры пулов: процессы обучения, процессы предсказаний и потоки для запросов к БД
+# (потоков не больше, чем соединений в пуле БД, настроенном в grpc_server)
+GRPC_AIO_TRAIN_WORKERS = int(os.getenv('GRPC_AIO_TRAIN_WORKERS', 2))
+GRPC_AIO_PREDICT_WORKERS = int(os.getenv('GRPC_AIO_PREDICT_WORKERS', min(4, os.cpu_count() or 1)))
+GRPC_AIO_IO_THREADS = int(os.getenv('GRPC_AIO_IO_THREADS', GRPC_MAX_WORKERS))
+# Сколько секунд при остановке ждать завершения текущих запросов
+GRPC_AIO_STOP_GRACE = float(os.getenv('GRPC_AIO_STOP_GRACE', 5))
+
+
+class _Abort(Exception):
+    """Завершение RPC с кодом ошибки, поднятое вне корутины обработчика"""
+
+    def __init__(self, code, details):
+        super().__init__(details)
+        self.code = code
+        self.details = details
+
+
+class _SyncContext:
+    """Контекст для синхронных обработчиков из grpc_server: abort превращается в исключение"""
+
+    def abort(self, code, details):
+        raise _Abort(code, details)
+
+
+_SYNC_CONTEXT = _SyncContext()
+
+
+def _translate_abort(method):
+    @functools.wraps(method)
+    async def wrapper(self, request, context):
+        try:
+            return await method(self, request, context)
+        except _Abort as e:
+            await context.abort(e.code, e.details)
+    return wrapper
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """Метрики RPC для asyncio сервера: обработчики — корутины и асинхронные генераторы"""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+
+        def unary(behavior):
+            async def wrapper(request, context):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    response = await behavior(request, context)
+                    failed = False
+                    return response
+                finally:
+                    observe_rpc(method, context, start, failed)
+            return wrapper
+
+        def streaming(behavior):
+            async def wrapper(request, context):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                    failed = False
+                finally:
+                    observe_rpc(method, context, start, failed)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary, streaming)
+
+
+class AsyncProfilingInterceptor(grpc.aio.ServerInterceptor):
+    """Профилирует RPC с верным x-profile-token на asyncio сервере.
+
+    cProfile видит только поток цикла событий: в профиль попадают и другие корутины,
+    выполнявшиеся во время запроса, но не работа в пулах потоков и процессов.
+    """
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        metadata = dict(handler_call_details.invocation_metadata or ())
+        token = metadata.get(PROFILE_METADATA_KEY)
+        if handler is None or token is None:
+            return handler
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        if not authorized(token):
+            logger.warning(f"Rejected profiling request with invalid token: {method}")
+            return handler
+
+        def finish(profile, context):
+            profile_id = profile.finish()
+            if profile_id:
+                context.set_trailing_metadata(((PROFILE_ID_METADATA_KEY, profile_id),))
+
+        def unary(behavior):
+            async def wrapper(request, context):
+                profile = start_profile('grpc', method)
+                if profile is None:
+                    return await behavior(request, context)
+                try:
+                    return await behavior(request, context)
+                finally:
+                    finish(profile, context)
+            return wrapper
+
+        def streaming(behavior):
+            async def wrapper(request, context):
+                profile = start_profile('grpc', method)
+                if profile is None:
+                    async for response in behavior(request, context):
+                        yield response
+                    return
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                finally:
+                    finish(profile, context)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary, streaming)
+
+
+class WorkerPool:
+    """Пул процессов (spawn) для CPU-задач; пересоздается, если один из процессов упал"""
+
+    def __init__(self, name, max_workers):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = None
+
+    def _ensure_executor(self):
+        # Пул используется только из потока цикла событий, блокировка не нужна
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"{self.name} process pool started with {self.max_workers} workers")
+        return self._executor
+
+    def start(self):
+        """Запускает процессы заранее и импортирует в них sklearn, не дожидаясь результата"""
+        executor = self._ensure_executor()
+        for _ in range(self.max_workers):
+            executor.submit(warm_up_imports)
+
+    async def run(self, fn, *args):
+        executor = self._ensure_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool as e:
+            logger.error(f"{self.name} process pool is broken, restarting it")
+            if self._executor is executor:
+                self._executor = None
+            executor.shutdown(wait=False)
+            raise _Abort(grpc.StatusCode.UNAVAILABLE, f"{self.name} worker crashed, retry the request") from e
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _save_record(model_id, model_type, params, path, metrics):
+    """Создает запись обученной модели; при ошибке удаляет уже сохраненный артефакт"""
+    try:
+        with session_scope(app), stage_timer('db_lookup'):
+            record = create_model_record(model_id, model_type, params, path, metrics)
+            db.session.add(record)
+            db.session.commit()
+            metadata_cache.put(record)
+    except Exception:
+        delete_model_files(path)
+        raise
+
+
+def _update_metrics(model_id, metrics):
+    with session_scope(app), stage_timer('db_lookup'):
+        record = MLModel.query.filter_by(id=model_id).first()
+        if not record:
+            raise _Abort(grpc.StatusCode.NOT_FOUND, "Model not found")
+        set_model_metrics(record, metrics)
+        db.session.commit()
+    model_cache.invalidate(model_id)
+    metadata_cache.invalidate(model_id)
+
+
+class AsyncMLService(app_pb2_grpc.MLServiceServicer):
+
+    def __init__(self, train_pool, predict_pool, io_executor):
+        self.train_pool = train_pool
+        self.predict_pool = predict_pool
+        self.io_executor = io_executor
+        # Обработчики, которые только читают/пишут БД, переиспользуются из grpc_server
+        self._sync = MLService()
+        # Фоновые задачи обучения выполняются в том же пуле train_pool, здесь только их учет
+        self.jobs = TrainingJobManager(app, max_workers=train_pool.max_workers)
+        self._job_tasks = set()
+
+    async def _in_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.io_executor, fn, *args)
+
+    async def _metadata(self, model_id):
+        metadata = metadata_cache.peek(model_id)
+        if metadata is not None:
+            return metadata
+        # Промах кэша — запрос к БД в потоке, чтобы не блокировать цикл событий
+        return await self._in_thread(metadata_cache.get, model_id, app)
+
+    # Легкие RPC — в цикле событий
+
+    async def HealthCheck(self, request, context):
+        return self._sync.HealthCheck(request, _SYNC_CONTEXT)
+
+    async def GetModelClasses(self, request, context):
+        return self._sync.GetModelClasses(request, _SYNC_CONTEXT)
+
+    @_translate_abort
+    async def GetModel(self, request, context):
+        if metadata_cache.peek(request.model_id) is not None:
+            return self._sync.GetModel(request, _SYNC_CONTEXT)
+        return await self._in_thread(self._sync.GetModel, request, _SYNC_CONTEXT)
+
+    @_translate_abort
+    async def GetMetrics(self, request, context):
+        if metadata_cache.peek(request.model_id) is not None:
+            return self._sync.GetMetrics(request, _SYNC_CONTEXT)
+        return await self._in_thread(self._sync.GetMetrics, request, _SYNC_CONTEXT)
+
+    @_translate_abort
+    async def GetJob(self, request, context):
+        job = self.jobs.peek(request.job_id)
+        if job is None:
+            # Задачу принял другой процесс — статус читается из БД в потоке
+            job = await self._in_thread(self.jobs.get, request.job_id)
+        if job is None:
+            logger.warning(f"Training job not found via gRPC (aio): {request.job_id}")
+            raise _Abort(grpc.StatusCode.NOT_FOUND, "Job not found")
+        return job_to_response(job)
+
+    async def GetPredictStats(self, request, context):
+        return self._sync.GetPredictStats(request, _SYNC_CONTEXT)
+
+    # Запросы к БД — в пуле потоков
+
+    @_translate_abort
+    async def ListModels(self, request, context):
+        return await self._in_thread(self._sync.ListModels, request, _SYNC_CONTEXT)
+
+    @_translate_abort
+    async def ListModelsPage(self, request, context):
+        return await self._in_thread(self._sync.ListModelsPage, request, _SYNC_CONTEXT)
+
+    @_translate_abort
+    async def GetLeaderboard(self, request, context):
+        return await self._in_thread(self._sync.GetLeaderboard, request, _SYNC_CONTEXT)
+
+    @_translate_abort
+    async def DeleteModel(self, request, context):
+        return await self._in_thread(self._sync.DeleteModel, request, _SYNC_CONTEXT)
+
+    # Обучение и предсказания — в пулах процессов
+
+    @_translate_abort
+    async def TrainModel(self, request, context):
+        logger.info("Starting model training request via gRPC (aio)")
+        evaluation = read_evaluation(request, _SYNC_CONTEXT)
+        X, y = await self._in_thread(read_features, request, _SYNC_CONTEXT, True)
+        return await self._train(request.model_type, dict(request.params), X, y, evaluation)
+
+    @_translate_abort
+    async def TrainModelStream(self, request_iterator, context):
+        logger.info("Starting streaming model training upload via gRPC (aio)")
+        assembler = None
+        try:
+            async for chunk in request_iterator:
+                if assembler is None:
+                    model_type = chunk.model_type
+                    params = dict(chunk.params)
+                    evaluation = read_evaluation(chunk, _SYNC_CONTEXT)
+                    assembler = TrainingDataAssembler(n_samples=chunk.n_samples or None)
+                assembler.append(decode_tensor(chunk.X, ndim=2), decode_tensor(chunk.y, ndim=1))
+            if assembler is None:
+                raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, "Empty training stream")
+            X, y = assembler.finish()
+        except ValueError as e:
+            if assembler is not None:
+                assembler.close()
+            logger.error(f"Invalid training stream via gRPC (aio): {str(e)}")
+            raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, str(e)) from e
+
+        try:
+            logger.info(f"Training stream received: {assembler.rows} rows, {assembler.n_features} features")
+            return await self._train(model_type, params, X, y, evaluation)
+        finally:
+            assembler.close()
+
+    async def _train(self, model_type, params, X, y, evaluation=None):
+        if model_type not in AVAILABLE_MODELS:
+            logger.error(f"Unsupported model type via gRPC (aio): {model_type}")
+            raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, "Unsupported model type")
+
+        converted_params = convert_params(params)
+        model_id = str(uuid.uuid4())
+        logger.info(f"Training model type: {model_type} with {len(X)} samples via gRPC (aio)")
+        try:
+            path, metrics = await self.train_pool.run(
+                fit_and_save, model_id, model_type, converted_params, X, y, evaluation
+            )
+        except ValueError as e:
+            logger.error(f"Training failed via gRPC (aio): {str(e)}")
+            raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, str(e)) from e
+        await self._in_thread(_save_record, model_id, model_type, converted_params, path, metrics)
+
+        logger.info(f"Model trained successfully via gRPC (aio). ID: {model_id}, Metrics: {metrics}")
+        return app_pb2.TrainResponse(model_id=model_id, metrics={k: float(v) for k, v in metrics.items()})
+
+    @_translate_abort
+    async def SubmitTrainJob(self, request, context):
+        logger.info("Training job submission via gRPC (aio)")
+        model_type = request.model_type
+        if model_type not in AVAILABLE_MODELS:
+            logger.error(f"Unsupported model type via gRPC (aio): {model_type}")
+            raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, "Unsupported model type")
+
+        converted_params = convert_params(dict(request.params))
+        evaluation = read_evaluation(request, _SYNC_CONTEXT)
+        X, y = await self._in_thread(read_features, request, _SYNC_CONTEXT, True)
+        try:
+            job = await self._in_thread(self.jobs.register, model_type, converted_params, len(X))
+        except QueueFullError as e:
+            raise _Abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Training queue is full") from e
+
+        task = asyncio.create_task(self._run_job(job, X, y, evaluation))
+        # Цикл событий хранит на задачи только слабые ссылки
+        self._job_tasks.add(task)
+        task.add_done_callback(self._job_tasks.discard)
+        logger.info(f"Training job submitted via gRPC (aio): {job.id}")
+        return job_to_response(job)
+
+    async def _run_job(self, job, X, y, evaluation):
+        model_id = str(uuid.uuid4())
+        # Прогресс из процесса пула не передается: задача выполняется с момента передачи в пул
+        await self._in_thread(self.jobs.mark_running, job)
+        try:
+            path, metrics = await self.train_pool.run(
+                fit_and_save, model_id, job.model_type, job.params, X, y, evaluation
+            )
+            await self._in_thread(_save_record, model_id, job.model_type, job.params, path, metrics)
+        except Exception as e:
+            await self._in_thread(delete_model_files, get_model_path(model_id))
+            await self._in_thread(self.jobs.fail, job, e.details if isinstance(e, _Abort) else str(e))
+            return
+        await self._in_thread(self.jobs.complete, job, model_id, metrics)
+
+    @_translate_abort
+    async def SearchModel(self, request, context):
+        logger.info("Starting hyperparameter search request via gRPC (aio)")
+        model_type = request.model_type
+        if model_type not in AVAILABLE_MODELS:
+            raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, "Unsupported model type")
+
+        converted_params = convert_params(dict(request.params))
+        config = read_search(request, _SYNC_CONTEXT)
+        X, y = await self._in_thread(read_features, request, _SYNC_CONTEXT, True)
+        model_id = str(uuid.uuid4())
+        try:
+            result = await self.train_pool.run(search_and_save, model_id, model_type, converted_params, X, y, config)
+        except ValueError as e:
+            logger.error(f"Hyperparameter search failed via gRPC (aio): {str(e)}")
+            raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, str(e)) from e
+        await self._in_thread(_save_record, model_id, model_type, result['best_params'], result['path'], result['metrics'])
+
+        logger.info(f"Search finished via gRPC (aio). Best model ID: {model_id}, params: {result['best_params']}")
+        return search_response(model_id, result)
+
+    @_translate_abort
+    async def RetrainModel(self, request, context):
+        logger.info(f"Retrain request for model via gRPC (aio): {request.model_id}")
+        metadata = await self._metadata(request.model_id)
+        if metadata is None:
+            raise _Abort(grpc.StatusCode.NOT_FOUND, "Model not found")
+
+        X, y = await self._in_thread(read_features, request, _SYNC_CONTEXT, True)
+        try:
+            metrics = await self.train_pool.run(
+                retrain_and_save, metadata.model_type, metadata.file_path, X, y,
+                request.incremental, request.n_new_estimators or None
+            )
+        except FileNotFoundError as e:
+            metadata_cache.invalidate(request.model_id)
+            raise _Abort(grpc.StatusCode.NOT_FOUND, "Model not found") from e
+        except ValueError as e:
+            logger.error(f"Retraining failed via gRPC (aio) for model {request.model_id}: {str(e)}")
+            raise _Abort(grpc.StatusCode.INVALID_ARGUMENT, str(e)) from e
+        await self._in_thread(_update_metrics, request.model_id, metrics)
+
+        logger.info(f"Model retrained successfully via gRPC (aio): {request.model_id}, New metrics: {metrics}")
+        return app_pb2.RetrainResponse(metrics={k: float(v) for k, v in metrics.items()})
+
+    async def _predict(self, model_id, X):
+        metadata = await self._metadata(model_id)
+        if metadata is None:
+            raise LookupError("Model not found")
+        try:
+            # Процесс пула держит свой кэш моделей и сверяет его с mtime файла
+            return await self.predict_pool.run(predict_cached, model_id, metadata.file_path, X)
+        except FileNotFoundError as e:
+            metadata_cache.invalidate(model_id)
+            raise LookupError("Model not found") from e
+
+    @_translate_abort
+    async def Predict(self, request, context):
+        logger.info(f"Prediction request for model via gRPC (aio): {request.model_id}")
+        # Разбор и конвертация входных данных — в потоке, как и в TrainModel
+        X = await self._in_thread(read_features, request, _SYNC_CONTEXT)
+        try:
+            preds = await self._predict(request.model_id, X)
+        except LookupError as e:
+            logger.warning(f"Model not found for prediction via gRPC (aio): {request.model_id}")
+            raise _Abort(grpc.StatusCode.NOT_FOUND, "Model not found") from e
+        return predict_response(preds, packed=request.packed_response)
+
+    async def PredictStream(self, request_iterator, context):
+        logger.info("Prediction stream opened via gRPC (aio)")
+        chunks = 0
+        rows = 0
+        async for chunk in request_iterator:
+            request = chunk.request
+            model_id = request.model_id
+            try:
+                X = await self._in_thread(features_from_request, request)
+                preds = await self._predict(model_id, X)
+            except LookupError:
+                logger.warning(f"Model not found in prediction stream via gRPC (aio): {model_id}")
+                yield app_pb2.PredictChunkResult(chunk_id=chunk.chunk_id, model_id=model_id, error="Model not found")
+                continue
+            except _Abort as e:
+                yield app_pb2.PredictChunkResult(chunk_id=chunk.chunk_id, model_id=model_id, error=e.details)
+                continue
+            except Exception as e:
+                logger.error(f"Prediction stream chunk {chunk.chunk_id} failed via gRPC (aio): {str(e)}")
+                yield app_pb2.PredictChunkResult(chunk_id=chunk.chunk_id, model_id=model_id, error=str(e))
+                continue
+
+            chunks += 1
+            rows += len(preds)
+            yield app_pb2.PredictChunkResult(
+                chunk_id=chunk.chunk_id,
+                model_id=model_id,
+                response=predict_response(preds, packed=request.packed_response)
+            )
+        logger.info(f"Prediction stream closed via gRPC (aio). Scored {rows} rows in {chunks} chunks")
+
+
+async def serve_async():
+    logger.info("Starting asyncio gRPC server")
+    with app.app_context():
+        upgrade_schema()
+
+    train_pool = WorkerPool('Training', GRPC_AIO_TRAIN_WORKERS)
+    predict_pool = WorkerPool('Prediction', GRPC_AIO_PREDICT_WORKERS)
+    io_executor = ThreadPoolExecutor(max_workers=GRPC_AIO_IO_THREADS, thread_name_prefix='grpc-aio-io')
+
+    server = grpc.aio.server(interceptors=[AsyncMetricsInterceptor(), AsyncProfilingInterceptor()])
+    app_pb2_grpc.add_MLServiceServicer_to_server(AsyncMLService(train_pool, predict_pool, io_executor), server)
+    server.add_insecure_port(f'[::]:{GRPC_PORT}')
+    await server.start()
+    start_exporter()
+    # Процессы пула предсказаний прогреваются, пока сервер уже отвечает на запросы
+    predict_pool.start()
+    logger.info(f"Asyncio gRPC server started on port {GRPC_PORT}: {GRPC_AIO_TRAIN_WORKERS} training and "
+                f"{GRPC_AIO_PREDICT_WORKERS} prediction processes, {GRPC_AIO_IO_THREADS} DB threads")
+    print(f"Asyncio gRPC server started on port {GRPC_PORT}")
+
+    # По SIGTERM/SIGINT сервер дожидается текущих запросов, затем останавливает пулы
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, lambda: asyncio.ensure_future(server.stop(GRPC_AIO_STOP_GRACE)))
+    try:
+        await server.wait_for_termination()
+    finally:
+        logger.info("Asyncio gRPC server stopping")
+        train_pool.shutdown()
+        predict_pool.shutdown()
+        io_executor.shutdown(wait=False)
+
+
+def serve():
+    try:
+        asyncio.run(serve_async())
+    finally:
+        if METRICS_DIR is not None:
+            shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,6 +1,9 @@
 import grpc
+import numpy as np
 import app_pb2
 import app_pb2_grpc
+from tensor_codec import encode_tensor
+from stream_upload import iter_train_chunks
 
 def test_grpc():
     # Подключаемся к серверу
@@ -39,6 +42,18 @@ def test_grpc():
         model_id = train_response.model_id
         print(f"Success! Model trained: {model_id}")
         print(f"Success! Metrics: {dict(train_response.metrics)}")
+
+        # 3.1 Тест TrainModelStream
+        print("\n3.1 Testing TrainModelStream...")
+        stream_response = stub.TrainModelStream(iter_train_chunks(
+            "logistic_regression",
+            {"max_iter": "100"},
+            [[1.0, 2.0], [2.0, 1.0], [3.0, 4.0], [4.0, 3.0]],
+            [0, 1, 0, 1],
+            rows_per_chunk=2
+        ))
+        print(f"Success! Model trained from stream: {stream_response.model_id}")
+        stub.DeleteModel(app_pb2.ModelId(model_id=stream_response.model_id))
         
         # 4. Тест ListModels
         print("\n4. Testing ListModels...")
@@ -65,6 +80,15 @@ def test_grpc():
             X=predict_features
         ))
         print(f"Success! Predictions: {predict_response.predictions}")
+
+        # 6.1 Тест Predict с упакованным тензором
+        print("\n6.1 Testing Predict with packed tensor...")
+        packed_response = stub.Predict(app_pb2.PredictRequest(
+            model_id=model_id,
+            X_packed=encode_tensor(np.array([[1.5, 2.5], [3.5, 4.5]])),
+            packed_response=True
+        ))
+        print(f"Success! Packed predictions: {list(packed_response.int_predictions)}")
         
         # 7. Тест GetMetrics
         print("\n7. Testing GetMetrics...")
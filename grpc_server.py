@@ -2,12 +2,26 @@ import grpc
 from concurrent import futures
 import app_pb2
 import app_pb2_grpc
-import joblib
 import uuid
 import os
+import threading
+import time
 import logging
 from logging.handlers import RotatingFileHandler
-from models import db, MLModel, AVAILABLE_MODELS, get_model_path, convert_params, calculate_metrics, create_model_record
+from models import db, MLModel, AVAILABLE_MODELS, model_class_name, warm_up_imports, get_model_path, save_model, load_model, delete_model_files, convert_params, fit_model, update_model, create_model_record, set_model_metrics
+from model_cache import model_cache
+from metadata_cache import metadata_cache
+from model_listing import parse_list_query, list_models, leaderboard, LEADERBOARD_DEFAULT_K
+from migrate import upgrade_schema
+from database import configure_database, session_scope
+from training_jobs import TrainingJobManager, QueueFullError
+from predict_batcher import PredictBatcher
+from tensor_codec import decode_tensor, features_from_request, labels_from_request, predict_response
+from stream_upload import TrainingDataAssembler
+from evaluation import parse_evaluation
+from hyperparam_search import parse_search, run_search
+from service_metrics import observe_request, stage_timer, start_exporter, timed_predict
+from request_profiler import PROFILE_METADATA_KEY, PROFILE_ID_METADATA_KEY, authorized, start_profile
 from flask import Flask
 
 # Настройка логгера для gRPC сервера
@@ -25,9 +39,216 @@ formatter = logging.Formatter(
 file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
 
+# Настройки сервера и объединения запросов Predict в пачки
+GRPC_PORT = int(os.getenv('GRPC_PORT', 50051))
+GRPC_MAX_WORKERS = int(os.getenv('GRPC_MAX_WORKERS', 5))
+GRPC_PREDICT_BATCHING = os.getenv('GRPC_PREDICT_BATCHING', '0') == '1'
+GRPC_BATCH_MAX_SIZE = int(os.getenv('GRPC_BATCH_MAX_SIZE', 256))
+GRPC_BATCH_MAX_WAIT_MS = float(os.getenv('GRPC_BATCH_MAX_WAIT_MS', 2.0))
+
+predict_batcher = PredictBatcher(GRPC_BATCH_MAX_SIZE, GRPC_BATCH_MAX_WAIT_MS) if GRPC_PREDICT_BATCHING else None
+
 app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///test.db'
-db.init_app(app)
+# По соединению на поток сервера, плюс одно для записи результатов фоновых задач
+configure_database(app, pool_size=GRPC_MAX_WORKERS + 1)
+
+job_manager = TrainingJobManager(app)
+
+def job_to_response(job):
+    """Конвертирует задачу обучения в gRPC сообщение"""
+    data = job.to_dict()
+    return app_pb2.JobResponse(
+        job_id=data['job_id'],
+        status=data['status'],
+        progress=data['progress'],
+        model_type=data['model_type'] or "",
+        model_id=data['model_id'] or "",
+        metrics={k: float(v) for k, v in data['metrics'].items()} if data['metrics'] else {},
+        error=data['error'] or "",
+        created_at=data['created_at'] or "",
+        started_at=data['started_at'] or "",
+        finished_at=data['finished_at'] or ""
+    )
+
+def get_cached_model(model_id):
+    """Загруженная модель по id через кэши метаданных и моделей; None, если модели нет"""
+    metadata = metadata_cache.get(model_id, app)
+    if metadata is None:
+        return None
+    try:
+        return model_cache.get(model_id, metadata.file_path)
+    except FileNotFoundError:
+        # Модель удалена другим сервером, пока метаданные были в кэше
+        metadata_cache.invalidate(model_id)
+        return None
+
+def read_evaluation(message, context):
+    """Извлекает настройки оценки модели из TrainRequest или TrainChunk"""
+    if not message.HasField('evaluation'):
+        return None
+    e = message.evaluation
+    try:
+        return parse_evaluation({'mode': e.mode, 'folds': e.folds, 'test_size': e.test_size, 'n_jobs': e.n_jobs})
+    except ValueError as err:
+        logger.error(f"Invalid evaluation config via gRPC: {str(err)}")
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(err))
+
+def read_search(request, context):
+    """Конвертирует SearchConfig в настройки поиска гиперпараметров"""
+    search = request.search
+    param_space = {}
+    for name, values in search.param_space.items():
+        if values.values:
+            param_space[name] = list(values.values)
+        else:
+            param_space[name] = {'low': values.low, 'high': values.high, 'log': values.log, 'integer': values.integer}
+    try:
+        return parse_search({
+            'strategy': search.strategy,
+            'param_space': param_space,
+            'n_iter': search.n_iter,
+            'cv': search.cv,
+            'scoring': search.scoring,
+            'factor': search.factor,
+            'n_jobs': search.n_jobs
+        })
+    except ValueError as e:
+        logger.error(f"Invalid search config via gRPC: {str(e)}")
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+def search_response(model_id, result):
+    """Конвертирует результат поиска гиперпараметров в SearchResponse"""
+    trials = [
+        app_pb2.SearchTrial(
+            params={str(k): str(v) for k, v in t['params'].items()},
+            mean_score=t['mean_score'] if t['mean_score'] is not None else 0.0,
+            std_score=t['std_score'] if t['std_score'] is not None else 0.0,
+            rank=t['rank'],
+            mean_fit_time=t['mean_fit_time'],
+            iteration=t.get('iteration', 0),
+            n_resources=t.get('n_resources', 0),
+            failed=t['mean_score'] is None
+        )
+        for t in result['trials']
+    ]
+    return app_pb2.SearchResponse(
+        model_id=model_id,
+        best_params={str(k): str(v) for k, v in result['best_params'].items()},
+        best_score=result['best_score'],
+        scoring=result['scoring'],
+        metrics={k: float(v) for k, v in result['metrics'].items()},
+        search_time=result['search_time'],
+        trials=trials
+    )
+
+def read_features(request, context, with_labels=False):
+    """Извлекает признаки (и метки) из запроса в построчном или упакованном виде"""
+    try:
+        X = features_from_request(request)
+        if not with_labels:
+            return X
+        return X, labels_from_request(request)
+    except ValueError as e:
+        logger.error(f"Invalid packed tensor via gRPC: {str(e)}")
+        context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+def observe_rpc(method, context, start, failed):
+    """Записывает метрики завершенного RPC по коду статуса из контекста"""
+    code = context.code()
+    if isinstance(code, grpc.StatusCode):
+        code = code.name
+    else:
+        # Исключение без context.abort сервер превращает в UNKNOWN
+        code = 'UNKNOWN' if failed else 'OK'
+    observe_request(method, code, time.perf_counter() - start, error=code != 'OK')
+
+def wrap_rpc_handler(handler, unary, streaming):
+    """Оборачивает обработчик RPC: unary — для ответа одним сообщением, streaming — потоком"""
+    if handler.unary_unary:
+        return handler._replace(unary_unary=unary(handler.unary_unary))
+    if handler.stream_unary:
+        return handler._replace(stream_unary=unary(handler.stream_unary))
+    if handler.unary_stream:
+        return handler._replace(unary_stream=streaming(handler.unary_stream))
+    return handler._replace(stream_stream=streaming(handler.stream_stream))
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Считает запросы, ошибки и задержку каждого RPC"""
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+
+        def unary(behavior):
+            def wrapper(request, context):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    response = behavior(request, context)
+                    failed = False
+                    return response
+                finally:
+                    observe_rpc(method, context, start, failed)
+            return wrapper
+
+        def streaming(behavior):
+            def wrapper(request, context):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    yield from behavior(request, context)
+                    failed = False
+                finally:
+                    observe_rpc(method, context, start, failed)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary, streaming)
+
+class ProfilingInterceptor(grpc.ServerInterceptor):
+    """Профилирует RPC, в метаданных которого передан верный x-profile-token"""
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        metadata = dict(handler_call_details.invocation_metadata or ())
+        token = metadata.get(PROFILE_METADATA_KEY)
+        if handler is None or token is None:
+            return handler
+        method = handler_call_details.method.rsplit('/', 1)[-1]
+        if not authorized(token):
+            logger.warning(f"Rejected profiling request with invalid token: {method}")
+            return handler
+
+        def finish(profile, context):
+            profile_id = profile.finish()
+            if profile_id:
+                context.set_trailing_metadata(((PROFILE_ID_METADATA_KEY, profile_id),))
+
+        def unary(behavior):
+            def wrapper(request, context):
+                profile = start_profile('grpc', method)
+                if profile is None:
+                    return behavior(request, context)
+                try:
+                    return behavior(request, context)
+                finally:
+                    finish(profile, context)
+            return wrapper
+
+        def streaming(behavior):
+            def wrapper(request, context):
+                profile = start_profile('grpc', method)
+                if profile is None:
+                    yield from behavior(request, context)
+                    return
+                try:
+                    yield from behavior(request, context)
+                finally:
+                    finish(profile, context)
+            return wrapper
+
+        return wrap_rpc_handler(handler, unary, streaming)
 
 class MLService(app_pb2_grpc.MLServiceServicer):
     
@@ -40,17 +261,19 @@ class MLService(app_pb2_grpc.MLServiceServicer):
         model_classes = {}
         for key, val in AVAILABLE_MODELS.items():
             model_classes[key] = app_pb2.ModelClassInfo(
-                class_name=val["class"].__name__,
+                class_name=model_class_name(key),
                 hyperparameters=val["hyperparameters"],
-                description=val["description"]
+                description=val["description"],
+                incremental=val["incremental"] or ""
             )
         logger.info(f"Returning {len(model_classes)} model classes via gRPC")
         return app_pb2.ModelClassesResponse(model_classes=model_classes)
     
     def ListModels(self, request, context):
         logger.info("Request for list of all models via gRPC")
-        with app.app_context():
-            models = MLModel.query.all()
+        with session_scope(app):
+            with stage_timer('db_lookup'):
+                models = MLModel.query.all()
             model_list = []
             for m in models:
                 model_response = app_pb2.ModelResponse(
@@ -64,14 +287,87 @@ class MLService(app_pb2_grpc.MLServiceServicer):
             logger.info(f"Returning {len(model_list)} models via gRPC")
             return app_pb2.ListModelsResponse(models=model_list)
     
+    def ListModelsPage(self, request, context):
+        logger.info("Request for page of models via gRPC")
+        try:
+            query = parse_list_query({
+                'limit': request.limit,
+                'cursor': request.cursor,
+                'model_type': request.model_type,
+                'created_after': request.created_after,
+                'created_before': request.created_before,
+                'sort_by': request.sort_by,
+                'order': 'asc' if request.ascending else 'desc',
+                'fields': list(request.fields)
+            })
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        with session_scope(app):
+            items, next_cursor = list_models(query)
+        model_list = [
+            app_pb2.ModelResponse(
+                id=str(m['id']),
+                model_type=str(m.get('model_type') or ""),
+                params={str(k): str(v) for k, v in m['params'].items()} if m.get('params') else {},
+                created_at=m.get('created_at') or "",
+                metrics={str(k): float(v) for k, v in m['metrics'].items()} if m.get('metrics') else {}
+            )
+            for m in items
+        ]
+        logger.info(f"Returning {len(model_list)} models via gRPC")
+        return app_pb2.ListModelsResponse(models=model_list, next_cursor=next_cursor or "")
+
+    def GetLeaderboard(self, request, context):
+        metric = request.metric or 'accuracy'
+        logger.info(f"Request for leaderboard by {metric} via gRPC")
+        try:
+            with session_scope(app):
+                entries = leaderboard(metric, k=request.k or LEADERBOARD_DEFAULT_K,
+                                      model_type=request.model_type or None, ascending=request.ascending)
+        except ValueError as e:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+        return app_pb2.LeaderboardResponse(
+            metric=metric,
+            models=[app_pb2.LeaderboardEntry(**entry) for entry in entries]
+        )
+
     def TrainModel(self, request, context):
         logger.info("Starting model training request via gRPC")
-        with app.app_context():
-            model_type = request.model_type
-            params = dict(request.params)
-            X = [list(row.features) for row in request.X]
-            y = list(request.y)
+        model_type = request.model_type
+        params = dict(request.params)
+        evaluation = read_evaluation(request, context)
+        X, y = read_features(request, context, with_labels=True)
+        return self._train(model_type, params, X, y, context, evaluation)
+
+    def TrainModelStream(self, request_iterator, context):
+        logger.info("Starting streaming model training upload via gRPC")
+        assembler = None
+        try:
+            for chunk in request_iterator:
+                if assembler is None:
+                    model_type = chunk.model_type
+                    params = dict(chunk.params)
+                    evaluation = read_evaluation(chunk, context)
+                    assembler = TrainingDataAssembler(n_samples=chunk.n_samples or None)
+                assembler.append(decode_tensor(chunk.X, ndim=2), decode_tensor(chunk.y, ndim=1))
+            if assembler is None:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Empty training stream")
+            X, y = assembler.finish()
+        except ValueError as e:
+            if assembler is not None:
+                assembler.close()
+            logger.error(f"Invalid training stream via gRPC: {str(e)}")
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        try:
+            logger.info(f"Training stream received: {assembler.rows} rows, {assembler.n_features} features")
+            return self._train(model_type, params, X, y, context, evaluation)
+        finally:
+            assembler.close()
 
+    def _train(self, model_type, params, X, y, context, evaluation=None):
+        with session_scope(app):
             logger.info(f"Training model type: {model_type} with {len(X)} samples via gRPC")
 
             if model_type not in AVAILABLE_MODELS:
@@ -81,20 +377,21 @@ class MLService(app_pb2_grpc.MLServiceServicer):
             converted_params = convert_params(params)
             logger.debug(f"Converted parameters via gRPC: {converted_params}")
             
-            ModelClass = AVAILABLE_MODELS[model_type]['class']
-            model = ModelClass(**converted_params)
-            model.fit(X, y)
-
-            y_pred = model.predict(X)
-            metrics = calculate_metrics(y, y_pred)
+            try:
+                model, metrics = fit_model(model_type, converted_params, X, y, evaluation=evaluation)
+            except ValueError as e:
+                logger.error(f"Training failed via gRPC: {str(e)}")
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
 
             model_id = str(uuid.uuid4())
             path = get_model_path(model_id)
-            joblib.dump(model, path)
+            save_model(model, path)
 
             record = create_model_record(model_id, model_type, converted_params, path, metrics)
-            db.session.add(record)
-            db.session.commit()
+            with stage_timer('db_lookup'):
+                db.session.add(record)
+                db.session.commit()
+            metadata_cache.put(record)
 
             logger.info(f"Model trained successfully via gRPC. ID: {model_id}, Metrics: {metrics}")
             return app_pb2.TrainResponse(
@@ -102,77 +399,188 @@ class MLService(app_pb2_grpc.MLServiceServicer):
                 metrics={k: float(v) for k, v in metrics.items()}
             )
 
+    def SubmitTrainJob(self, request, context):
+        logger.info("Training job submission via gRPC")
+        model_type = request.model_type
+        if model_type not in AVAILABLE_MODELS:
+            logger.error(f"Unsupported model type via gRPC: {model_type}")
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Unsupported model type")
+
+        converted_params = convert_params(dict(request.params))
+        evaluation = read_evaluation(request, context)
+        X, y = read_features(request, context, with_labels=True)
+        try:
+            job = job_manager.submit(model_type, converted_params, X, y, evaluation)
+        except QueueFullError:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Training queue is full")
+        except ValueError as e:
+            logger.error(f"Training job rejected via gRPC: {str(e)}")
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        logger.info(f"Training job submitted via gRPC: {job.id}")
+        return job_to_response(job)
+
+    def GetJob(self, request, context):
+        logger.info(f"Request for training job status via gRPC: {request.job_id}")
+        job = job_manager.get(request.job_id)
+        if not job:
+            logger.warning(f"Training job not found via gRPC: {request.job_id}")
+            context.abort(grpc.StatusCode.NOT_FOUND, "Job not found")
+        return job_to_response(job)
+
+    def SearchModel(self, request, context):
+        logger.info("Starting hyperparameter search request via gRPC")
+        model_type = request.model_type
+        if model_type not in AVAILABLE_MODELS:
+            logger.error(f"Unsupported model type via gRPC: {model_type}")
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Unsupported model type")
+
+        converted_params = convert_params(dict(request.params))
+        config = read_search(request, context)
+        X, y = read_features(request, context, with_labels=True)
+        try:
+            result = run_search(model_type, converted_params, X, y, config)
+        except ValueError as e:
+            logger.error(f"Hyperparameter search failed via gRPC: {str(e)}")
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+
+        with session_scope(app):
+            model_id = str(uuid.uuid4())
+            path = get_model_path(model_id)
+            save_model(result['model'], path)
+
+            record = create_model_record(model_id, model_type, result['best_params'], path, result['metrics'])
+            with stage_timer('db_lookup'):
+                db.session.add(record)
+                db.session.commit()
+            metadata_cache.put(record)
+
+        logger.info(f"Search finished via gRPC. Best model ID: {model_id}, params: {result['best_params']}")
+        return search_response(model_id, result)
+
     def GetModel(self, request, context):
         logger.info(f"Request for model info via gRPC: {request.model_id}")
-        with app.app_context():
-            record = MLModel.query.filter_by(id=request.model_id).first()
-            if not record:
-                logger.warning(f"Model not found via gRPC: {request.model_id}")
-                context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
-            
-            logger.info(f"Returning model info via gRPC: {request.model_id}")
-            return app_pb2.ModelResponse(
-                id=str(record.id),
-                model_type=str(record.model_type),
-                params={str(k): str(v) for k, v in record.params.items()} if record.params else {},
-                created_at=record.created_at.isoformat() if record.created_at else "",
-                metrics={str(k): float(v) for k, v in record.metrics.items()} if record.metrics else {}
-            )
+        record = metadata_cache.get(request.model_id, app)
+        if not record:
+            logger.warning(f"Model not found via gRPC: {request.model_id}")
+            context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
+        
+        logger.info(f"Returning model info via gRPC: {request.model_id}")
+        return app_pb2.ModelResponse(
+            id=str(record.id),
+            model_type=str(record.model_type),
+            params={str(k): str(v) for k, v in record.params.items()} if record.params else {},
+            created_at=record.created_at.isoformat() if record.created_at else "",
+            metrics={str(k): float(v) for k, v in record.metrics.items()} if record.metrics else {}
+        )
     
     def DeleteModel(self, request, context):
         logger.info(f"Request to delete model via gRPC: {request.model_id}")
-        with app.app_context():
-            record = MLModel.query.filter_by(id=request.model_id).first()
+        with session_scope(app):
+            with stage_timer('db_lookup'):
+                record = MLModel.query.filter_by(id=request.model_id).first()
             if not record:
                 logger.warning(f"Model not found for deletion via gRPC: {request.model_id}")
                 context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
             
-            if os.path.exists(record.file_path):
-                os.remove(record.file_path)
-                logger.info(f"Model file deleted via gRPC: {record.file_path}")
-            
-            db.session.delete(record)
-            db.session.commit()
+            delete_model_files(record.file_path)
+            model_cache.invalidate(request.model_id)
+
+            with stage_timer('db_lookup'):
+                db.session.delete(record)
+                db.session.commit()
+            metadata_cache.invalidate(request.model_id)
             
             logger.info(f"Model deleted successfully via gRPC: {request.model_id}")
             return app_pb2.DeleteResponse(success=True)
 
     def Predict(self, request, context):
         logger.info(f"Prediction request for model via gRPC: {request.model_id}")
-        with app.app_context():
-            record = MLModel.query.filter_by(id=request.model_id).first()
-            if not record:
-                logger.warning(f"Model not found for prediction via gRPC: {request.model_id}")
-                context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
+        model = get_cached_model(request.model_id)
+        if model is None:
+            logger.warning(f"Model not found for prediction via gRPC: {request.model_id}")
+            context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
+
+        X = read_features(request, context)
+        logger.info(f"Making prediction via gRPC with {len(X)} samples")
+        
+        if predict_batcher is not None:
+            preds = predict_batcher.predict(request.model_id, model, X)
+        else:
+            preds = timed_predict(model, X)
+        logger.info(f"Prediction completed via gRPC. Returning {len(preds)} predictions")
+        return predict_response(preds, packed=request.packed_response)
+
+    def PredictStream(self, request_iterator, context):
+        logger.info("Prediction stream opened via gRPC")
+        chunks = 0
+        rows = 0
+        for chunk in request_iterator:
+            request = chunk.request
+            model_id = request.model_id
+            try:
+                model = get_cached_model(model_id)
+                if model is None:
+                    raise LookupError("Model not found")
+                X = features_from_request(request)
+                preds = timed_predict(model, X)
+            except LookupError:
+                logger.warning(f"Model not found in prediction stream via gRPC: {model_id}")
+                yield app_pb2.PredictChunkResult(chunk_id=chunk.chunk_id, model_id=model_id, error="Model not found")
+                continue
+            except Exception as e:
+                logger.error(f"Prediction stream chunk {chunk.chunk_id} failed via gRPC: {str(e)}")
+                yield app_pb2.PredictChunkResult(chunk_id=chunk.chunk_id, model_id=model_id, error=str(e))
+                continue
+
+            chunks += 1
+            rows += len(preds)
+            yield app_pb2.PredictChunkResult(
+                chunk_id=chunk.chunk_id,
+                model_id=model_id,
+                response=predict_response(preds, packed=request.packed_response)
+            )
+        logger.info(f"Prediction stream closed via gRPC. Scored {rows} rows in {chunks} chunks")
+
+    def GetPredictStats(self, request, context):
+        logger.info("Request for predict batching stats via gRPC")
+        stats = predict_batcher.stats() if predict_batcher is not None else {}
+        stats.update({f"model_cache_{k}": v for k, v in model_cache.stats().items()})
+        stats.update({f"metadata_cache_{k}": v for k, v in metadata_cache.stats().items()})
+        return app_pb2.PredictStatsResponse(
+            batching_enabled=predict_batcher is not None,
+            stats={k: float(v) for k, v in stats.items()}
+        )
 
-            model = joblib.load(record.file_path)
-            X = [list(row.features) for row in request.X]
-            logger.info(f"Making prediction via gRPC with {len(X)} samples")
-            
-            preds = model.predict(X).tolist()
-            logger.info(f"Prediction completed via gRPC. Returning {len(preds)} predictions")
-            return app_pb2.PredictResponse(predictions=[float(p) for p in preds])
-    
     def RetrainModel(self, request, context):
         logger.info(f"Retrain request for model via gRPC: {request.model_id}")
-        with app.app_context():
-            record = MLModel.query.filter_by(id=request.model_id).first()
+        with session_scope(app):
+            with stage_timer('db_lookup'):
+                record = MLModel.query.filter_by(id=request.model_id).first()
             if not record:
                 logger.warning(f"Model not found for retraining via gRPC: {request.model_id}")
                 context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
 
-            model = joblib.load(record.file_path)
-            X = [list(row.features) for row in request.X]
-            y = list(request.y)
-            logger.info(f"Retraining model via gRPC with {len(X)} samples")
+            model = load_model(record.file_path, writable=True)
+            X, y = read_features(request, context, with_labels=True)
+            logger.info(f"Retraining model via gRPC with {len(X)} samples (incremental={request.incremental})")
 
-            model.fit(X, y)
-            joblib.dump(model, record.file_path)
+            try:
+                model, metrics = update_model(
+                    record.model_type, model, X, y,
+                    incremental=request.incremental,
+                    n_new_estimators=request.n_new_estimators or None
+                )
+            except ValueError as e:
+                logger.error(f"Retraining failed via gRPC for model {request.model_id}: {str(e)}")
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, str(e))
+            save_model(model, record.file_path)
+            model_cache.invalidate(request.model_id)
 
-            y_pred = model.predict(X)
-            metrics = calculate_metrics(y, y_pred)
-            record.metrics = metrics
-            db.session.commit()
+            set_model_metrics(record, metrics)
+            with stage_timer('db_lookup'):
+                db.session.commit()
+            metadata_cache.invalidate(request.model_id)
 
             logger.info(f"Model retrained successfully via gRPC: {request.model_id}, New metrics: {metrics}")
             return app_pb2.RetrainResponse(
@@ -181,29 +589,39 @@ class MLService(app_pb2_grpc.MLServiceServicer):
 
     def GetMetrics(self, request, context):
         logger.info(f"Metrics request for model via gRPC: {request.model_id}")
-        with app.app_context():
-            record = MLModel.query.filter_by(id=request.model_id).first()
-            if not record:
-                logger.warning(f"Model not found for metrics via gRPC: {request.model_id}")
-                context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
-            
-            logger.info(f"Returning metrics via gRPC for model: {request.model_id}")
-            return app_pb2.MetricsResponse(
-                metrics={str(k): float(v) for k, v in record.metrics.items()} if record.metrics else {}
-            )
+        record = metadata_cache.get(request.model_id, app)
+        if not record:
+            logger.warning(f"Model not found for metrics via gRPC: {request.model_id}")
+            context.abort(grpc.StatusCode.NOT_FOUND, "Model not found")
+        
+        logger.info(f"Returning metrics via gRPC for model: {request.model_id}")
+        return app_pb2.MetricsResponse(
+            metrics={str(k): float(v) for k, v in record.metrics.items()} if record.metrics else {}
+        )
+
+def create_server(options=None):
+    """gRPC сервер с MLService на порту GRPC_PORT (еще не запущенный)"""
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=GRPC_MAX_WORKERS), options=options,
+                         interceptors=[MetricsInterceptor(), ProfilingInterceptor()])
+    app_pb2_grpc.add_MLServiceServicer_to_server(MLService(), server)
+    server.add_insecure_port(f'[::]:{GRPC_PORT}')
+    return server
 
 def serve():
     logger.info("Starting gRPC server")
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
         logger.info("Database tables created for gRPC server")
     
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=5))
-    app_pb2_grpc.add_MLServiceServicer_to_server(MLService(), server)
-    server.add_insecure_port('[::]:50051')
-    logger.info("gRPC server started on port 50051")
-    print("gRPC server started on port 50051")
+    server = create_server()
+    if predict_batcher is not None:
+        logger.info(f"Predict batching enabled: max_batch_size={GRPC_BATCH_MAX_SIZE}, max_wait_ms={GRPC_BATCH_MAX_WAIT_MS}")
+    logger.info(f"gRPC server started on port {GRPC_PORT}")
+    print(f"gRPC server started on port {GRPC_PORT}")
     server.start()
+    start_exporter()
+    # sklearn импортируется в фоне: сервер отвечает сразу, а первое обучение не ждет импорта
+    threading.Thread(target=warm_up_imports, name='warm-up-imports', daemon=True).start()
     logger.info("gRPC server waiting for termination")
     server.wait_for_termination()
 
@@ -0,0 +1,168 @@
+import os
+import time
+import shutil
+import signal
+import logging
+import tempfile
+import threading
+import multiprocessing
+from multiprocessing.connection import wait
+from logging.handlers import RotatingFileHandler
+
+"""
+Pre-fork режим gRPC сервера: супервизор запускает GRPC_WORKERS процессов
+grpc_server, и каждый слушает один и тот же порт с SO_REUSEPORT — ядро
+распределяет между ними входящие соединения. У каждого процесса свой GIL,
+кэши моделей и метаданных, пул соединений с БД и очередь задач обучения.
+Супервизор перезапускает упавшие процессы (с задержкой, если они падают
+сразу после старта) и по SIGTERM/SIGINT останавливает их, давая дообработать
+текущие запросы. Запуск: python grpc_supervisor.py
+"""
+
+logger = logging.getLogger('grpc_supervisor')
+logger.setLevel(logging.INFO)
+
+file_handler = RotatingFileHandler(
+    'logs/grpc_supervisor.log',
+    maxBytes=1024 * 1024,
+    backupCount=10
+)
+formatter = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+file_handler.setFormatter(formatter)
+logger.addHandler(file_handler)
+
+# Число процессов-обработчиков; по умолчанию — по одному на ядро
+GRPC_WORKERS = int(os.getenv('GRPC_WORKERS', os.cpu_count() or 1))
+# Сколько секунд процессы дообрабатывают запросы при остановке
+GRPC_SHUTDOWN_GRACE = float(os.getenv('GRPC_SHUTDOWN_GRACE', 5))
+# Процесс, проживший меньше этого времени, считается упавшим при старте:
+# перед его перезапуском выдерживается растущая задержка (до GRPC_RESTART_BACKOFF_MAX)
+GRPC_RESTART_MIN_UPTIME = float(os.getenv('GRPC_RESTART_MIN_UPTIME', 10))
+GRPC_RESTART_BACKOFF_MAX = float(os.getenv('GRPC_RESTART_BACKOFF_MAX', 30))
+
+
+def _watch_parent(server, parent_pid):
+    # Если супервизор убит без остановки процессов (SIGKILL), они завершаются сами
+    while os.getppid() == parent_pid:
+        time.sleep(1.0)
+    server.stop(GRPC_SHUTDOWN_GRACE)
+
+
+def run_worker(index, parent_pid):
+    """Точка входа процесса-обработчика"""
+    # Сервер импортируется в самом процессе: gRPC нельзя переносить через fork
+    import grpc_server
+
+    server = grpc_server.create_server(options=[('grpc.so_reuseport', 1)])
+    server.start()
+    threading.Thread(target=grpc_server.warm_up_imports, name='warm-up-imports', daemon=True).start()
+    # Ctrl+C приходит всей группе процессов; остановкой управляет супервизор
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop(GRPC_SHUTDOWN_GRACE))
+    threading.Thread(target=_watch_parent, args=(server, parent_pid), daemon=True).start()
+    grpc_server.logger.info(f"gRPC worker {index} (pid {os.getpid()}) serving on port {grpc_server.GRPC_PORT}")
+
+    server.wait_for_termination()
+    grpc_server.job_manager.shutdown(wait=False)
+    grpc_server.logger.info(f"gRPC worker {index} (pid {os.getpid()}) stopped")
+
+
+class Supervisor:
+    """Запускает процессы-обработчики, перезапускает упавшие и останавливает их по сигналу"""
+
+    def __init__(self, workers=GRPC_WORKERS, target=run_worker):
+        self.workers = workers
+        self.target = target
+        self._ctx = multiprocessing.get_context('spawn')
+        self._processes = {}
+        self._started_at = {}
+        self._crashes = {}
+        self._restart_at = {}
+        self._stopping = False
+        self.restarts = 0
+
+    def _spawn(self, index):
+        process = self._ctx.Process(target=self.target, args=(index, os.getpid()), name=f'grpc-worker-{index}')
+        process.start()
+        self._processes[index] = process
+        self._started_at[index] = time.monotonic()
+        logger.info(f"Started gRPC worker {index} (pid {process.pid})")
+
+    def _on_exit(self, index, process):
+        uptime = time.monotonic() - self._started_at[index]
+        del self._processes[index]
+        if uptime < GRPC_RESTART_MIN_UPTIME:
+            self._crashes[index] = self._crashes.get(index, 0) + 1
+        else:
+            self._crashes[index] = 0
+        delay = min(GRPC_RESTART_BACKOFF_MAX, 0.5 * 2 ** self._crashes[index]) if self._crashes[index] else 0.0
+        logger.warning(f"gRPC worker {index} (pid {process.pid}) exited with code {process.exitcode} "
+                       f"after {uptime:.1f}s, restarting in {delay:.1f}s")
+        self._restart_at[index] = time.monotonic() + delay
+
+    def stop(self, *args):
+        self._stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.workers):
+            self._spawn(index)
+        logger.info(f"Supervisor (pid {os.getpid()}) running {self.workers} gRPC workers")
+
+        while not self._stopping:
+            now = time.monotonic()
+            for index, restart_at in list(self._restart_at.items()):
+                if restart_at <= now:
+                    del self._restart_at[index]
+                    self._spawn(index)
+                    self.restarts += 1
+            # Просыпаемся, когда завершится любой процесс, но не реже раза в секунду
+            wait([p.sentinel for p in self._processes.values()], timeout=1.0)
+            for index, process in list(self._processes.items()):
+                if not process.is_alive():
+                    self._on_exit(index, process)
+
+        self.shutdown()
+
+    def shutdown(self):
+        logger.info(f"Stopping {len(self._processes)} gRPC workers")
+        for process in self._processes.values():
+            process.terminate()
+        deadline = time.monotonic() + GRPC_SHUTDOWN_GRACE + 5
+        for process in self._processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"gRPC worker pid {process.pid} did not stop in time, killing it")
+                process.kill()
+                process.join()
+        self._processes.clear()
+        logger.info("All gRPC workers stopped")
+
+
+def serve():
+    # Процессы пишут метрики в общий каталог, супервизор отдает их сумму на GRPC_METRICS_PORT.
+    # Переменная задается до запуска процессов: они читают ее при импорте prometheus_client
+    metrics_dir = None
+    if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        metrics_dir = os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='grpc-metrics-')
+    import grpc_server
+    from migrate import upgrade_schema
+    from service_metrics import start_exporter
+
+    # Схема обновляется один раз до старта процессов, чтобы они не делали это одновременно
+    with grpc_server.app.app_context():
+        upgrade_schema()
+    start_exporter()
+    print(f"gRPC supervisor started: {GRPC_WORKERS} workers on port {grpc_server.GRPC_PORT}")
+    try:
+        Supervisor().run()
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,75 @@
+import gc
+import os
+import shutil
+import tempfile
+
+"""
+Production-запуск REST API: gunicorn -c gunicorn.conf.py app:app
+(или REST_SERVER_MODE=gunicorn ./run_services.sh).
+
+Приложение загружается в главном процессе (preload_app), там же обновляется
+схема БД и заранее загружаются модели; воркеры создаются через fork и
+разделяют страницы с массивами моделей copy-on-write. Пул соединений с БД
+каждый воркер открывает заново после fork.
+"""
+
+# Воркеры пишут метрики Prometheus в общий каталог, /metrics любого воркера отдает их сумму.
+# Конфигурация читается до загрузки приложения, поэтому каталог успевает попасть в окружение
+METRICS_DIR = None
+if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    METRICS_DIR = os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='rest-metrics-')
+
+bind = os.getenv('REST_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('REST_WORKERS', os.cpu_count() or 1))
+threads = int(os.getenv('REST_THREADS', 4))
+worker_class = 'gthread'
+
+# У каждого воркера свой пул фонового обучения (training_jobs.py): без явного
+# TRAIN_MAX_WORKERS общее число процессов обучения REST_TRAIN_WORKERS делится
+# между воркерами, а не умножается на их число. Статус задачи отдает любой воркер
+REST_TRAIN_WORKERS = int(os.getenv('REST_TRAIN_WORKERS', 2))
+if not os.getenv('TRAIN_MAX_WORKERS'):
+    os.environ['TRAIN_MAX_WORKERS'] = str(max(1, REST_TRAIN_WORKERS // workers))
+# Синхронное обучение (/models/train, /models/search) может занимать минуты
+timeout = int(os.getenv('REST_TIMEOUT', 300))
+graceful_timeout = int(os.getenv('REST_GRACEFUL_TIMEOUT', 30))
+preload_app = True
+accesslog = os.getenv('REST_ACCESS_LOG', '-')
+
+# Какие модели загрузить до fork: id через запятую и/или несколько последних обученных
+REST_PRELOAD_MODELS = [m.strip() for m in os.getenv('REST_PRELOAD_MODELS', '').split(',') if m.strip()]
+REST_PRELOAD_LATEST = int(os.getenv('REST_PRELOAD_LATEST', 10))
+
+
+def when_ready(server):
+    # Выполняется в главном процессе после загрузки приложения, до запуска воркеров
+    from app import app, preload_models
+    from migrate import upgrade_schema
+    from models import db, warm_up_imports
+
+    with app.app_context():
+        upgrade_schema()
+    # sklearn импортируется до fork: воркеры получают его готовым и разделяют эти страницы
+    warm_up_imports()
+    loaded = preload_models(REST_PRELOAD_MODELS, REST_PRELOAD_LATEST)
+    with app.app_context():
+        # Соединения главного процесса не должны достаться воркерам
+        db.engine.dispose()
+    # Уже созданные объекты переводятся в постоянное поколение: сборщик мусора
+    # в воркерах их не обходит и не копирует их страницы
+    gc.freeze()
+    server.log.info(f"Preloaded {len(loaded)} models, starting {workers} workers x {threads} threads")
+
+
+def post_fork(server, worker):
+    from app import app
+    from models import db
+
+    with app.app_context():
+        # Унаследованный пул отбрасывается без закрытия соединений родителя
+        db.engine.dispose(close=False)
+
+
+def on_exit(server):
+    if METRICS_DIR is not None:
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
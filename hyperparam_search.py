@@ -0,0 +1,205 @@
+import os
+import time
+import logging
+
+import numpy as np
+
+from models import get_model_class, convert_params, calculate_metrics
+
+logger = logging.getLogger('hyperparam_search')
+logger.setLevel(logging.INFO)
+
+# Сколько ядер максимум может занять один поиск гиперпараметров
+SEARCH_MAX_CORES = int(os.getenv('SEARCH_MAX_CORES', os.cpu_count() or 1))
+# Ограничение на число конфигураций в одном поиске
+SEARCH_MAX_CANDIDATES = int(os.getenv('SEARCH_MAX_CANDIDATES', 1000))
+
+SEARCH_STRATEGIES = ('grid', 'random', 'halving')
+DEFAULT_N_ITER = 20
+DEFAULT_CV = 3
+DEFAULT_FACTOR = 3
+DEFAULT_SCORING = 'accuracy'
+
+
+def _convert_value(value):
+    """Приводит значение из пространства поиска к типу параметра модели"""
+    if isinstance(value, str) and value.lower() in ('none', 'null'):
+        return None
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return convert_params({'value': value})['value']
+
+
+class _IntegerDistribution:
+    """Округляет выборку из непрерывного распределения до целых (например, n_estimators по лог-шкале)"""
+
+    def __init__(self, distribution):
+        self.distribution = distribution
+
+    def rvs(self, size=None, random_state=None):
+        values = np.round(self.distribution.rvs(size=size, random_state=random_state)).astype(int)
+        return values if size is not None else int(values)
+
+
+def _parse_dimension(name, spec):
+    """Список значений или диапазон {low, high, log, integer} для случайного поиска"""
+    from scipy import stats
+
+    if isinstance(spec, (list, tuple)):
+        if not spec:
+            raise ValueError(f"Parameter {name} has no values to search")
+        return [_convert_value(v) for v in spec]
+    if isinstance(spec, dict) and 'low' in spec and 'high' in spec:
+        low, high = spec['low'], spec['high']
+        if not low < high:
+            raise ValueError(f"Parameter {name}: low must be less than high")
+        integer = spec.get('integer', isinstance(low, int) and isinstance(high, int))
+        if spec.get('log'):
+            if low <= 0:
+                raise ValueError(f"Parameter {name}: log range needs positive low")
+            distribution = stats.loguniform(low, high)
+            return _IntegerDistribution(distribution) if integer else distribution
+        if integer:
+            return stats.randint(int(low), int(high) + 1)
+        return stats.uniform(low, high - low)
+    return [_convert_value(spec)]
+
+
+def parse_search(config):
+    """Проверяет настройки поиска и заполняет значения по умолчанию"""
+    from sklearn.metrics import get_scorer_names
+
+    config = dict(config or {})
+    strategy = config.get('strategy') or 'grid'
+    if strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Search strategy must be one of {', '.join(SEARCH_STRATEGIES)}")
+    space = config.get('param_space') or {}
+    if not isinstance(space, dict) or not space:
+        raise ValueError("param_space must be a non-empty object of parameter -> values")
+    param_space = {name: _parse_dimension(name, spec) for name, spec in space.items()}
+    has_ranges = any(not isinstance(values, list) for values in param_space.values())
+    if strategy == 'grid' and has_ranges:
+        raise ValueError("Grid search needs explicit value lists, use random or halving for ranges")
+
+    scoring = config.get('scoring') or DEFAULT_SCORING
+    if scoring not in get_scorer_names():
+        raise ValueError(f"Unknown scoring: {scoring}")
+    cv = int(config.get('cv') or DEFAULT_CV)
+    if cv < 2:
+        raise ValueError("cv must be at least 2")
+    factor = int(config.get('factor') or DEFAULT_FACTOR)
+    if factor < 2:
+        raise ValueError("factor must be at least 2")
+    n_jobs = int(config.get('n_jobs') or SEARCH_MAX_CORES)
+    n_iter = int(config.get('n_iter') or DEFAULT_N_ITER)
+
+    grid_size = int(np.prod([len(v) for v in param_space.values()])) if not has_ranges else None
+    n_candidates = grid_size if strategy == 'grid' or (strategy == 'halving' and not has_ranges) else n_iter
+    if n_candidates > SEARCH_MAX_CANDIDATES:
+        raise ValueError(f"Search has {n_candidates} candidates, limit is {SEARCH_MAX_CANDIDATES}")
+
+    return {
+        'strategy': strategy,
+        'param_space': param_space,
+        'has_ranges': has_ranges,
+        'scoring': scoring,
+        'cv': cv,
+        'factor': factor,
+        'n_iter': n_iter,
+        'n_jobs': max(1, min(n_jobs, SEARCH_MAX_CORES)),
+        'random_state': config.get('random_state', 0),
+    }
+
+
+def _make_search(estimator, config):
+    from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingGridSearchCV, HalvingRandomSearchCV
+
+    common = {
+        'scoring': config['scoring'],
+        'cv': config['cv'],
+        'n_jobs': config['n_jobs'],
+        'refit': True,
+        'error_score': np.nan,
+    }
+    if config['strategy'] == 'grid':
+        return GridSearchCV(estimator, config['param_space'], **common)
+    if config['strategy'] == 'random':
+        return RandomizedSearchCV(estimator, config['param_space'], n_iter=config['n_iter'],
+                                  random_state=config['random_state'], **common)
+    # Successive halving: все кандидаты стартуют на малой доле выборки,
+    # в следующий раунд проходит 1/factor лучших, ресурс растет в factor раз
+    if config['has_ranges']:
+        return HalvingRandomSearchCV(estimator, config['param_space'], n_candidates=config['n_iter'],
+                                     factor=config['factor'], random_state=config['random_state'], **common)
+    return HalvingGridSearchCV(estimator, config['param_space'], factor=config['factor'],
+                               random_state=config['random_state'], **common)
+
+
+def _score(value):
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _plain(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _trials(cv_results):
+    """Таблица испытаний из cv_results_: параметры, оценка, ранг и время обучения"""
+    trials = []
+    for i, params in enumerate(cv_results['params']):
+        trial = {
+            'params': {k: _plain(v) for k, v in params.items()},
+            'mean_score': _score(cv_results['mean_test_score'][i]),
+            'std_score': _score(cv_results['std_test_score'][i]),
+            'rank': int(cv_results['rank_test_score'][i]),
+            'mean_fit_time': float(cv_results['mean_fit_time'][i]),
+        }
+        if 'iter' in cv_results:
+            trial['iteration'] = int(cv_results['iter'][i])
+            trial['n_resources'] = int(cv_results['n_resources'][i])
+        trials.append(trial)
+    return trials
+
+
+def run_search(model_type, params, X, y, config):
+    """Ищет лучшие гиперпараметры модели и обучает ее на всей выборке.
+
+    Кандидаты оцениваются кросс-валидацией на пуле процессов joblib (не больше
+    SEARCH_MAX_CORES). Возвращает лучшую модель, ее параметры (вместе с
+    фиксированными params), метрики и таблицу всех испытаний.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    estimator = get_model_class(model_type)(**params)
+    unknown = set(config['param_space']) - set(estimator.get_params())
+    if unknown:
+        raise ValueError(f"Unknown hyperparameters for {model_type}: {', '.join(sorted(unknown))}")
+    search = _make_search(estimator, config)
+    logger.info(f"Running {config['strategy']} search for {model_type} on {config['n_jobs']} cores")
+
+    start = time.perf_counter()
+    search.fit(X, y)
+    search_time = time.perf_counter() - start
+    if np.isnan(search.best_score_):
+        raise ValueError("All search candidates failed to fit")
+
+    best_params = dict(params, **{k: _plain(v) for k, v in search.best_params_.items()})
+    model = search.best_estimator_
+    metrics = calculate_metrics(y, model.predict(X))
+    metrics[f"cv_{config['scoring']}"] = float(search.best_score_)
+
+    trials = _trials(search.cv_results_)
+    logger.info(f"Search finished in {search_time:.2f}s: {len(trials)} trials, "
+                f"best {config['scoring']}={search.best_score_:.4f} with {search.best_params_}")
+    return {
+        'model': model,
+        'best_params': best_params,
+        'best_score': float(search.best_score_),
+        'scoring': config['scoring'],
+        'metrics': metrics,
+        'trials': trials,
+        'search_time': search_time,
+    }
@@ -0,0 +1,151 @@
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from models import MLModel
+from service_metrics import cache_lookup, stage_timer
+
+logger = logging.getLogger('metadata_cache')
+logger.setLevel(logging.INFO)
+
+# Сколько секунд запись считается актуальной. REST и gRPC серверы — разные
+# процессы, поэтому изменения, сделанные другим сервером, видны не позже чем через TTL
+METADATA_CACHE_TTL = float(os.getenv('METADATA_CACHE_TTL', 30))
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv('METADATA_CACHE_MAX_ENTRIES', 10000))
+
+
+class ModelMetadata:
+    """Снимок записи MLModel, не привязанный к сессии БД"""
+    __slots__ = ('id', 'model_type', 'params', 'file_path', 'created_at', 'metrics', 'revision')
+
+    def __init__(self, id, model_type, params, file_path, created_at, metrics, revision=1):
+        self.id = id
+        self.model_type = model_type
+        self.params = params
+        self.file_path = file_path
+        self.created_at = created_at
+        self.metrics = metrics
+        self.revision = revision
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(
+            id=record.id,
+            model_type=record.model_type,
+            params=dict(record.params) if record.params else record.params,
+            file_path=record.file_path,
+            created_at=record.created_at,
+            metrics=dict(record.metrics) if record.metrics else record.metrics,
+            revision=record.revision
+        )
+
+    def to_dict(self):
+        """Тот же формат, что и MLModel.to_dict"""
+        return {
+            'id': self.id,
+            'model_type': self.model_type,
+            'params': self.params,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'metrics': self.metrics
+        }
+
+
+class ModelMetadataCache:
+    """Read-through кэш метаданных моделей (путь к файлу, тип, параметры, метрики) по id.
+
+    При промахе запись читается из БД; отсутствующие модели не кэшируются.
+    Записи живут ttl секунд и сбрасываются явно при обучении, переобучении и удалении.
+    """
+
+    def __init__(self, ttl=METADATA_CACHE_TTL, max_entries=METADATA_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, model_id, app=None):
+        """Возвращает метаданные модели или None, если модели нет.
+
+        Без app запрос к БД выполняется в текущем контексте приложения; с app —
+        контекст открывается только при промахе.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry is not None:
+                metadata, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(model_id)
+                    self.hits += 1
+                    cache_lookup('metadata', hit=True)
+                    return metadata
+                del self._entries[model_id]
+                self.expired += 1
+            self.misses += 1
+        cache_lookup('metadata', hit=False)
+
+        if app is not None:
+            with app.app_context():
+                metadata = self._query(model_id)
+        else:
+            metadata = self._query(model_id)
+        if metadata is not None:
+            self._store(metadata)
+        return metadata
+
+    def _query(self, model_id):
+        with stage_timer('db_lookup'):
+            record = MLModel.query.filter_by(id=model_id).first()
+        return ModelMetadata.from_record(record) if record else None
+
+    def peek(self, model_id):
+        """Актуальная запись из кэша без обращения к БД; None при промахе (статистика не меняется)"""
+        with self._lock:
+            entry = self._entries.get(model_id)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+        return None
+
+    def put(self, record):
+        """Кладет в кэш только что созданную или обновленную запись"""
+        metadata = ModelMetadata.from_record(record)
+        self._store(metadata)
+        return metadata
+
+    def _store(self, metadata):
+        with self._lock:
+            self._entries[metadata.id] = (metadata, time.monotonic() + self.ttl)
+            self._entries.move_to_end(metadata.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, model_id):
+        """Удаляет запись (после переобучения или удаления модели)"""
+        with self._lock:
+            self._entries.pop(model_id, None)
+        logger.debug(f"Metadata cache invalidated: {model_id}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Общий кэш процесса, используется и REST, и gRPC сервером
+metadata_cache = ModelMetadataCache()
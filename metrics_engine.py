@@ -0,0 +1,131 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger('metrics_engine')
+logger.setLevel(logging.INFO)
+
+
+class ConfusionMatrix:
+    """Матрица ошибок, из которой за один проход считаются все метрики классификации.
+
+    Матрица строится одним np.bincount по закодированным парам (истина, прогноз).
+    Ее можно накапливать по частям (update) и объединять (merge), поэтому метрики
+    для данных, не помещающихся в память, считаются по порциям.
+    Строки — истинные классы, столбцы — предсказанные.
+    """
+
+    def __init__(self):
+        self.labels = np.array([])
+        self.matrix = np.zeros((0, 0), dtype=np.int64)
+
+    @classmethod
+    def from_predictions(cls, y_true, y_pred):
+        return cls().update(y_true, y_pred)
+
+    def update(self, y_true, y_pred):
+        """Добавляет порцию пар (истина, прогноз)"""
+        y_true = np.asarray(y_true).ravel()
+        y_pred = np.asarray(y_pred).ravel()
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"y_true has {len(y_true)} samples but y_pred has {len(y_pred)}")
+        if len(y_true) == 0:
+            return self
+
+        if _is_small_int(y_true) and _is_small_int(y_pred):
+            # Метки — небольшие неотрицательные целые: кодировать их не нужно,
+            # обходимся без сортировки в np.unique
+            k = int(max(y_true.max(), y_pred.max())) + 1
+            counts = np.bincount(y_true.astype(np.int64) * k + y_pred, minlength=k * k).reshape(k, k)
+            present = (counts.sum(axis=0) + counts.sum(axis=1)) > 0
+            labels = np.flatnonzero(present)
+            counts = counts[np.ix_(present, present)]
+        else:
+            labels, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+            k = len(labels)
+            n = len(y_true)
+            counts = np.bincount(codes[:n] * k + codes[n:], minlength=k * k).reshape(k, k)
+        self._add(labels, counts)
+        return self
+
+    def merge(self, other):
+        """Объединяет с другой матрицей (например, посчитанной на другой порции данных)"""
+        self._add(other.labels, other.matrix)
+        return self
+
+    def _add(self, labels, counts):
+        if len(self.labels) == 0:
+            self.labels = labels
+            self.matrix = counts.astype(np.int64)
+            return
+        union = np.union1d(self.labels, labels)
+        matrix = np.zeros((len(union), len(union)), dtype=np.int64)
+        old = np.searchsorted(union, self.labels)
+        new = np.searchsorted(union, labels)
+        matrix[np.ix_(old, old)] += self.matrix
+        matrix[np.ix_(new, new)] += counts
+        self.labels = union
+        self.matrix = matrix
+
+    @property
+    def total(self):
+        return int(self.matrix.sum())
+
+    def per_class(self):
+        """Счетчики и метрики по каждому классу"""
+        tp = np.diag(self.matrix)
+        support = self.matrix.sum(axis=1)
+        predicted = self.matrix.sum(axis=0)
+        precision = _safe_divide(tp, predicted)
+        recall = _safe_divide(tp, support)
+        f1 = _safe_divide(2 * tp, support + predicted)
+        return {
+            label.item() if hasattr(label, 'item') else label: {
+                'tp': int(tp[i]),
+                'fp': int(predicted[i] - tp[i]),
+                'fn': int(support[i] - tp[i]),
+                'support': int(support[i]),
+                'precision': float(precision[i]),
+                'recall': float(recall[i]),
+                'f1': float(f1[i]),
+            }
+            for i, label in enumerate(self.labels)
+        }
+
+    def metrics(self):
+        """Accuracy, weighted и macro precision/recall/F1 (при делении на ноль — 0, как zero_division=0)"""
+        total = self.total
+        if total == 0:
+            return dict.fromkeys(('accuracy', 'precision', 'recall', 'f1',
+                                  'precision_macro', 'recall_macro', 'f1_macro'), 0.0)
+        tp = np.diag(self.matrix)
+        support = self.matrix.sum(axis=1)
+        predicted = self.matrix.sum(axis=0)
+        precision = _safe_divide(tp, predicted)
+        recall = _safe_divide(tp, support)
+        f1 = _safe_divide(2 * tp, support + predicted)
+        weights = support / total
+        return {
+            'accuracy': float(tp.sum() / total),
+            'precision': float(precision @ weights),
+            'recall': float(recall @ weights),
+            'f1': float(f1 @ weights),
+            'precision_macro': float(precision.mean()),
+            'recall_macro': float(recall.mean()),
+            'f1_macro': float(f1.mean()),
+        }
+
+
+# Максимальная метка, при которой матрица строится без кодирования меток
+_MAX_DIRECT_LABEL = 1024
+
+
+def _is_small_int(y):
+    return y.dtype.kind in 'iub' and y.min() >= 0 and y.max() < _MAX_DIRECT_LABEL
+
+
+def _safe_divide(numerator, denominator):
+    numerator = numerator.astype(np.float64)
+    result = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=result, where=denominator != 0)
+    return result
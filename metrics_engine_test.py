@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, confusion_matrix, precision_recall_fscore_support
+
+from metrics_engine import ConfusionMatrix
+
+
+def make_predictions(n_samples=500, n_classes=4, seed=0):
+    rng = np.random.RandomState(seed)
+    y_true = rng.randint(0, n_classes, n_samples)
+    # Прогноз совпадает с истиной примерно в 60% случаев
+    y_pred = np.where(rng.rand(n_samples) < 0.6, y_true, rng.randint(0, n_classes, n_samples))
+    return y_true, y_pred
+
+
+def sklearn_metrics(y_true, y_pred):
+    result = {'accuracy': accuracy_score(y_true, y_pred)}
+    for average, suffix in (('weighted', ''), ('macro', '_macro')):
+        precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, average=average, zero_division=0)
+        result.update({f'precision{suffix}': precision, f'recall{suffix}': recall, f'f1{suffix}': f1})
+    return result
+
+
+def assert_metrics_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        assert actual[name] == pytest.approx(value, abs=1e-12), name
+
+
+@pytest.mark.parametrize("labels", [None, np.array(["ant", "bee", "cat", "dog"])])
+def test_metrics_match_sklearn(labels):
+    y_true, y_pred = make_predictions()
+    if labels is not None:
+        y_true, y_pred = labels[y_true], labels[y_pred]
+    matrix = ConfusionMatrix.from_predictions(y_true, y_pred)
+
+    np.testing.assert_array_equal(matrix.matrix, confusion_matrix(y_true, y_pred))
+    assert_metrics_equal(matrix.metrics(), sklearn_metrics(y_true, y_pred))
+
+
+def test_class_never_predicted_counts_as_zero():
+    y_true = np.array([0, 1, 2, 2, 1, 0, 2])
+    y_pred = np.array([0, 1, 1, 1, 1, 0, 1])
+    metrics = ConfusionMatrix.from_predictions(y_true, y_pred).metrics()
+
+    assert_metrics_equal(metrics, sklearn_metrics(y_true, y_pred))
+    assert ConfusionMatrix.from_predictions(y_true, y_pred).per_class()[2]['precision'] == 0.0
+
+
+def test_merged_fold_matrices_match_pooled_predictions():
+    y_true, y_pred = make_predictions(n_classes=3, seed=1)
+    # В одном из фолдов нет класса 2: метки объединяются при слиянии
+    folds = np.array_split(np.arange(len(y_true)), 5)
+    folds[0] = folds[0][y_true[folds[0]] != 2]
+    folds[0] = folds[0][y_pred[folds[0]] != 2]
+
+    pooled = ConfusionMatrix()
+    for idx in folds:
+        pooled.merge(ConfusionMatrix.from_predictions(y_true[idx], y_pred[idx]))
+
+    idx = np.concatenate(folds)
+    np.testing.assert_array_equal(pooled.matrix, confusion_matrix(y_true[idx], y_pred[idx]))
+    assert_metrics_equal(pooled.metrics(), sklearn_metrics(y_true[idx], y_pred[idx]))
+
+
+def test_update_in_chunks_equals_single_pass():
+    y_true, y_pred = make_predictions(seed=2)
+    chunked = ConfusionMatrix()
+    for start in range(0, len(y_true), 64):
+        chunked.update(y_true[start:start + 64], y_pred[start:start + 64])
+
+    single = ConfusionMatrix.from_predictions(y_true, y_pred)
+    np.testing.assert_array_equal(chunked.labels, single.labels)
+    np.testing.assert_array_equal(chunked.matrix, single.matrix)
+
+
+def test_empty_matrix_and_length_mismatch():
+    assert set(ConfusionMatrix().metrics().values()) == {0.0}
+    with pytest.raises(ValueError):
+        ConfusionMatrix.from_predictions([0, 1], [0])
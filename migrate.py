@@ -0,0 +1,102 @@
+import logging
+
+from flask import Flask
+from sqlalchemy import exists, inspect
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+
+from database import configure_database
+from models import db, MLModel, ModelMetric, Revision, MODELS_REVISION
+from model_listing import ensure_indexes
+
+"""
+Миграции БД моделей. Запуск: python migrate.py (БД берется из DATABASE_URL,
+по умолчанию instance/test.db). Каждый шаг можно запускать повторно.
+"""
+
+logger = logging.getLogger('migrate')
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.StreamHandler())
+
+BACKFILL_BATCH_SIZE = 500
+
+# Колонки, добавленные в существующие таблицы после их создания: (таблица, колонка, DDL)
+ADDED_COLUMNS = [
+    ('ml_model', 'revision', 'INTEGER NOT NULL DEFAULT 1'),
+]
+
+
+def _columns(table):
+    return {column['name'] for column in inspect(db.engine).get_columns(table)}
+
+
+def add_missing_columns():
+    """Добавляет новые колонки в таблицы, созданные старой версией (create_all их не добавляет)"""
+    for table, column, ddl in ADDED_COLUMNS:
+        if column in _columns(table):
+            continue
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        except (OperationalError, ProgrammingError):
+            # REST и gRPC серверы могут выполнять миграцию одновременно
+            if column not in _columns(table):
+                raise
+        logger.info(f"Added column {table}.{column}")
+
+
+def seed_revisions():
+    """Создает строку счетчика изменений списка моделей (ее только обновляют при изменениях)"""
+    table = Revision.__table__
+    with db.engine.connect() as connection:
+        if connection.execute(db.select(table.c.name).where(table.c.name == MODELS_REVISION)).first():
+            return
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(table.insert().values(name=MODELS_REVISION, value=0))
+    except IntegrityError:
+        # Строку одновременно создал другой сервер
+        return
+    logger.info(f"Created revision counter {MODELS_REVISION}")
+
+
+def upgrade_schema():
+    """Приводит схему БД к текущей версии; вызывается при запуске серверов"""
+    db.create_all()
+    add_missing_columns()
+    ensure_indexes()
+    seed_revisions()
+
+
+def backfill_model_metrics():
+    """Заполняет таблицу ModelMetric по JSON-метрикам моделей, у которых строк метрик еще нет"""
+    missing = ~exists().where(ModelMetric.model_id == MLModel.id)
+    total = 0
+    last_id = ''
+    while True:
+        records = (MLModel.query.filter(missing, MLModel.id > last_id)
+                   .order_by(MLModel.id).limit(BACKFILL_BATCH_SIZE).all())
+        if not records:
+            break
+        last_id = records[-1].id
+        db.session.add_all([
+            ModelMetric(model_id=record.id, name=name, value=float(value), model_type=record.model_type)
+            for record in records
+            for name, value in (record.metrics or {}).items()
+            if isinstance(value, (int, float))
+        ])
+        db.session.commit()
+        total += len(records)
+    logger.info(f"Backfilled metrics of {total} models")
+    return total
+
+
+def run_migrations(app):
+    with app.app_context():
+        upgrade_schema()
+        backfill_model_metrics()
+
+
+if __name__ == '__main__':
+    app = Flask(__name__)
+    configure_database(app)
+    run_migrations(app)
@@ -0,0 +1,170 @@
+import os
+import logging
+import functools
+import threading
+from collections import OrderedDict
+
+from models import load_model, load_predictor
+from service_metrics import cache_lookup, timed_predict
+
+logger = logging.getLogger('model_cache')
+logger.setLevel(logging.INFO)
+
+# Бюджет памяти кэша по умолчанию — 512 МБ
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Суффикс ключа исходной модели sklearn, которой скомпилированная форма передает большие пачки
+FULL_MODEL_SUFFIX = ':full'
+
+
+class _Entry:
+    __slots__ = ('model', 'size', 'mtime_ns')
+
+    def __init__(self, model, size, mtime_ns):
+        self.model = model
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+
+class _Loading:
+    """Загрузка модели, которую ждут конкурентные запросы"""
+    __slots__ = ('event', 'model', 'mtime_ns', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.model = None
+        self.mtime_ns = None
+        self.error = None
+
+
+class ModelCache:
+    """LRU-кэш загруженных моделей с вытеснением по оценке занимаемой памяти.
+
+    Размер модели оценивается по размеру артефакта на диске: joblib сохраняет
+    numpy-массивы без сжатия, поэтому размер файла близок к объему в памяти
+    (в режиме mmap это верхняя оценка — часть страниц разделяется с другими процессами).
+    Для скомпилированной формы (compiled_inference) берется точный объем ее массивов;
+    исходная модель, нужная ей для больших пачек, загружается при первой такой
+    пачке и хранится в кэше отдельной записью (ключ <id>:full).
+    Запись сверяется с mtime файла, так что переобучение модели другим
+    процессом (REST или gRPC сервером) тоже приводит к перезагрузке.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, loader=load_predictor):
+        self.max_bytes = max_bytes
+        self._loader = loader
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_id, path, loader=None):
+        """Возвращает модель из кэша, загружая ее с диска при необходимости"""
+        mtime_ns = os.stat(path).st_mtime_ns
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(model_id)
+                if entry is not None and entry.mtime_ns == mtime_ns:
+                    self._entries.move_to_end(model_id)
+                    self.hits += 1
+                    cache_lookup('model', hit=True)
+                    logger.debug(f"Model cache hit: {model_id}")
+                    return entry.model
+
+                loading = self._loading.get(model_id)
+                owner = loading is None
+                if owner:
+                    loading = _Loading()
+                    self._loading[model_id] = loading
+                    self.misses += 1
+
+            if owner:
+                cache_lookup('model', hit=False)
+                return self._load(model_id, path, mtime_ns, loading, loader or self._loader)
+
+            # Модель уже загружается другим потоком — ждем его результат
+            loading.event.wait()
+            if loading.error is not None:
+                raise loading.error
+            if loading.mtime_ns == mtime_ns:
+                with self._lock:
+                    self.hits += 1
+                cache_lookup('model', hit=True)
+                return loading.model
+
+    def _load(self, model_id, path, mtime_ns, loading, loader):
+        logger.info(f"Model cache miss, loading from disk: {model_id}")
+        try:
+            model = loader(path)
+            if hasattr(model, 'fallback'):
+                model.fallback = functools.partial(self.get, model_id + FULL_MODEL_SUFFIX, path, load_model)
+            # У скомпилированной формы объем массивов известен точно
+            size = getattr(model, 'nbytes', None) or os.path.getsize(path)
+        except Exception as e:
+            loading.error = e
+            with self._lock:
+                self._loading.pop(model_id, None)
+            loading.event.set()
+            raise
+
+        loading.model = model
+        loading.mtime_ns = mtime_ns
+        with self._lock:
+            self._loading.pop(model_id, None)
+            self._store(model_id, _Entry(model, size, mtime_ns))
+        loading.event.set()
+        return model
+
+    def _store(self, model_id, entry):
+        self._discard(model_id)
+        if entry.size > self.max_bytes:
+            logger.warning(f"Model {model_id} ({entry.size} bytes) exceeds cache budget, not cached")
+            return
+        self._entries[model_id] = entry
+        self._total_bytes += entry.size
+        while self._total_bytes > self.max_bytes:
+            evicted_id, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.size
+            self.evictions += 1
+            logger.info(f"Evicted model from cache: {evicted_id} ({evicted.size} bytes)")
+
+    def _discard(self, model_id):
+        entry = self._entries.pop(model_id, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+    def invalidate(self, model_id):
+        """Удаляет модель из кэша (после переобучения или удаления)"""
+        with self._lock:
+            self._discard(model_id)
+            self._discard(model_id + FULL_MODEL_SUFFIX)
+        logger.debug(f"Model cache invalidated: {model_id}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Общий кэш процесса, используется и REST, и gRPC сервером
+model_cache = ModelCache(max_bytes=int(os.getenv('MODEL_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)))
+
+
+def predict_cached(model_id, path, X):
+    """Предсказание моделью из кэша текущего процесса (функция для пулов процессов)"""
+    return timed_predict(model_cache.get(model_id, path), X)
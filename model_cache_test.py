@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from compiled_inference import COMPILED_MAX_ROWS, CompiledForest
+from model_cache import ModelCache
+from models import save_model
+
+
+class CountingLoader:
+    """Загрузчик-заглушка: считает загрузки, может задерживать их"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.loads = []
+        self._lock = threading.Lock()
+
+    def __call__(self, path):
+        time.sleep(self.delay)
+        with self._lock:
+            self.loads.append(path)
+        return object()
+
+
+def make_artifact(tmp_path, name, size=1000):
+    path = tmp_path / f"{name}.joblib"
+    path.write_bytes(b"\0" * size)
+    return str(path)
+
+
+def test_models_over_budget_are_evicted_in_lru_order(tmp_path):
+    loader = CountingLoader()
+    cache = ModelCache(max_bytes=2500, loader=loader)
+    paths = {name: make_artifact(tmp_path, name) for name in "abc"}
+
+    a = cache.get("a", paths["a"])
+    cache.get("b", paths["b"])
+    # Обращение к a делает самой старой записью b
+    assert cache.get("a", paths["a"]) is a
+    cache.get("c", paths["c"])
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 2000, 1)
+    assert cache.get("a", paths["a"]) is a
+    cache.get("b", paths["b"])
+    assert loader.loads == [paths["a"], paths["b"], paths["c"], paths["b"]]
+
+
+def test_model_larger_than_budget_is_not_cached(tmp_path):
+    loader = CountingLoader()
+    cache = ModelCache(max_bytes=500, loader=loader)
+    path = make_artifact(tmp_path, "big")
+
+    cache.get("big", path)
+    cache.get("big", path)
+    assert len(loader.loads) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_changed_file_is_reloaded(tmp_path):
+    loader = CountingLoader()
+    cache = ModelCache(loader=loader)
+    path = make_artifact(tmp_path, "a")
+
+    first = cache.get("a", path)
+    stat = os.stat(path)
+    # Переобучение другим процессом меняет mtime артефакта
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    second = cache.get("a", path)
+
+    assert second is not first
+    assert cache.get("a", path) is second
+    assert len(loader.loads) == 2
+    assert cache.stats()["bytes"] == 1000
+
+
+def test_concurrent_gets_load_once(tmp_path):
+    loader = CountingLoader(delay=0.2)
+    cache = ModelCache(loader=loader)
+    path = make_artifact(tmp_path, "a")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("a", path))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loader.loads) == 1
+    assert len(results) == 8 and all(model is results[0] for model in results)
+    assert cache.stats()["misses"] == 1
+
+
+def test_forest_fallback_is_a_separate_cache_entry(tmp_path):
+    X, y = make_classification(n_samples=400, n_features=6, random_state=0)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    path = str(tmp_path / "m.joblib")
+    save_model(model, path)
+    cache = ModelCache()
+
+    predictor = cache.get("m", path)
+    assert isinstance(predictor, CompiledForest)
+    np.testing.assert_array_equal(predictor.predict(X[:5]), model.predict(X[:5]))
+    assert cache.stats()["entries"] == 1
+
+    large = X[:COMPILED_MAX_ROWS + 1]
+    threads = [threading.Thread(target=predictor.predict, args=(large,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    np.testing.assert_array_equal(predictor.predict(large), model.predict(large))
+
+    stats = cache.stats()
+    # Исходная модель загружена один раз и учтена в бюджете отдельной записью
+    assert (stats["entries"], stats["misses"]) == (2, 2)
+    assert stats["bytes"] == predictor.nbytes + os.path.getsize(path)
+    assert isinstance(predictor.fallback(), RandomForestClassifier)
+
+    # Переобучение сбрасывает и скомпилированную форму, и исходную модель
+    cache.invalidate("m")
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import base64
+import logging
+from datetime import datetime
+
+from sqlalchemy import and_, or_, inspect
+from sqlalchemy.orm import load_only
+
+from models import db, MLModel, ModelMetric, MODEL_FIELDS, INDEXED_METRICS, metric_expression
+from service_metrics import stage_timer
+
+logger = logging.getLogger('model_listing')
+logger.setLevel(logging.INFO)
+
+LIST_DEFAULT_LIMIT = int(os.getenv('LIST_DEFAULT_LIMIT', 100))
+LIST_MAX_LIMIT = int(os.getenv('LIST_MAX_LIMIT', 1000))
+LEADERBOARD_DEFAULT_K = 10
+
+_METRIC_NAME = re.compile(r'^[A-Za-z0-9_]+$')
+
+
+def _parse_datetime(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError as e:
+        raise ValueError(f"{name} must be an ISO 8601 datetime") from e
+
+
+def parse_list_query(args):
+    """Проверяет параметры списка моделей: limit, cursor, фильтры, сортировку и fields"""
+    limit = int(args.get('limit') or LIST_DEFAULT_LIMIT)
+    if not 1 <= limit <= LIST_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {LIST_MAX_LIMIT}")
+
+    sort_by = args.get('sort_by') or 'created_at'
+    if sort_by != 'created_at' and not _METRIC_NAME.match(sort_by):
+        raise ValueError("sort_by must be created_at or a metric name")
+    order = args.get('order') or 'desc'
+    if order not in ('asc', 'desc'):
+        raise ValueError("order must be asc or desc")
+
+    fields = args.get('fields') or None
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    if fields:
+        unknown = set(fields) - set(MODEL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        # id нужен всегда: по нему строится курсор
+        fields = [f for f in MODEL_FIELDS if f in fields or f == 'id']
+
+    return {
+        'limit': limit,
+        'cursor': decode_cursor(args.get('cursor')) if args.get('cursor') else None,
+        'model_type': args.get('model_type') or None,
+        'created_after': _parse_datetime(args.get('created_after'), 'created_after'),
+        'created_before': _parse_datetime(args.get('created_before'), 'created_before'),
+        'sort_by': sort_by,
+        'order': order,
+        'fields': fields,
+    }
+
+
+def encode_cursor(value, model_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({'v': value, 'id': model_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return data['v'], data['id']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+@stage_timer('db_lookup')
+def list_models(query):
+    """Страница списка моделей по keyset-курсору.
+
+    Сортировка — по времени создания или по метрике (модели без этой метрики
+    не попадают в выдачу), при равных значениях — по id. Курсор хранит ключ
+    последней строки страницы, поэтому следующая страница читается по индексу
+    без OFFSET. Возвращает словари моделей (только поля fields) и курсор
+    следующей страницы (None, если это последняя).
+    """
+    if query['sort_by'] == 'created_at':
+        sort_column = MLModel.created_at
+    else:
+        sort_column = metric_expression(query['sort_by'], db.engine.dialect.name)
+
+    q = MLModel.query
+    if query['fields']:
+        q = q.options(load_only(*[getattr(MLModel, f) for f in query['fields']]))
+    if query['model_type']:
+        q = q.filter(MLModel.model_type == query['model_type'])
+    if query['created_after']:
+        q = q.filter(MLModel.created_at >= query['created_after'])
+    if query['created_before']:
+        q = q.filter(MLModel.created_at < query['created_before'])
+    if query['sort_by'] != 'created_at':
+        q = q.filter(sort_column.isnot(None))
+        if query['sort_by'] not in INDEXED_METRICS:
+            logger.info(f"Sorting by non-indexed metric {query['sort_by']}")
+
+    descending = query['order'] == 'desc'
+    if query['cursor'] is not None:
+        value, last_id = query['cursor']
+        if query['sort_by'] == 'created_at':
+            value = _parse_datetime(value, 'cursor')
+        if descending:
+            q = q.filter(or_(sort_column < value, and_(sort_column == value, MLModel.id < last_id)))
+        else:
+            q = q.filter(or_(sort_column > value, and_(sort_column == value, MLModel.id > last_id)))
+
+    if descending:
+        q = q.order_by(sort_column.desc(), MLModel.id.desc())
+    else:
+        q = q.order_by(sort_column.asc(), MLModel.id.asc())
+
+    # Одна лишняя строка показывает, есть ли следующая страница. Значение для
+    # курсора читается отдельной колонкой: при fields без него load_only
+    # откладывает колонку сортировки, и чтение атрибута стоило бы запроса на строку
+    rows = q.add_columns(sort_column).limit(query['limit'] + 1).all()
+    next_cursor = None
+    if len(rows) > query['limit']:
+        rows = rows[:query['limit']]
+        last, last_value = rows[-1]
+        next_cursor = encode_cursor(last_value, last.id)
+
+    items = [record.to_dict(query['fields']) for record, _ in rows]
+    logger.info(f"Listed {len(items)} models (sort_by={query['sort_by']}, more={next_cursor is not None})")
+    return items, next_cursor
+
+
+@stage_timer('db_lookup')
+def leaderboard(metric, k=LEADERBOARD_DEFAULT_K, model_type=None, ascending=False):
+    """Top-k моделей по метрике одним SQL-запросом по индексу таблицы ModelMetric"""
+    if not _METRIC_NAME.match(metric or ''):
+        raise ValueError("metric must be a metric name, e.g. accuracy")
+    if not 1 <= k <= LIST_MAX_LIMIT:
+        raise ValueError(f"k must be between 1 and {LIST_MAX_LIMIT}")
+
+    q = db.session.query(ModelMetric.model_id, ModelMetric.model_type, ModelMetric.value)
+    q = q.filter(ModelMetric.name == metric)
+    if model_type:
+        q = q.filter(ModelMetric.model_type == model_type)
+    if ascending:
+        q = q.order_by(ModelMetric.value.asc(), ModelMetric.model_id.asc())
+    else:
+        q = q.order_by(ModelMetric.value.desc(), ModelMetric.model_id.asc())
+
+    entries = [
+        {'rank': rank, 'model_id': model_id, 'model_type': m_type, 'value': value}
+        for rank, (model_id, m_type, value) in enumerate(q.limit(k).all(), start=1)
+    ]
+    logger.info(f"Leaderboard by {metric} (model_type={model_type}): {len(entries)} models")
+    return entries
+
+
+def _existing_indexes(table):
+    with db.engine.connect() as connection:
+        if db.engine.dialect.name == 'sqlite':
+            # Инспектор SQLAlchemy не видит индексы по выражению
+            rows = connection.execute(
+                db.text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"), {'table': table}
+            )
+            return {row[0] for row in rows}
+        return {index['name'] for index in inspect(connection).get_indexes(table)}
+
+
+def ensure_indexes():
+    """Создает индексы списка моделей и рейтинга в уже существующей БД (create_all их не добавляет)"""
+    dialect_name = db.engine.dialect.name
+    existing = _existing_indexes(MLModel.__tablename__) | _existing_indexes(ModelMetric.__tablename__)
+    for index in [*MLModel.__table__.indexes, *ModelMetric.__table__.indexes]:
+        if index.name in existing:
+            continue
+        if index.name.startswith('ix_ml_model_metric_') and dialect_name != 'sqlite':
+            continue
+        index.create(db.engine)
+        logger.info(f"Created index {index.name}")
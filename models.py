@@ -1,18 +1,30 @@
 import os
 import uuid
-import joblib
+import functools
+import importlib
+import time
 import logging
+import numpy as np
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, precision_score, recall_score
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import flag_modified
+from metrics_engine import ConfusionMatrix
+from evaluation import evaluate_and_fit
+from compiled_inference import COMPILED_INFERENCE, compile_model, compiled_path
+from service_metrics import stage_timer
 
 logger = logging.getLogger('models')
 logger.setLevel(logging.INFO)
 
 db = SQLAlchemy()
 
+# Режим хранения артефактов: 'pickle' — обычная загрузка в память процесса,
+# 'mmap' — numpy-массивы модели отображаются в память из файла и разделяются
+# между процессами через page cache ОС
+MODEL_STORAGE_MODE = os.getenv('MODEL_STORAGE_MODE', 'pickle')
+
 class MLModel(db.Model):
     id = db.Column(db.String, primary_key=True)
     model_type = db.Column(db.String(120))
@@ -20,32 +32,135 @@ class MLModel(db.Model):
     file_path = db.Column(db.String(500))
     created_at = db.Column(db.DateTime)
     metrics = db.Column(db.JSON)
+    # Версия записи: увеличивается при каждом изменении модели (ETag в REST API)
+    revision = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
+    # Метрики в нормализованном виде (по строке на метрику) для запросов top-k
+    metric_rows = db.relationship('ModelMetric', cascade='all, delete-orphan')
+
+    # Индексы для постраничного списка: сортировка по времени создания с id для
+    # однозначного курсора, в том числе внутри одного типа модели
+    __table_args__ = (
+        db.Index('ix_ml_model_created_at_id', 'created_at', 'id'),
+        db.Index('ix_ml_model_type_created_at_id', 'model_type', 'created_at', 'id'),
+    )
 
-    def to_dict(self):
-        """Конвертирует модель в словарь для API ответов"""
+    def to_dict(self, fields=None):
+        """Конвертирует модель в словарь для API ответов (fields — только указанные поля)"""
         logger.debug(f"Converting model {self.id} to dictionary")
-        return {
-            'id': self.id,
-            'model_type': self.model_type,
-            'params': self.params,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'metrics': self.metrics
-        }
+        result = {}
+        for name in fields or MODEL_FIELDS:
+            value = getattr(self, name)
+            if name == 'created_at':
+                value = value.isoformat() if value else None
+            result[name] = value
+        return result
+
+# Поля модели в ответах API
+MODEL_FIELDS = ('id', 'model_type', 'params', 'created_at', 'metrics')
+
+class ModelMetric(db.Model):
+    """Значение одной метрики модели; копия MLModel.metrics, по которой top-k считается в SQL"""
+    model_id = db.Column(db.String, db.ForeignKey('ml_model.id', ondelete='CASCADE'), primary_key=True)
+    name = db.Column(db.String(64), primary_key=True)
+    # Тип модели продублирован, чтобы рейтинг внутри типа читался только из индекса
+    model_type = db.Column(db.String(120))
+    value = db.Column(db.Float, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_model_metric_name_value', 'name', 'value'),
+        db.Index('ix_model_metric_name_type_value', 'name', 'model_type', 'value'),
+    )
+
+# Имя счетчика изменений списка моделей в таблице Revision
+MODELS_REVISION = 'models'
 
-# Доступные модели
+class Revision(db.Model):
+    """Общие для всех процессов счетчики изменений (версия списка моделей для ETag)"""
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.Integer, nullable=False)
+
+class TrainingJobRecord(db.Model):
+    """Статус задачи фонового обучения; общий для всех процессов, принимающих задачи"""
+    __tablename__ = 'training_job'
+    id = db.Column(db.String(36), primary_key=True)
+    model_type = db.Column(db.String(120))
+    status = db.Column(db.String(16), nullable=False)
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    model_id = db.Column(db.String)
+    metrics = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime, index=True)
+
+def metric_expression(name, dialect_name):
+    """Значение метрики из JSON-колонки metrics для сортировки и фильтрации.
+
+    Для SQLite выражение записывается с литеральным путем, чтобы совпадать с
+    индексами по выражению (ix_ml_model_metric_*).
+    """
+    if dialect_name == 'sqlite':
+        return db.func.json_extract(MLModel.metrics, db.literal_column(f"'$.{name}'"))
+    return MLModel.metrics[name].as_float()
+
+# Метрики, по которым список моделей сортируется по индексу (индексы по выражению есть только в SQLite)
+INDEXED_METRICS = ('accuracy', 'precision', 'recall', 'f1')
+for _metric in INDEXED_METRICS:
+    db.Index(f'ix_ml_model_metric_{_metric}', metric_expression(_metric, 'sqlite'), MLModel.id).ddl_if(dialect='sqlite')
+
+# Доступные модели; 'incremental' — способ дообучения без полного переобучения:
+# 'warm_start' (добавление деревьев) или 'partial_fit'. Классы указаны путем
+# импорта и загружаются при первом обращении (get_model_class): импорт sklearn
+# занимает больше секунды и не нужен, чтобы сервер начал отвечать
 AVAILABLE_MODELS = {
     'random_forest': {
-        'class': RandomForestClassifier,
+        'class_path': 'sklearn.ensemble.RandomForestClassifier',
         'hyperparameters': ['n_estimators', 'max_depth', 'random_state'],
-        'description': 'Random Forest Classifier'
+        'description': 'Random Forest Classifier',
+        'incremental': 'warm_start'
     },
     'logistic_regression': {
-        'class': LogisticRegression,
+        'class_path': 'sklearn.linear_model.LogisticRegression',
         'hyperparameters': ['C', 'solver', 'max_iter'],
-        'description': 'Logistic Regression'
+        'description': 'Logistic Regression',
+        'incremental': None
+    },
+    'sgd': {
+        'class_path': 'sklearn.linear_model.SGDClassifier',
+        'hyperparameters': ['loss', 'alpha', 'penalty', 'max_iter', 'random_state'],
+        'description': 'Linear classifier trained with SGD',
+        'incremental': 'partial_fit'
+    },
+    'naive_bayes': {
+        'class_path': 'sklearn.naive_bayes.GaussianNB',
+        'hyperparameters': ['var_smoothing'],
+        'description': 'Gaussian Naive Bayes',
+        'incremental': 'partial_fit'
     }
 }
 
+@functools.lru_cache(maxsize=None)
+def get_model_class(model_type):
+    """Класс оценщика по типу модели (импортируется при первом вызове)"""
+    module_name, class_name = AVAILABLE_MODELS[model_type]['class_path'].rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+def model_class_name(model_type):
+    """Имя класса оценщика без импорта sklearn"""
+    return AVAILABLE_MODELS[model_type]['class_path'].rsplit('.', 1)[1]
+
+def warm_up_imports():
+    """Импортирует классы оценщиков и joblib заранее, чтобы первое обучение или загрузка модели не ждали импорта"""
+    start = time.perf_counter()
+    import joblib  # noqa: F401
+    for model_type in AVAILABLE_MODELS:
+        get_model_class(model_type)
+    logger.info(f"Estimator imports warmed up in {time.perf_counter() - start:.2f}s")
+
+# Сколько деревьев добавляется при инкрементальном дообучении случайного леса
+DEFAULT_NEW_ESTIMATORS = 10
+
 def get_model_path(model_id):
     """Возвращает путь к файлу модели"""
     logger.debug(f"Getting model path for model ID: {model_id}")
@@ -54,6 +169,44 @@ def get_model_path(model_id):
     logger.debug(f"Model path: {path}")
     return path
 
+def _dump(obj, path):
+    # Файл заменяется целиком, а не перезаписывается: процессы, которые уже
+    # отобразили старую версию в память, продолжают читать старый inode
+    import joblib
+
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        # Без сжатия, чтобы массивы можно было открыть через mmap
+        with stage_timer('model_dump'):
+            joblib.dump(obj, tmp_path, compress=0)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def save_model(model, path):
+    """Сохраняет модель на диск атомарно (через временный файл) вместе со скомпилированной формой"""
+    logger.debug(f"Saving model to {path}")
+    # Скомпилированная форма пишется первой: кэш сверяется с mtime основного
+    # артефакта, и новая версия модели не окажется в паре со старой формой
+    compiled = compile_model(model)
+    if compiled is not None:
+        _dump(compiled, compiled_path(path))
+    elif os.path.exists(compiled_path(path)):
+        os.remove(compiled_path(path))
+    _dump(model, path)
+    return path
+
+def load_model(path, writable=False):
+    """Загружает модель с диска с учетом режима хранения"""
+    # Модель, которую будут дообучать, загружается в память процесса: массивы
+    # из mmap доступны только для чтения
+    mmap_mode = 'r' if MODEL_STORAGE_MODE == 'mmap' and not writable else None
+    logger.debug(f"Loading model from {path} (mmap_mode={mmap_mode})")
+    import joblib
+    with stage_timer('model_load'):
+        return joblib.load(path, mmap_mode=mmap_mode)
+
 def convert_params(params):
     """Конвертирует строковые параметры в правильные типы"""
     logger.debug(f"Converting parameters: {params}")
@@ -77,21 +230,14 @@ def convert_params(params):
     logger.info(f"Parameters conversion completed. Converted {len(converted_params)} parameters")
     return converted_params
 
+@stage_timer('metrics')
 def calculate_metrics(y_true, y_pred):
-    """Вычисляет метрики модели"""
+    """Вычисляет метрики модели по матрице ошибок, построенной за один проход"""
     logger.debug(f"Calculating metrics for {len(y_true)} samples")
     try:
-        accuracy = float(accuracy_score(y_true, y_pred))
-        precision = float(precision_score(y_true, y_pred, average='weighted', zero_division=0))
-        recall = float(recall_score(y_true, y_pred, average='weighted', zero_division=0))
-        
-        metrics = {
-            'accuracy': accuracy,
-            'precision': precision,
-            'recall': recall,
-        }
+        metrics = ConfusionMatrix.from_predictions(y_true, y_pred).metrics()
         
-        logger.info(f"Metrics calculated - Accuracy: {accuracy:.4f}, Precision: {precision:.4f}, Recall: {recall:.4f}")
+        logger.info(f"Metrics calculated - Accuracy: {metrics['accuracy']:.4f}, Precision: {metrics['precision']:.4f}, Recall: {metrics['recall']:.4f}")
         return metrics
         
     except Exception as e:
@@ -103,6 +249,76 @@ def calculate_metrics(y_true, y_pred):
             'recall': 0.0,
         }
 
+def fit_model(model_type, params, X, y, progress=None, evaluation=None):
+    """Обучает модель заданного типа и считает метрики.
+
+    По умолчанию метрики считаются на обучающей выборке; evaluation (результат
+    evaluation.parse_evaluation) включает оценку на отложенной выборке или k-fold.
+    """
+    logger.info(f"Fitting model type: {model_type} with {len(X)} samples")
+    ModelClass = get_model_class(model_type)
+    if evaluation is not None and evaluation['mode'] != 'train':
+        with stage_timer('fit'):
+            model, metrics = evaluate_and_fit(ModelClass, params, X, y, evaluation)
+        if progress is not None:
+            progress(0.9)
+        return model, metrics
+
+    model = ModelClass(**params)
+    with stage_timer('fit'):
+        model.fit(X, y)
+    if progress is not None:
+        progress(0.8)
+
+    y_pred = model.predict(X)
+    metrics = calculate_metrics(y, y_pred)
+    if progress is not None:
+        progress(0.9)
+    return model, metrics
+
+def update_model(model_type, model, X, y, incremental=False, n_new_estimators=None):
+    """Переобучает модель на новых данных: полностью или инкрементально"""
+    strategy = AVAILABLE_MODELS.get(model_type, {}).get('incremental')
+    if not incremental:
+        logger.info(f"Full retraining of {model_type} with {len(X)} samples")
+        with stage_timer('fit'):
+            model.fit(X, y)
+    elif strategy == 'warm_start':
+        # Новые деревья обучаются только на новых данных, старые сохраняются
+        unknown = set(np.unique(y).tolist()) ^ set(model.classes_.tolist())
+        if unknown:
+            raise ValueError(f"Incremental retraining requires the same classes as the original model: {sorted(model.classes_.tolist())}")
+        n_new = n_new_estimators or DEFAULT_NEW_ESTIMATORS
+        logger.info(f"Adding {n_new} trees to {model_type} with {len(X)} samples")
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + n_new)
+        with stage_timer('fit'):
+            model.fit(X, y)
+        model.set_params(warm_start=False)
+    elif strategy == 'partial_fit':
+        logger.info(f"Partial fit of {model_type} with {len(X)} samples")
+        with stage_timer('fit'):
+            model.partial_fit(X, y)
+    else:
+        raise ValueError(f"Incremental retraining is not supported for {model_type}")
+
+    y_pred = model.predict(X)
+    metrics = calculate_metrics(y, y_pred)
+    return model, metrics
+
+def load_predictor(path):
+    """Загружает модель для предсказаний: скомпилированную форму, если она есть"""
+    if COMPILED_INFERENCE and os.path.exists(compiled_path(path)):
+        logger.debug(f"Using compiled form for {path}")
+        return load_model(compiled_path(path))
+    return load_model(path)
+
+def delete_model_files(path):
+    """Удаляет артефакт модели и ее скомпилированную форму"""
+    for file_path in (path, compiled_path(path)):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            logger.info(f"Model file deleted: {file_path}")
+
 def create_model_record(model_id, model_type, params, file_path, metrics):
     """Создает запись модели в БД"""
     logger.info(f"Creating model record: ID={model_id}, Type={model_type}")
@@ -113,9 +329,51 @@ def create_model_record(model_id, model_type, params, file_path, metrics):
         model_type=model_type,
         params=params,
         file_path=file_path,
-        created_at=datetime.now(),
-        metrics=metrics
+        created_at=datetime.now()
     )
+    set_model_metrics(record, metrics)
     
     logger.debug(f"Model record created successfully: {model_id}")
-    return record
\ No newline at end of file
+    return record
+
+def set_model_metrics(record, metrics):
+    """Записывает метрики модели: в JSON-колонку и в таблицу ModelMetric"""
+    record.metrics = metrics
+    # Модель переобучена, даже если метрики совпали: версия записи должна измениться
+    flag_modified(record, 'metrics')
+    record.metric_rows = [
+        ModelMetric(name=name, value=float(value), model_type=record.model_type)
+        for name, value in (metrics or {}).items()
+        if isinstance(value, (int, float))
+    ]
+
+@stage_timer('db_lookup')
+def get_revision(name=MODELS_REVISION):
+    """Текущее значение счетчика изменений (0, если изменений еще не было)"""
+    return db.session.query(Revision.value).filter_by(name=name).scalar() or 0
+
+@event.listens_for(Session, 'before_flush')
+def _bump_revisions(session, flush_context, instances):
+    """Увеличивает версию измененных моделей и счетчик списка в той же транзакции.
+
+    Срабатывает на любое создание, изменение и удаление MLModel — и в REST, и в
+    gRPC сервере, и в фоновых задачах обучения. Строка счетчика создается
+    миграцией (migrate.seed_revisions), здесь она только обновляется: вставка
+    из разных процессов при отсутствии строки конфликтовала бы по ключу.
+    """
+    changed = any(isinstance(obj, MLModel) for obj in (*session.new, *session.deleted))
+    for obj in session.dirty:
+        if isinstance(obj, MLModel) and session.is_modified(obj, include_collections=False):
+            # Выражение вычисляется в UPDATE, поэтому параллельные изменения не теряются
+            obj.revision = MLModel.revision + 1
+            changed = True
+    if not changed:
+        return
+
+    connection = session.connection()
+    table = Revision.__table__
+    result = connection.execute(
+        update(table).where(table.c.name == MODELS_REVISION).values(value=table.c.value + 1)
+    )
+    if result.rowcount == 0:
+        logger.warning(f"Revision counter '{MODELS_REVISION}' is missing, run migrate.py")
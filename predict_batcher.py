@@ -0,0 +1,124 @@
+import time
+import logging
+import threading
+
+import numpy as np
+
+from service_metrics import timed_predict
+
+logger = logging.getLogger('predict_batcher')
+logger.setLevel(logging.INFO)
+
+
+class _Batch:
+    def __init__(self, model):
+        self.model = model
+        self.parts = []
+        self.enqueued_at = []
+        self.rows = 0
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+    def add(self, X):
+        self.parts.append(X)
+        self.enqueued_at.append(time.perf_counter())
+        self.rows += len(X)
+        return len(self.parts) - 1
+
+
+class PredictBatcher:
+    """Объединяет одновременные запросы предсказаний к одной модели в один вызов predict.
+
+    Первый запрос к модели становится лидером пачки: он ждет до max_wait_ms,
+    пока к пачке присоединятся другие запросы (или пока в ней не наберется
+    max_batch_size строк), затем делает один векторизованный predict и
+    раздает каждому вызывающему его часть результата.
+    """
+
+    def __init__(self, max_batch_size=256, max_wait_ms=2.0):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._open = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.rows = 0
+        self.max_batch_rows = 0
+        self.queue_delay_total = 0.0
+        self.queue_delay_max = 0.0
+
+    def predict(self, model_id, model, X):
+        """Возвращает предсказания для X, объединяя запрос с конкурентными"""
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or len(X) == 0:
+            return timed_predict(model, X)
+
+        # В одну пачку попадают только запросы с одинаковым числом признаков
+        key = (model_id, X.shape[1])
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None or batch.model is not model or batch.rows + len(X) > self.max_batch_size
+            if leader:
+                if batch is not None:
+                    self._close(key, batch)
+                batch = _Batch(model)
+                self._open[key] = batch
+            index = batch.add(X)
+            if batch.rows >= self.max_batch_size:
+                self._close(key, batch)
+
+        if leader:
+            batch.full.wait(self.max_wait)
+            with self._lock:
+                self._close(key, batch)
+            self._run(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
+
+    def _close(self, key, batch):
+        if self._open.get(key) is batch:
+            del self._open[key]
+        batch.full.set()
+
+    def _run(self, batch):
+        started = time.perf_counter()
+        try:
+            X = batch.parts[0] if len(batch.parts) == 1 else np.concatenate(batch.parts)
+            preds = timed_predict(batch.model, X)
+            bounds = np.cumsum([len(part) for part in batch.parts])[:-1]
+            batch.results = np.split(preds, bounds)
+        except Exception as e:
+            logger.error(f"Batched prediction failed: {str(e)}")
+            batch.error = e
+        finally:
+            batch.done.set()
+
+        delays = [started - t for t in batch.enqueued_at]
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(batch.parts)
+            self.rows += batch.rows
+            self.max_batch_rows = max(self.max_batch_rows, batch.rows)
+            self.queue_delay_total += sum(delays)
+            self.queue_delay_max = max(self.queue_delay_max, max(delays))
+        logger.debug(f"Predicted batch of {len(batch.parts)} requests ({batch.rows} rows)")
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'requests': self.requests,
+                'rows': self.rows,
+                'avg_batch_requests': self.requests / self.batches if self.batches else 0.0,
+                'avg_batch_rows': self.rows / self.batches if self.batches else 0.0,
+                'max_batch_rows': self.max_batch_rows,
+                'avg_queue_delay_ms': 1000.0 * self.queue_delay_total / self.requests if self.requests else 0.0,
+                'max_queue_delay_ms': 1000.0 * self.queue_delay_max,
+            }
@@ -0,0 +1,145 @@
+import io
+import os
+import re
+import hmac
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import logging
+import threading
+from datetime import datetime
+
+"""
+Профилирование отдельных запросов по требованию. Запрос с заголовком
+X-Profile-Token (REST) или ключом метаданных x-profile-token (gRPC), равным
+PROFILING_TOKEN, выполняется под cProfile; профиль сохраняется в PROFILES_DIR
+(файл pstats .prof и описание .json), а его id возвращается в заголовке
+X-Profile-Id (в gRPC — в trailing-метаданных x-profile-id). Без
+PROFILING_TOKEN профилирование выключено. Список профилей и их файлы
+отдает REST API: GET /profiles и GET /profiles/<id>.
+"""
+
+logger = logging.getLogger('request_profiler')
+logger.setLevel(logging.INFO)
+
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+PROFILES_DIR = os.getenv('PROFILES_DIR', 'profiles')
+# Сколько последних профилей хранится; более старые удаляются
+PROFILES_MAX_FILES = int(os.getenv('PROFILES_MAX_FILES', 100))
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILE_METADATA_KEY = 'x-profile-token'
+PROFILE_ID_METADATA_KEY = 'x-profile-id'
+
+_PROFILE_ID = re.compile(r'^\d{8}T\d{12}-[0-9a-f]{8}$')
+
+# В процессе профилируется не больше одного запроса одновременно: начиная с
+# Python 3.12 cProfile может быть включен только одним профилировщиком на процесс
+_active = threading.Lock()
+
+
+def authorized(token):
+    """Совпадает ли токен с PROFILING_TOKEN (сравнение за постоянное время)"""
+    if not PROFILING_TOKEN or token is None:
+        return False
+    return hmac.compare_digest(token.encode(), PROFILING_TOKEN.encode())
+
+
+class RequestProfile:
+    """Профиль одного запроса: cProfile включен в потоке, который обрабатывает запрос"""
+
+    def __init__(self, server, endpoint):
+        self.server = server
+        self.endpoint = endpoint
+        self.profiler = cProfile.Profile()
+        self.created_at = datetime.now()
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def finish(self):
+        """Останавливает профилирование и сохраняет профиль; возвращает его id"""
+        self.profiler.disable()
+        duration = time.perf_counter() - self.started
+        _active.release()
+        try:
+            return save_profile(self, duration)
+        except OSError as e:
+            logger.error(f"Cannot save profile of {self.endpoint}: {str(e)}")
+            return None
+
+
+def start_profile(server, endpoint):
+    """Начинает профилирование запроса; None, если уже профилируется другой запрос"""
+    if not _active.acquire(blocking=False):
+        logger.info(f"Profiler is busy, request to {endpoint} is not profiled")
+        return None
+    try:
+        return RequestProfile(server, endpoint)
+    except Exception:
+        _active.release()
+        raise
+
+
+def save_profile(profile, duration):
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    profile_id = f"{profile.created_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    profile.profiler.dump_stats(os.path.join(PROFILES_DIR, f"{profile_id}.prof"))
+    info = {
+        'id': profile_id,
+        'server': profile.server,
+        'endpoint': profile.endpoint,
+        'created_at': profile.created_at.isoformat(),
+        'duration_ms': round(duration * 1000, 3),
+        'pid': os.getpid(),
+    }
+    with open(os.path.join(PROFILES_DIR, f"{profile_id}.json"), 'w') as f:
+        json.dump(info, f)
+    logger.info(f"Saved profile {profile_id} of {profile.server} {profile.endpoint} ({info['duration_ms']} ms)")
+    _prune()
+    return profile_id
+
+
+def _prune():
+    # Id начинается со времени создания, поэтому сортировка по имени — по возрасту
+    ids = sorted(name[:-5] for name in os.listdir(PROFILES_DIR) if name.endswith('.json'))
+    for profile_id in ids[:max(0, len(ids) - PROFILES_MAX_FILES)]:
+        for ext in ('.prof', '.json'):
+            try:
+                os.remove(os.path.join(PROFILES_DIR, profile_id + ext))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """Описания сохраненных профилей, новые первыми"""
+    if not os.path.isdir(PROFILES_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILES_DIR), reverse=True):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(PROFILES_DIR, name)) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            # Профиль удален или еще записывается другим процессом
+            continue
+    return profiles
+
+
+def profile_path(profile_id):
+    """Путь к файлу .prof; None, если профиля нет или id некорректен"""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = os.path.join(PROFILES_DIR, f"{profile_id}.prof")
+    return path if os.path.exists(path) else None
+
+
+def profile_summary(path, sort='cumulative', limit=50):
+    """Текстовый отчет pstats: limit самых дорогих функций"""
+    stream = io.StringIO()
+    pstats.Stats(path, stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,219 @@
+import io
+import json
+import logging
+
+import numpy as np
+from flask import Response
+
+from service_metrics import stage_timer
+
+logger = logging.getLogger('rest_codecs')
+logger.setLevel(logging.INFO)
+
+JSON = 'application/json'
+NPY = 'application/x-npy'
+NPZ = 'application/x-npz'
+ARROW = 'application/vnd.apache.arrow.stream'
+MSGPACK = 'application/msgpack'
+NDJSON = 'application/x-ndjson'
+
+# Форматы, в которых можно получить предсказания (первый — по умолчанию)
+PREDICTION_FORMATS = [JSON, NPY, ARROW, MSGPACK]
+ALLOWED_DTYPES = {'float32', 'float64', 'int32', 'int64'}
+
+
+class PayloadError(Exception):
+    """Тело запроса не удалось декодировать"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# Библиотеки, без которых формат нельзя ни прочитать, ни отдать
+FORMAT_DEPENDENCIES = {ARROW: 'pyarrow', MSGPACK: 'msgpack'}
+
+
+def _import_optional(name, status=415):
+    try:
+        return __import__(name)
+    except ImportError as e:
+        raise PayloadError(f"{name} is not installed on the server", status=status) from e
+
+
+def _checked_format(mimetype):
+    # Формат проверяется до обучения или предсказания, а не при кодировании ответа
+    if mimetype in FORMAT_DEPENDENCIES:
+        _import_optional(FORMAT_DEPENDENCIES[mimetype], status=406)
+    return mimetype
+
+
+def _read_npy(data):
+    """Читает .npy без копирования данных массива"""
+    stream = io.BytesIO(data)
+    version = np.lib.format.read_magic(stream)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    if dtype.hasobject:
+        raise PayloadError("Object arrays are not allowed")
+    array = np.frombuffer(data, dtype=dtype, count=int(np.prod(shape)), offset=stream.tell())
+    return array.reshape(shape, order='F' if fortran_order else 'C')
+
+
+def _read_npz(data):
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def _read_arrow(data, label_column):
+    pa = _import_optional('pyarrow')
+    with pa.ipc.open_stream(data) as reader:
+        table = reader.read_all()
+    payload = {}
+    if label_column in table.column_names:
+        payload['y'] = table.column(label_column).to_numpy()
+        table = table.drop_columns([label_column])
+    # Каждая колонка конвертируется целиком, без объектов на элемент
+    columns = [table.column(i).to_numpy() for i in range(table.num_columns)]
+    payload['X'] = np.column_stack(columns) if columns else np.empty((table.num_rows, 0))
+    return payload
+
+
+def _unpack_tensor(value):
+    if isinstance(value, dict) and 'data' in value:
+        dtype = value.get('dtype', 'float64')
+        if dtype not in ALLOWED_DTYPES:
+            raise PayloadError(f"Unsupported tensor dtype: {dtype}")
+        array = np.frombuffer(value['data'], dtype=np.dtype(dtype).newbyteorder('<'))
+        return array.reshape(value['shape']) if 'shape' in value else array
+    return np.asarray(value)
+
+
+def _read_msgpack(data):
+    msgpack = _import_optional('msgpack')
+    payload = msgpack.unpackb(data, raw=False)
+    if not isinstance(payload, dict):
+        raise PayloadError("msgpack body must be a map")
+    for key in ('X', 'y'):
+        if key in payload:
+            payload[key] = _unpack_tensor(payload[key])
+    return payload
+
+
+@stage_timer('input_conversion')
+def decode_payload(request):
+    """Декодирует тело запроса в словарь с X (и y) по заголовку Content-Type.
+
+    JSON разбирается как раньше. Для .npy/.npz/Arrow тип модели и параметры
+    передаются в query-параметрах model_type, params, evaluation и search (JSON-строки).
+    """
+    mimetype = request.mimetype or JSON
+    if mimetype == JSON:
+        return request.get_json()
+
+    data = request.get_data(cache=False)
+    try:
+        if mimetype == NPY:
+            payload = {'X': _read_npy(data)}
+        elif mimetype == NPZ:
+            payload = _read_npz(data)
+        elif mimetype == ARROW:
+            payload = _read_arrow(data, request.args.get('label_column', 'y'))
+        elif mimetype == MSGPACK:
+            payload = _read_msgpack(data)
+        else:
+            raise PayloadError(f"Unsupported content type: {mimetype}", status=415)
+    except PayloadError:
+        raise
+    except Exception as e:
+        raise PayloadError(f"Cannot decode {mimetype} body: {str(e)}") from e
+
+    if 'model_type' in request.args:
+        payload.setdefault('model_type', request.args['model_type'])
+    for key in ('params', 'evaluation', 'search'):
+        if key in request.args:
+            try:
+                payload.setdefault(key, json.loads(request.args[key]))
+            except ValueError as e:
+                raise PayloadError(f"Query parameter {key} is not valid JSON: {str(e)}") from e
+    logger.debug(f"Decoded {mimetype} payload with keys {list(payload)}")
+    return payload
+
+
+def prediction_format(request):
+    """Выбирает формат ответа с предсказаниями по заголовку Accept (PayloadError 406, если он недоступен)"""
+    return _checked_format(request.accept_mimetypes.best_match(PREDICTION_FORMATS, default=JSON))
+
+
+def document_format(request):
+    """Формат небольшого ответа (метрики, id): JSON или msgpack (PayloadError 406, если он недоступен)"""
+    return _checked_format(request.accept_mimetypes.best_match([JSON, MSGPACK], default=JSON))
+
+
+def encode_predictions(preds, mimetype):
+    """Кодирует предсказания в бинарный формат; для JSON возвращает None"""
+    preds = np.ascontiguousarray(preds)
+    if mimetype == NPY:
+        buffer = io.BytesIO()
+        np.save(buffer, preds, allow_pickle=False)
+        return Response(buffer.getvalue(), mimetype=NPY)
+    if mimetype == ARROW:
+        pa = _import_optional('pyarrow')
+        table = pa.table({'predictions': preds})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), mimetype=ARROW)
+    if mimetype == MSGPACK:
+        msgpack = _import_optional('msgpack')
+        if preds.dtype.name not in ALLOWED_DTYPES:
+            preds = preds.astype(np.int64 if preds.dtype.kind in 'iub' else np.float64)
+        body = msgpack.packb({'predictions': {
+            'data': preds.astype(preds.dtype.newbyteorder('<')).tobytes(),
+            'shape': list(preds.shape),
+            'dtype': preds.dtype.name,
+        }})
+        return Response(body, mimetype=MSGPACK)
+    return None
+
+
+def encode_document(document, mimetype, status=200):
+    """Кодирует небольшой ответ в msgpack; для JSON возвращает None"""
+    if mimetype != MSGPACK:
+        return None
+    msgpack = _import_optional('msgpack')
+    return Response(msgpack.packb(document), status=status, mimetype=MSGPACK)
+
+
+def iter_ndjson_chunks(stream, chunk_size):
+    """Читает NDJSON построчно и отдает порции строк по chunk_size в виде numpy-массивов.
+
+    Каждая строка — JSON-массив признаков или объект с ключом "features" (или "X").
+    Пустые строки пропускаются.
+    """
+    rows = []
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise PayloadError(f"Invalid JSON on line {line_no}: {str(e)}") from e
+        if isinstance(row, dict):
+            row = row.get('features', row.get('X'))
+        if not isinstance(row, list):
+            raise PayloadError(f"Line {line_no} must be a JSON array or an object with 'features'")
+        rows.append(row)
+        if len(rows) == chunk_size:
+            yield np.asarray(rows, dtype=float)
+            rows = []
+    if rows:
+        yield np.asarray(rows, dtype=float)
+
+
+def ndjson_predictions(preds):
+    """Форматирует предсказания порции как строки NDJSON"""
+    return ''.join(f'{{"prediction": {json.dumps(p)}}}\n' for p in preds.tolist())
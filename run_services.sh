@@ -9,12 +9,33 @@ set -euo pipefail
 LOG_DIR="./logs"
 mkdir -p "${LOG_DIR}"
 
-echo "Запуск REST API (Flask) на порту 5000..."
-nohup python -u app.py > "${LOG_DIR}/flask.log" 2>&1 &
+# REST_SERVER_MODE=gunicorn — production-режим: REST_WORKERS процессов по REST_THREADS потоков
+# (настройки в gunicorn.conf.py); по умолчанию — отладочный сервер Flask
+if [ "${REST_SERVER_MODE:-dev}" = "gunicorn" ]; then
+    REST_CMD=(gunicorn -c gunicorn.conf.py app:app)
+else
+    REST_CMD=(python -u app.py)
+fi
+
+# Каталоги метрик Prometheus: процессы пулов обучения и предсказаний (и воркеры) пишут туда
+# свои значения. У каждого сервиса свой каталог, чтобы метрики REST и gRPC не смешивались
+REST_METRICS_DIR="$(mktemp -d)"
+GRPC_METRICS_DIR="$(mktemp -d)"
+
+echo "Запуск REST API (${REST_CMD[0]}) на порту 5000..."
+PROMETHEUS_MULTIPROC_DIR="${REST_METRICS_DIR}" nohup "${REST_CMD[@]}" > "${LOG_DIR}/flask.log" 2>&1 &
 FLASK_PID=$!
 
-echo "Запуск gRPC сервера (порт 50051)..."
-nohup python -u grpc_server.py > "${LOG_DIR}/grpc_server.log" 2>&1 &
+# GRPC_SERVER_MODE=aio — asyncio сервер с пулами процессов для обучения и предсказаний,
+# GRPC_SERVER_MODE=prefork — GRPC_WORKERS процессов на одном порту под супервизором
+GRPC_SCRIPT="grpc_server.py"
+case "${GRPC_SERVER_MODE:-threaded}" in
+    aio) GRPC_SCRIPT="grpc_aio_server.py" ;;
+    prefork) GRPC_SCRIPT="grpc_supervisor.py" ;;
+esac
+
+echo "Запуск gRPC сервера ${GRPC_SCRIPT} (порт 50051)..."
+PROMETHEUS_MULTIPROC_DIR="${GRPC_METRICS_DIR}" nohup python -u "${GRPC_SCRIPT}" > "${LOG_DIR}/grpc_server.log" 2>&1 &
 GRPC_PID=$!
 
 echo "Запуск Streamlit dashboard (порт 8501)..."
@@ -23,7 +44,7 @@ STREAMLIT_PID=$!
 
 echo ""
 echo "REST API запущен (PID=${FLASK_PID}) — http://localhost:5000"
-echo "gRPC сервер запущен (PID=${GRPC_PID}) — порт 50051"
+echo "gRPC сервер запущен (PID=${GRPC_PID}) — порт 50051, метрики — http://localhost:${GRPC_METRICS_PORT:-9095}/metrics"
 echo "Dashboard запущен (PID=${STREAMLIT_PID}) — http://localhost:8501"
 echo ""
 echo "Логи:"
@@ -34,7 +55,7 @@ echo ""
 echo "Чтобы остановить сервисы: нажмите Ctrl+C"
 
 # Обрабатываем Ctrl+C, чтобы корректно завершить оба процесса
-trap "echo 'Останавливаем сервисы...'; kill ${FLASK_PID} ${GRPC_PID}; wait ${FLASK_PID} ${GRPC_PID} 2>/dev/null; echo 'Готово'; exit 0" SIGINT SIGTERM
+trap "echo 'Останавливаем сервисы...'; kill ${FLASK_PID} ${GRPC_PID}; wait ${FLASK_PID} ${GRPC_PID} 2>/dev/null; rm -rf ${REST_METRICS_DIR} ${GRPC_METRICS_DIR}; echo 'Готово'; exit 0" SIGINT SIGTERM
 
 # Ждём завершения процессов
 wait ${FLASK_PID} ${GRPC_PID}
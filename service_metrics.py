@@ -0,0 +1,97 @@
+import os
+import logging
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, start_http_server
+from prometheus_client import multiprocess
+from prometheus_client.exposition import choose_encoder
+
+"""
+Метрики сервисов в формате Prometheus: запросы к REST и gRPC (число, ошибки,
+гистограмма задержки), время этапов обработки (запрос к БД, загрузка и
+сохранение модели, разбор входных данных, predict/fit, подсчет метрик),
+обращения к кэшам и число предсказанных строк. Запись значения — счетчик
+под блокировкой, ее можно не отключать в production.
+
+Процессы пулов обучения и предсказаний, воркеры gunicorn и pre-fork режима
+видны в метриках, только если задан PROMETHEUS_MULTIPROC_DIR (общий каталог,
+куда каждый процесс пишет свои значения; его задают gunicorn.conf.py,
+grpc_supervisor.py, grpc_aio_server.py и run_services.sh). Без него каждый процесс отдает только
+собственные метрики.
+"""
+
+logger = logging.getLogger('service_metrics')
+logger.setLevel(logging.INFO)
+
+# Порт, на котором gRPC серверы отдают /metrics; 0 — не запускать
+GRPC_METRICS_PORT = int(os.getenv('GRPC_METRICS_PORT', 9095))
+
+# Границы от 1 мс до 30 с: предсказания занимают миллисекунды, обучение — секунды
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUESTS = Counter('mlservice_requests_total', 'Requests by endpoint (REST route or gRPC method)',
+                   ['endpoint', 'code'])
+REQUEST_ERRORS = Counter('mlservice_request_errors_total', 'Requests that ended with HTTP 4xx/5xx or non-OK gRPC status',
+                         ['endpoint', 'code'])
+REQUEST_LATENCY = Histogram('mlservice_request_duration_seconds', 'Request handling time',
+                            ['endpoint'], buckets=LATENCY_BUCKETS)
+STAGE_LATENCY = Histogram('mlservice_stage_duration_seconds', 'Time spent in a request processing stage',
+                          ['stage'], buckets=LATENCY_BUCKETS)
+CACHE_LOOKUPS = Counter('mlservice_cache_lookups_total', 'Cache lookups; hit ratio = rate(hit) / rate(all)',
+                        ['cache', 'result'])
+PREDICTED_ROWS = Counter('mlservice_predicted_rows_total', 'Rows scored; rows per second = rate()')
+
+# Этапы обработки запроса (значения метки stage)
+STAGES = ('db_lookup', 'model_load', 'input_conversion', 'predict', 'fit', 'metrics', 'model_dump')
+_STAGES = {stage: STAGE_LATENCY.labels(stage=stage) for stage in STAGES}
+
+
+def stage_timer(stage):
+    """Замер этапа: with stage_timer('fit'): ... или декоратор @stage_timer('metrics')"""
+    return _STAGES[stage].time()
+
+
+def cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache=cache, result='hit' if hit else 'miss').inc()
+
+
+def timed_predict(model, X):
+    """model.predict(X) с замером этапа predict и подсчетом строк"""
+    with _STAGES['predict'].time():
+        preds = model.predict(X)
+    PREDICTED_ROWS.inc(len(preds))
+    return preds
+
+
+def observe_request(endpoint, code, duration, error=False):
+    REQUESTS.labels(endpoint=endpoint, code=code).inc()
+    if error:
+        REQUEST_ERRORS.labels(endpoint=endpoint, code=code).inc()
+    REQUEST_LATENCY.labels(endpoint=endpoint).observe(duration)
+
+
+def _registry():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        # Значения всех процессов собираются из файлов при каждом запросе метрик
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render(accept=None):
+    """Текст метрик и его Content-Type для ответа на GET /metrics.
+
+    Формат выбирается по заголовку Accept; без него — text/plain 0.0.4,
+    который понимают все версии Prometheus.
+    """
+    encoder, content_type = choose_encoder(accept)
+    return encoder(_registry()), content_type
+
+
+def start_exporter(port=GRPC_METRICS_PORT):
+    """Запускает HTTP сервер с /metrics в фоновом потоке (для gRPC серверов)"""
+    if not port:
+        return None
+    server, _ = start_http_server(port, registry=_registry())
+    logger.info(f"Prometheus metrics exporter listening on port {port}")
+    return server
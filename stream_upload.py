@@ -0,0 +1,120 @@
+import os
+import logging
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger('stream_upload')
+logger.setLevel(logging.INFO)
+
+# Начиная с какого объема признаки собираются не в памяти, а во временном файле
+TRAIN_STREAM_SPILL_BYTES = int(os.getenv('TRAIN_STREAM_SPILL_BYTES', 256 * 1024 * 1024))
+# Каталог для временных файлов потоковой загрузки
+TRAIN_STREAM_SPILL_DIR = os.getenv('TRAIN_STREAM_SPILL_DIR') or None
+
+
+class TrainingDataAssembler:
+    """Собирает обучающую выборку из порций потока в один непрерывный массив.
+
+    Если заранее известно число строк, признаки пишутся в заранее выделенный
+    массив (в памяти или, для больших выборок, в np.memmap на диске). Иначе
+    порции дописываются во временный файл, который в конце открывается как
+    np.memmap — так пиковое потребление памяти не зависит от размера выборки.
+    """
+
+    def __init__(self, n_samples=None, spill_bytes=TRAIN_STREAM_SPILL_BYTES, spill_dir=TRAIN_STREAM_SPILL_DIR):
+        self.n_samples = n_samples
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+        self.n_features = None
+        self.rows = 0
+        self._X = None
+        self._spill = None
+        self._spill_path = None
+        self._labels = []
+
+    def _allocate(self, n_features):
+        self.n_features = n_features
+        if self.n_samples is not None:
+            nbytes = self.n_samples * n_features * np.dtype(np.float64).itemsize
+            if nbytes <= self.spill_bytes:
+                self._X = np.empty((self.n_samples, n_features), dtype=np.float64)
+                return
+            self._spill_path = self._temp_path()
+            self._X = np.lib.format.open_memmap(
+                self._spill_path, mode='w+', dtype=np.float64, shape=(self.n_samples, n_features)
+            )
+            logger.info(f"Spilling {nbytes} bytes of training data to {self._spill_path}")
+        else:
+            self._spill_path = self._temp_path()
+            self._spill = open(self._spill_path, 'wb')
+            logger.info(f"Streaming training data of unknown size to {self._spill_path}")
+
+    def _temp_path(self):
+        fd, path = tempfile.mkstemp(prefix='train-stream-', suffix='.bin', dir=self.spill_dir)
+        os.close(fd)
+        return path
+
+    def append(self, X, y):
+        """Добавляет порцию строк"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        if X.ndim != 2:
+            raise ValueError(f"Expected 2-dimensional features chunk, got shape {X.shape}")
+        if len(X) != len(y):
+            raise ValueError(f"Chunk has {len(X)} rows but {len(y)} labels")
+        if self.n_features is None:
+            self._allocate(X.shape[1])
+        elif X.shape[1] != self.n_features:
+            raise ValueError(f"Chunk has {X.shape[1]} features, expected {self.n_features}")
+
+        if self._spill is not None:
+            self._spill.write(np.ascontiguousarray(X).tobytes())
+        else:
+            if self.rows + len(X) > self.n_samples:
+                raise ValueError(f"Stream has more rows than declared n_samples={self.n_samples}")
+            self._X[self.rows:self.rows + len(X)] = X
+        self._labels.append(y)
+        self.rows += len(X)
+
+    def finish(self):
+        """Возвращает собранные признаки и метки"""
+        if self.rows == 0:
+            raise ValueError("Training stream contains no rows")
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+            self._X = np.memmap(self._spill_path, dtype=np.float64, mode='r', shape=(self.rows, self.n_features))
+        elif self.rows != self.n_samples:
+            raise ValueError(f"Stream has {self.rows} rows, expected n_samples={self.n_samples}")
+        return self._X, np.concatenate(self._labels)
+
+    def close(self):
+        """Освобождает буферы и удаляет временный файл"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._X = None
+        self._labels = []
+        if self._spill_path and os.path.exists(self._spill_path):
+            os.remove(self._spill_path)
+            self._spill_path = None
+
+
+def iter_train_chunks(model_type, params, X, y, rows_per_chunk=10000):
+    """Клиентский помощник: разбивает выборку на порции для TrainModelStream"""
+    import app_pb2
+    from tensor_codec import encode_tensor
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    for start in range(0, len(X), rows_per_chunk):
+        chunk = app_pb2.TrainChunk(
+            X=encode_tensor(X[start:start + rows_per_chunk]),
+            y=encode_tensor(y[start:start + rows_per_chunk])
+        )
+        if start == 0:
+            chunk.model_type = model_type
+            chunk.params.update({str(k): str(v) for k, v in params.items()})
+            chunk.n_samples = len(X)
+        yield chunk
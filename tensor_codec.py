@@ -0,0 +1,71 @@
+import logging
+
+import numpy as np
+
+import app_pb2
+from service_metrics import stage_timer
+
+logger = logging.getLogger('tensor_codec')
+logger.setLevel(logging.INFO)
+
+# Типы, которые принимаются в Tensor.data
+ALLOWED_DTYPES = {'float32', 'float64', 'int32', 'int64'}
+
+
+def decode_tensor(tensor, ndim=None):
+    """Декодирует сообщение Tensor в numpy-массив без создания объектов на каждый элемент"""
+    shape = tuple(tensor.shape)
+    if tensor.data:
+        dtype_name = tensor.dtype or 'float64'
+        if dtype_name not in ALLOWED_DTYPES:
+            raise ValueError(f"Unsupported tensor dtype: {dtype_name}")
+        dtype = np.dtype(dtype_name).newbyteorder('<')
+        if len(tensor.data) % dtype.itemsize:
+            raise ValueError(f"Tensor buffer size {len(tensor.data)} is not a multiple of {dtype.itemsize}")
+        # frombuffer не копирует данные, массив ссылается на буфер сообщения
+        array = np.frombuffer(tensor.data, dtype=dtype)
+    else:
+        array = np.array(tensor.values, dtype=np.float64)
+
+    if shape:
+        if int(np.prod(shape)) != array.size:
+            raise ValueError(f"Tensor shape {shape} does not match {array.size} elements")
+        array = array.reshape(shape)
+    if ndim is not None and array.ndim != ndim:
+        raise ValueError(f"Expected {ndim}-dimensional tensor, got shape {array.shape}")
+    return array
+
+
+def encode_tensor(array):
+    """Упаковывает numpy-массив в сообщение Tensor"""
+    array = np.asarray(array)
+    if array.dtype.name not in ALLOWED_DTYPES:
+        array = array.astype(np.float64)
+    array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+    return app_pb2.Tensor(data=array.tobytes(), shape=list(array.shape), dtype=array.dtype.name)
+
+
+@stage_timer('input_conversion')
+def features_from_request(request):
+    """Возвращает признаки из запроса: упакованные, если есть, иначе построчные"""
+    if request.HasField('X_packed'):
+        return decode_tensor(request.X_packed, ndim=2)
+    return [list(row.features) for row in request.X]
+
+
+@stage_timer('input_conversion')
+def labels_from_request(request):
+    """Возвращает метки из запроса: упакованные, если есть, иначе список"""
+    if request.HasField('y_packed'):
+        return decode_tensor(request.y_packed, ndim=1)
+    return list(request.y)
+
+
+def predict_response(preds, packed=False):
+    """Собирает PredictResponse; в упакованном виде тип зависит от типа меток"""
+    preds = np.asarray(preds)
+    if not packed:
+        return app_pb2.PredictResponse(predictions=preds.astype(float).tolist())
+    if preds.dtype.kind in 'iub':
+        return app_pb2.PredictResponse(int_predictions=preds.astype(np.int64).tolist())
+    return app_pb2.PredictResponse(float_predictions=preds.astype(np.float64).tolist())
@@ -0,0 +1,357 @@
+import os
+import uuid
+import queue
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+
+import numpy as np
+
+from models import db, TrainingJobRecord, fit_model, update_model, load_model, get_model_path, save_model, delete_model_files, create_model_record
+from hyperparam_search import run_search
+from database import session_scope
+from metadata_cache import metadata_cache
+from service_metrics import stage_timer
+
+logger = logging.getLogger('training_jobs')
+logger.setLevel(logging.INFO)
+
+# Число процессов, в которых идет обучение
+TRAIN_MAX_WORKERS = int(os.getenv('TRAIN_MAX_WORKERS', 2))
+# Сколько задач может ждать в очереди, прежде чем новые будут отклоняться
+TRAIN_MAX_PENDING = int(os.getenv('TRAIN_MAX_PENDING', 32))
+# Сколько завершенных задач хранится для опроса статуса (в памяти процесса и в БД)
+TRAIN_MAX_FINISHED = int(os.getenv('TRAIN_MAX_FINISHED', 1000))
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class QueueFullError(Exception):
+    """Очередь обучения переполнена"""
+
+
+class TrainingJob:
+    def __init__(self, model_type, params, n_samples):
+        self.id = str(uuid.uuid4())
+        self.model_type = model_type
+        self.params = params
+        self.n_samples = n_samples
+        self.state = PENDING
+        self.progress = 0.0
+        self.model_id = None
+        self.metrics = None
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    @classmethod
+    def from_record(cls, record):
+        """Задача, восстановленная из БД (принята другим процессом)"""
+        job = cls.__new__(cls)
+        job.id = record.id
+        job.model_type = record.model_type
+        job.params = None
+        job.n_samples = None
+        job.state = record.status
+        job.progress = record.progress
+        job.model_id = record.model_id
+        job.metrics = record.metrics
+        job.error = record.error
+        job.created_at = record.created_at
+        job.started_at = record.started_at
+        job.finished_at = record.finished_at
+        return job
+
+    def to_record(self):
+        return TrainingJobRecord(
+            id=self.id, model_type=self.model_type, status=self.state, progress=self.progress,
+            model_id=self.model_id, metrics=self.metrics, error=self.error, created_at=self.created_at,
+            started_at=self.started_at, finished_at=self.finished_at,
+        )
+
+    @property
+    def finished(self):
+        return self.state in (SUCCEEDED, FAILED)
+
+    def to_dict(self):
+        """Конвертирует задачу в словарь для API ответов"""
+        return {
+            'job_id': self.id,
+            'status': self.state,
+            'progress': self.progress,
+            'model_type': self.model_type,
+            'model_id': self.model_id,
+            'metrics': self.metrics,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# Очередь прогресса внутри процесса-воркера (задается инициализатором пула)
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def run_training_job(job_id, model_id, model_type, params, X, y, evaluation=None):
+    """Обучает модель в процессе пула и сохраняет артефакт на диск"""
+    def report(progress):
+        _progress_queue.put((job_id, progress))
+
+    report(0.1)
+    return fit_and_save(model_id, model_type, params, X, y, evaluation, progress=report)
+
+
+def fit_and_save(model_id, model_type, params, X, y, evaluation=None, progress=None):
+    """Обучает модель и сохраняет артефакт; выполняется в процессе пула, запись в БД — на стороне сервера"""
+    model, metrics = fit_model(model_type, params, X, y, progress=progress, evaluation=evaluation)
+    path = get_model_path(model_id)
+    save_model(model, path)
+    return path, metrics
+
+
+def retrain_and_save(model_type, path, X, y, incremental=False, n_new_estimators=None):
+    """Переобучает сохраненную модель и перезаписывает артефакт; возвращает новые метрики"""
+    model = load_model(path, writable=True)
+    model, metrics = update_model(model_type, model, X, y, incremental=incremental, n_new_estimators=n_new_estimators)
+    save_model(model, path)
+    return metrics
+
+
+def search_and_save(model_id, model_type, params, X, y, config):
+    """Поиск гиперпараметров с сохранением лучшей модели; результат — без самой модели"""
+    result = run_search(model_type, params, X, y, config)
+    path = get_model_path(model_id)
+    save_model(result.pop('model'), path)
+    result['path'] = path
+    return result
+
+
+class TrainingJobManager:
+    """Очередь асинхронного обучения моделей на пуле процессов.
+
+    Модель обучается и сохраняется на диск в процессе пула, а запись в БД
+    создается в процессе сервера только после успешного завершения задачи.
+    Статус задачи копируется в таблицу training_job при каждом изменении,
+    поэтому его отдает любой воркер gunicorn или pre-fork gRPC сервера, а не
+    только процесс, который принял задачу. Пул обучения у каждого процесса
+    свой: всего одновременно обучается до (число процессов) x max_workers моделей.
+    submit() запускает задачу в собственном пуле менеджера; register(),
+    mark_running(), complete() и fail() позволяют вести учет задач, которые
+    выполняются в чужом пуле (grpc_aio_server.py).
+    """
+
+    def __init__(self, app, max_workers=TRAIN_MAX_WORKERS, max_pending=TRAIN_MAX_PENDING):
+        self.app = app
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._executor = None
+        self._progress_queue = None
+
+    def _ensure_executor(self):
+        # Пул создается лениво: gRPC и Flask не переживают fork, поэтому
+        # процессы запускаются через spawn уже после старта сервера
+        if self._executor is None:
+            ctx = multiprocessing.get_context('spawn')
+            self._progress_queue = ctx.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(self._progress_queue,),
+            )
+            threading.Thread(target=self._drain_progress, name='training-progress', daemon=True).start()
+            logger.info(f"Training process pool started with {self.max_workers} workers")
+        return self._executor
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, progress = self._progress_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+            if job is not None:
+                self.mark_running(job, progress)
+
+    def _save(self, job):
+        """Записывает текущий статус задачи в БД"""
+        # Записи идут по одной, и каждая берет состояние на момент записи:
+        # более старое состояние не может перезаписать более новое
+        try:
+            with self._save_lock, session_scope(self.app):
+                with self._lock:
+                    record = job.to_record()
+                db.session.merge(record)
+                db.session.commit()
+        except Exception as e:
+            # Статус остается доступен в памяти процесса, который принял задачу
+            logger.error(f"Cannot save status of training job {job.id}: {str(e)}")
+
+    def register(self, model_type, params, n_samples):
+        """Принимает задачу в очередь, не запуская ее; QueueFullError, если очередь заполнена"""
+        job = TrainingJob(model_type, params, n_samples)
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if not j.finished)
+            if active >= self.max_workers + self.max_pending:
+                logger.warning(f"Training queue is full ({active} active jobs)")
+                raise QueueFullError('Training queue is full')
+            self._jobs[job.id] = job
+        self._save(job)
+        return job
+
+    def discard(self, job):
+        """Забывает задачу, которую не удалось запустить"""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        self._delete(job.id)
+
+    def mark_running(self, job, progress=0.0):
+        with self._lock:
+            if job.finished:
+                return
+            if job.state == PENDING:
+                job.state = RUNNING
+                job.started_at = datetime.now()
+            job.progress = max(job.progress, progress)
+        self._save(job)
+
+    def complete(self, job, model_id, metrics):
+        with self._lock:
+            job.state = SUCCEEDED
+            job.progress = 1.0
+            job.model_id = model_id
+            job.metrics = metrics
+            job.finished_at = datetime.now()
+            self._trim()
+        self._save(job)
+        self._trim_records()
+        logger.info(f"Training job {job.id} finished. Model ID: {model_id}, Metrics: {metrics}")
+
+    def fail(self, job, error):
+        logger.error(f"Training job {job.id} failed: {error}")
+        with self._lock:
+            job.state = FAILED
+            job.error = error
+            job.finished_at = datetime.now()
+            self._trim()
+        self._save(job)
+        self._trim_records()
+
+    def submit(self, model_type, params, X, y, evaluation=None):
+        """Ставит обучение модели в очередь и сразу возвращает задачу.
+
+        Данные проверяются до постановки в очередь: ValueError, если X — не
+        двумерный массив чисел или число меток не совпадает с числом объектов.
+        """
+        try:
+            X = np.asarray(X, dtype=float)
+            y = np.asarray(y)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"X must be a 2D array of numbers: {str(e)}") from e
+        if X.ndim != 2:
+            raise ValueError(f"X must be a 2D array of numbers, got {X.ndim}D array")
+        if y.ndim != 1 or len(y) != len(X):
+            raise ValueError(f"y must be a 1D array with one label per sample ({len(X)} samples)")
+        job = self.register(model_type, params, len(X))
+        model_id = str(uuid.uuid4())
+
+        try:
+            with self._lock:
+                executor = self._ensure_executor()
+            try:
+                future = executor.submit(run_training_job, job.id, model_id, model_type, params, X, y, evaluation)
+            except BrokenProcessPool:
+                # Один из процессов пула упал — пересоздаем пул и повторяем
+                logger.warning("Training process pool is broken, restarting it")
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                    executor = self._ensure_executor()
+                future = executor.submit(run_training_job, job.id, model_id, model_type, params, X, y, evaluation)
+        except Exception as e:
+            # Задача не попала в пул: иначе она навсегда осталась бы в очереди и занимала место
+            logger.error(f"Cannot submit training job {job.id}: {str(e)}")
+            self.discard(job)
+            raise
+        future.add_done_callback(lambda f: self._on_done(job, model_id, f))
+        logger.info(f"Training job {job.id} submitted: type={model_type}, samples={job.n_samples}")
+        return job
+
+    def _on_done(self, job, model_id, future):
+        try:
+            path, metrics = future.result()
+            with session_scope(self.app), stage_timer('db_lookup'):
+                record = create_model_record(model_id, job.model_type, job.params, path, metrics)
+                db.session.add(record)
+                db.session.commit()
+                metadata_cache.put(record)
+        except Exception as e:
+            delete_model_files(get_model_path(model_id))
+            self.fail(job, str(e))
+            return
+        self.complete(job, model_id, metrics)
+
+    def _trim(self):
+        finished = [job_id for job_id, j in self._jobs.items() if j.finished]
+        for job_id in finished[:max(0, len(finished) - TRAIN_MAX_FINISHED)]:
+            del self._jobs[job_id]
+
+    def _delete(self, job_id):
+        try:
+            with session_scope(self.app):
+                TrainingJobRecord.query.filter_by(id=job_id).delete()
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Cannot delete training job {job_id}: {str(e)}")
+
+    def _trim_records(self):
+        # Завершенные задачи всех процессов сверх TRAIN_MAX_FINISHED удаляются, начиная со старых
+        try:
+            with session_scope(self.app):
+                old = (db.session.query(TrainingJobRecord.id)
+                       .filter(TrainingJobRecord.finished_at.isnot(None))
+                       .order_by(TrainingJobRecord.finished_at.desc())
+                       .offset(TRAIN_MAX_FINISHED))
+                TrainingJobRecord.query.filter(TrainingJobRecord.id.in_(old.scalar_subquery())) \
+                    .delete(synchronize_session=False)
+                db.session.commit()
+        except Exception as e:
+            logger.error(f"Cannot trim finished training jobs: {str(e)}")
+
+    def peek(self, job_id):
+        """Задача, принятая этим процессом, без обращения к БД; None, если ее нет в памяти"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get(self, job_id):
+        job = self.peek(job_id)
+        if job is not None:
+            return job
+        # Задачу принял другой процесс — статус берется из БД
+        with session_scope(self.app), stage_timer('db_lookup'):
+            record = db.session.get(TrainingJobRecord, job_id)
+            return TrainingJob.from_record(record) if record is not None else None
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)